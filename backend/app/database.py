@@ -1,23 +1,184 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
 
 # Database URL - gebruik PostgreSQL in productie, SQLite voor development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./school_feedback.db")
 
-# Create engine
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Async drivers per database; de requests lopen via de async engine, de
+# sync engine blijft voor migraties, seeding bij het opstarten en scripts/
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """De async variant van een DATABASE_URL (sqlite+aiosqlite, postgresql+asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Geen async driver bekend voor {backend}, zet ASYNC_DATABASE_URL")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
+# Connection pool (PostgreSQL en SQLite bestanden; een in-memory SQLite
+# database heeft één connectie per thread en geen pool instellingen)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Seconden wachten op een vrije connectie voordat een request faalt
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connecties ouder dan dit (seconden) worden vervangen; -1 = nooit
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Connectie testen bij het uitlenen (vangt door de server gesloten connecties op)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() not in ("0", "false", "no")
+
+# SQLite pragmas per connectie: WAL laat lezers doorwerken terwijl er
+# geschreven wordt; synchronous=NORMAL is in WAL mode crash-veilig
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL").upper()
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+# Negatief = KiB (-65536 = 64 MiB page cache per connectie), positief = pagina's
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+# Bytes van het database bestand dat gemmapt gelezen wordt; 0 = uit
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+# Milliseconden wachten op een lock van een andere schrijver
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IN_MEMORY = IS_SQLITE and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") in ("sqlite:", "sqlite:/"))
+
+
+def _pool_options():
+    if IN_MEMORY:
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def sqlite_pragmas():
+    """De pragmas die op elke nieuwe SQLite connectie gezet worden."""
+    if SQLITE_JOURNAL_MODE not in JOURNAL_MODES:
+        raise ValueError(f"Ongeldige SQLITE_JOURNAL_MODE: {SQLITE_JOURNAL_MODE}")
+    if SQLITE_SYNCHRONOUS not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Ongeldige SQLITE_SYNCHRONOUS: {SQLITE_SYNCHRONOUS}")
+    pragmas = {
+        "busy_timeout": SQLITE_BUSY_TIMEOUT,
+        "synchronous": SQLITE_SYNCHRONOUS,
+        "cache_size": SQLITE_CACHE_SIZE,
+        "mmap_size": SQLITE_MMAP_SIZE,
+    }
+    if not IN_MEMORY:
+        # journal_mode eerst: WAL is een eigenschap van het bestand
+        pragmas = {"journal_mode": SQLITE_JOURNAL_MODE, **pragmas}
+    return pragmas
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+# Create engines
+if IS_SQLITE:
+    SQLITE_PRAGMAS = sqlite_pragmas()
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, **_pool_options())
+    # aiosqlite gebruikt standaard geen pool (NullPool); kies expliciet de
+    # queue pool zodat DB_POOL_* ook voor de endpoints gelden. Een in-memory
+    # database is per engine: de async engine ziet dan een eigen, lege database
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        **({} if IN_MEMORY else {"poolclass": AsyncAdaptedQueuePool, **_pool_options()})
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
 else:
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(DATABASE_URL, **_pool_options())
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_options())
+
+
+def _pool_info(pool):
+    info = {"pool": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        info.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout": pool.timeout(),
+            "recycle": DB_POOL_RECYCLE,
+            "pre_ping": DB_POOL_PRE_PING,
+        })
+    return info
 
-# Create session
+
+def pool_stats():
+    """
+    Actuele pool bezetting en instellingen van de async engine (requests),
+    de sync engine (opstarten, migraties) en de SQLite pragmas zoals ze echt staan.
+    """
+    stats = {"dialect": engine.dialect.name, "driver": async_engine.dialect.driver}
+    stats.update(_pool_info(async_engine.pool))
+    stats["sync_pool"] = _pool_info(engine.pool)
+    if IS_SQLITE:
+        with engine.connect() as connection:
+            stats["pragmas"] = {
+                name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in SQLITE_PRAGMAS
+            }
+    return stats
+
+# Create sessions; expire_on_commit=False zodat objecten na de commit zonder
+# extra (impliciete, in async niet toegestane) query leesbaar blijven
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Dependency to get database session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+# Schema wijzigingen gaan via versiebeheerde migraties (alembic, migrations/versions/)
+MIGRATIONS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+# Sleutel voor de PostgreSQL advisory lock: meerdere workers die tegelijk
+# starten migreren na elkaar in plaats van door elkaar heen
+MIGRATION_LOCK_KEY = 424242
+
+
+def migration_config():
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_PATH)
+    return config
+
+
+def run_migrations(bind=None, revision="head"):
+    """
+    Breng het schema naar de laatste migratie (alembic upgrade head) en
+    geef de revisie waar de database daarna op staat. Een database die nog
+    met create_all gemaakt is komt via de idempotente baseline (0001) mee.
+    """
+    from alembic import command
+    from alembic.runtime.migration import MigrationContext
+
+    bind = bind if bind is not None else engine
+    config = migration_config()
+    with bind.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({MIGRATION_LOCK_KEY})")
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+        return MigrationContext.configure(connection).get_current_revision()
@@ -0,0 +1,289 @@
+# Write-behind ingestie: POST /feedback bevestigt direct met 202, een achtergrond thread scoort en schrijft weg
+
+import bisect
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from .database import SessionLocal
+from .language import detect_language
+from .models import Feedback
+from .sentiment_engines import SentimentEngine, get_engine
+from .sentiment_profiler import LatencyHistogram
+from .sentiment_shadow import SHADOW
+
+# "sync" = scoren en committen binnen de request (200 met sentiment),
+# "queue" = 202 met een ticket, scoren en committen in de achtergrond
+FEEDBACK_INGEST_MODE = os.getenv("FEEDBACK_INGEST_MODE", "sync").lower()
+# Maximaal aantal wachtende submissions; daarboven 503 met Retry-After
+FEEDBACK_INGEST_QUEUE = int(os.getenv("FEEDBACK_INGEST_QUEUE", "10000"))
+# Maximaal aantal submissions per transactie
+FEEDBACK_INGEST_BATCH = int(os.getenv("FEEDBACK_INGEST_BATCH", "200"))
+# Milliseconden wachten op meer submissions voordat een (niet volle) batch weggeschreven wordt
+FEEDBACK_INGEST_LINGER_MS = float(os.getenv("FEEDBACK_INGEST_LINGER_MS", "20"))
+# Seconden die het afsluiten mag duren om de queue leeg te schrijven
+FEEDBACK_INGEST_DRAIN_TIMEOUT = float(os.getenv("FEEDBACK_INGEST_DRAIN_TIMEOUT", "30"))
+# Retry-After (seconden) bij een volle queue
+FEEDBACK_INGEST_RETRY_AFTER = int(os.getenv("FEEDBACK_INGEST_RETRY_AFTER", "1"))
+# Aantal recente tickets waarvan de status opvraagbaar blijft
+FEEDBACK_INGEST_TICKETS = int(os.getenv("FEEDBACK_INGEST_TICKETS", "10000"))
+
+# Grenzen van de batch grootte histogram
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class QueueFullError(Exception):
+    """De ingestie queue zit vol of wordt afgesloten; de client moet later opnieuw proberen."""
+
+
+def score_rows(engine: SentimentEngine, items: List[Any]) -> List[dict]:
+    """Feedback rijen voor een INSERT; items hebben text, category_id en subject_id (FeedbackCreate)."""
+    sentiments = engine.analyze_batch_versioned([item.text for item in items])
+    return [
+        {
+            "text": item.text,
+            "sentiment_label": label,
+            "sentiment_score": score,
+            "sentiment_confidence": confidence,
+            "lexicon_version": lexicon_version,
+            "sentiment_engine": engine.name,
+            "language": detect_language(item.text),
+            "category_id": item.category_id,
+            "subject_id": item.subject_id,
+            "is_anonymous": True
+        }
+        for item, ((label, score, confidence), lexicon_version) in zip(items, sentiments)
+    ]
+
+
+class IngestQueue:
+    """
+    Submissions komen in een begrensde queue en krijgen een ticket; een
+    achtergrond thread pakt tot batch_size items tegelijk, scoort ze in één
+    analyze_batch en schrijft ze in één transactie weg. Faalt een batch, dan
+    wordt per item opnieuw geprobeerd zodat één foute rij de rest niet meeneemt.
+    Bij het afsluiten wordt de queue eerst leeggeschreven; een crash van het
+    proces verliest wat nog in de queue stond.
+    """
+
+    def __init__(self, session_factory: Callable[[], Any], enabled: bool = False, queue_size: int = 10000,
+                 batch_size: int = 200, linger: float = 0.02, drain_timeout: float = 30.0,
+                 tickets: int = 10000):
+        self.session_factory = session_factory
+        self.enabled = enabled and queue_size > 0
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.linger = max(0.0, linger)
+        self.drain_timeout = drain_timeout
+        self.ticket_limit = max(1, tickets)
+        self._queue: Deque[Tuple[str, Any, float]] = deque()
+        self._tickets: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._wakeup = threading.Event()
+        self._closing = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self.accepted = 0
+            self.rejected = 0
+            self.stored = 0
+            self.failed = 0
+            self.in_flight = 0
+            self.peak_depth = len(self._queue)
+            self.batches = 0
+            self.batch_items = 0
+            self.batch_max = 0
+            self.batch_last = 0
+            self.batch_sizes = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+            self.commit_latency = LatencyHistogram()
+            # Van submission tot commit: de vertraging die write-behind toevoegt
+            self.ingest_latency = LatencyHistogram()
+
+    def submit(self, item: Any) -> str:
+        """Zet een submission in de queue (niet-blokkerend) en geef het ticket terug."""
+        ticket = uuid.uuid4().hex
+        with self._lock:
+            if self._closing.is_set() or len(self._queue) >= self.queue_size:
+                self.rejected += 1
+                raise QueueFullError("Feedback queue is vol, probeer later opnieuw")
+            self._queue.append((ticket, item, time.perf_counter()))
+            self.accepted += 1
+            self.peak_depth = max(self.peak_depth, len(self._queue))
+            self._remember(ticket, {"status": "queued"})
+        self._wakeup.set()
+        return ticket
+
+    def status(self, ticket: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            status = self._tickets.get(ticket)
+            return dict(status) if status is not None else None
+
+    def _remember(self, ticket: str, status: Dict[str, Any]) -> None:
+        # Aanroepen met self._lock; oudste tickets vallen eruit
+        self._tickets[ticket] = status
+        self._tickets.move_to_end(ticket)
+        while len(self._tickets) > self.ticket_limit:
+            self._tickets.popitem(last=False)
+
+    def start(self) -> bool:
+        """Start de achtergrond thread (idempotent)."""
+        if not self.enabled or (self._worker is not None and self._worker.is_alive()):
+            return False
+        self._closing.clear()
+        self._worker = threading.Thread(target=self._run, name="feedback-ingest", daemon=True)
+        self._worker.start()
+        return True
+
+    def stop(self) -> int:
+        """
+        Weiger nieuwe submissions en wacht (maximaal drain_timeout) tot de
+        queue weggeschreven is. Geeft het aantal niet weggeschreven items terug.
+        """
+        with self._lock:
+            self._closing.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(self.drain_timeout)
+            if not self._worker.is_alive():
+                self._worker = None
+        with self._lock:
+            return len(self._queue) + self.in_flight
+
+    def _take(self) -> List[Tuple[str, Any, float]]:
+        with self._lock:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            self.in_flight = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(1.0)
+            self._wakeup.clear()
+            if self._queue and len(self._queue) < self.batch_size and not self._closing.is_set():
+                # Kort wachten zodat gelijktijdige submissions in dezelfde transactie landen
+                self._closing.wait(self.linger)
+            while True:
+                batch = self._take()
+                if not batch:
+                    break
+                self.flush(batch)
+            if self._closing.is_set():
+                return
+
+    def flush(self, batch: List[Tuple[str, Any, float]]) -> None:
+        """Scoor en schrijf één batch weg in één transactie."""
+        engine = get_engine()
+        started = time.perf_counter()
+        try:
+            rows = score_rows(engine, [item for _, item, _ in batch])
+            scored = time.perf_counter()
+            with self.session_factory() as db:
+                ids = db.scalars(
+                    insert(Feedback).returning(Feedback.id, sort_by_parameter_order=True),
+                    rows
+                ).all()
+                db.commit()
+        except Exception:
+            for entry in batch:
+                self._flush_one(engine, entry)
+            return
+        self._stored(batch, ids, rows, scored - started, time.perf_counter() - scored)
+
+    def _flush_one(self, engine: SentimentEngine, entry: Tuple[str, Any, float]) -> None:
+        ticket, item, _ = entry
+        started = time.perf_counter()
+        try:
+            rows = score_rows(engine, [item])
+            scored = time.perf_counter()
+            with self.session_factory() as db:
+                db_feedback = Feedback(**rows[0])
+                db.add(db_feedback)
+                db.commit()
+                ids = [db_feedback.id]
+        except Exception as error:
+            with self._lock:
+                self.failed += 1
+                self.in_flight -= 1
+                self._remember(ticket, {"status": "failed", "error": str(error)[:200]})
+            return
+        self._stored([entry], ids, rows, scored - started, time.perf_counter() - scored)
+
+    def _stored(self, batch: List[Tuple[str, Any, float]], ids: List[int], rows: List[dict],
+                score_seconds: float, commit_seconds: float) -> None:
+        committed = time.perf_counter()
+        with self._lock:
+            self.batches += 1
+            self.batch_items += len(batch)
+            self.batch_last = len(batch)
+            self.batch_max = max(self.batch_max, len(batch))
+            self.batch_sizes[bisect.bisect_left(BATCH_SIZE_BUCKETS, len(batch))] += 1
+            self.commit_latency.observe(commit_seconds)
+            self.stored += len(batch)
+            self.in_flight -= len(batch)
+            for (ticket, _, enqueued), feedback_id, row in zip(batch, ids, rows):
+                self.ingest_latency.observe(committed - enqueued)
+                self._remember(ticket, {
+                    "status": "stored",
+                    "feedback_id": feedback_id,
+                    "sentiment": {
+                        "label": row["sentiment_label"],
+                        "score": row["sentiment_score"],
+                        "confidence": row["sentiment_confidence"]
+                    }
+                })
+        # Shadow mode krijgt de scoring tijd per item, net als bij een losse submission
+        for row in rows:
+            SHADOW.offer(row["text"], (row["sentiment_label"], row["sentiment_score"], row["sentiment_confidence"]),
+                         score_seconds / len(rows))
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={bound}" for bound in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "running": self._worker is not None and self._worker.is_alive(),
+                "closing": self._closing.is_set(),
+                "queue": {
+                    "depth": len(self._queue),
+                    "in_flight": self.in_flight,
+                    "peak": self.peak_depth,
+                    "max": self.queue_size,
+                },
+                "since": self.started_at,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "stored": self.stored,
+                "failed": self.failed,
+                "batches": {
+                    "count": self.batches,
+                    "max_size": self.batch_size,
+                    "avg_size": round(self.batch_items / self.batches, 2) if self.batches else 0.0,
+                    "largest": self.batch_max,
+                    "last": self.batch_last,
+                    "sizes": {label: count for label, count in zip(labels, self.batch_sizes) if count},
+                },
+                "latency": {
+                    "commit": self.commit_latency.to_dict(),
+                    "ingest": self.ingest_latency.to_dict(),
+                },
+            }
+
+
+# Globale queue; alleen actief bij FEEDBACK_INGEST_MODE=queue
+INGEST = IngestQueue(
+    SessionLocal,
+    enabled=FEEDBACK_INGEST_MODE == "queue",
+    queue_size=FEEDBACK_INGEST_QUEUE,
+    batch_size=FEEDBACK_INGEST_BATCH,
+    linger=FEEDBACK_INGEST_LINGER_MS / 1000,
+    drain_timeout=FEEDBACK_INGEST_DRAIN_TIMEOUT,
+    tickets=FEEDBACK_INGEST_TICKETS,
+)
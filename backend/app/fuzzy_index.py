@@ -0,0 +1,140 @@
+# Geïndexeerde fuzzy matching voor schrijffouten (bigram index + begrensde edit distance als voorfilter)
+
+import math
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def indel_distance(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """
+    Edit distance met alleen invoegen/verwijderen: len(a) + len(b) - 2 * LCS.
+    Dit is de exacte versie van wat SequenceMatcher.ratio() benadert.
+    Met max_distance stopt de berekening zodra de afstand gegarandeerd
+    groter wordt; dan wordt max_distance + 1 teruggegeven.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    total = len(a) + len(b)
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+
+    previous = [0] * (len(b) + 1)
+    for i, char_a in enumerate(a, 1):
+        current = [0] * (len(b) + 1)
+        for j, char_b in enumerate(b, 1):
+            if char_a == char_b:
+                current[j] = previous[j - 1] + 1
+            else:
+                current[j] = current[j - 1] if current[j - 1] > previous[j] else previous[j]
+        previous = current
+        if max_distance is not None:
+            # Beste haalbare LCS: huidige waarde plus alle resterende tekens van a
+            best_lcs = current[-1] + (len(a) - i)
+            if total - 2 * best_lcs > max_distance:
+                return max_distance + 1
+    return total - 2 * previous[-1]
+
+
+def similarity_ratio(a: str, b: str) -> float:
+    """Gelijkenis 2 * LCS / (len(a) + len(b)), tussen 0.0 en 1.0."""
+    total = len(a) + len(b)
+    if not total:
+        return 1.0
+    return 1.0 - indel_distance(a, b) / total
+
+
+def _bigram_keys(word: str) -> List[Tuple[str, int]]:
+    """
+    Bigrammen van '^word$', genummerd per herhaling zodat een telling via de
+    index gelijk is aan de multiset-doorsnede.
+    """
+    padded = f"^{word}$"
+    seen: Dict[str, int] = defaultdict(int)
+    keys = []
+    for i in range(len(padded) - 1):
+        bigram = padded[i:i + 2]
+        keys.append((bigram, seen[bigram]))
+        seen[bigram] += 1
+    return keys
+
+
+class FuzzyIndex:
+    """
+    Fuzzy lookup met dezelfde uitkomst als een lus met
+    SequenceMatcher.ratio() over de woorden, maar met een bigram voorfilter.
+
+    ratio() is nooit hoger dan de LCS ratio 2 * LCS / (la + lb). Als die >= t
+    is, dan delen de (gepadde) bigrammen van beide woorden minstens
+    `3 * lcs_min + 1 - la - lb` elementen, met lcs_min = ceil(t * (la + lb) / 2).
+    Alleen woorden die via de inverted index genoeg bigrammen delen en binnen
+    de (begrensde) LCS afstand vallen krijgen een ratio() berekening, zodat de
+    kost niet lineair met het lexicon meegroeit.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.words: List[str] = []
+        self._lengths: List[int] = []
+        self._postings: Dict[Tuple[str, int], List[int]] = defaultdict(list)
+        self._known: Dict[str, int] = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        word = word.lower()
+        if not word or word in self._known:
+            return
+        word_id = len(self.words)
+        self._known[word] = word_id
+        self.words.append(word)
+        self._lengths.append(len(word))
+        for key in _bigram_keys(word):
+            self._postings[key].append(word_id)
+
+    @staticmethod
+    def _required_overlap(query_length: int, word_length: int, threshold: float) -> int:
+        total = query_length + word_length
+        lcs_min = math.ceil(threshold * total / 2 - 1e-9)
+        return 3 * lcs_min + 1 - total
+
+    def lookup(self, word: str, threshold: float = 0.8) -> Tuple[bool, str]:
+        """
+        Eerste woord (in volgorde van toevoegen) met
+        SequenceMatcher(None, word, kandidaat).ratio() >= threshold.
+        Returns (match_found, matched_word).
+        """
+        if not self.words or not 0 < threshold <= 1:
+            return False, ""
+        word = word.lower()
+        length = len(word)
+        min_length = math.ceil(length * threshold / (2 - threshold) - 1e-9)
+        max_length = math.floor(length * (2 - threshold) / threshold + 1e-9)
+
+        overlap: Dict[int, int] = defaultdict(int)
+        for key in _bigram_keys(word):
+            for word_id in self._postings.get(key, ()):
+                overlap[word_id] += 1
+
+        if threshold < 2 / 3:
+            # Onder t = 2/3 kan de vereiste overlap <= 0 zijn: dan komen ook
+            # woorden zonder enkele gedeelde bigram in aanmerking
+            pool: Iterable[int] = range(len(self.words))
+        else:
+            pool = overlap
+        candidates = [
+            word_id for word_id in pool
+            if min_length <= self._lengths[word_id] <= max_length
+            and overlap.get(word_id, 0) >= self._required_overlap(length, self._lengths[word_id], threshold)
+        ]
+
+        for word_id in sorted(candidates):
+            candidate = self.words[word_id]
+            max_distance = math.floor((1 - threshold) * (length + len(candidate)) + 1e-9)
+            if indel_distance(word, candidate, max_distance) > max_distance:
+                continue
+            if SequenceMatcher(None, word, candidate).ratio() >= threshold:
+                return True, candidate
+        return False, ""
+
+    def __len__(self) -> int:
+        return len(self.words)
@@ -0,0 +1,95 @@
+# Snelle taalherkenning op karakter-trigrammen (zonder netwerk of model download)
+
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+DEFAULT_LANGUAGE_PROFILES = os.path.join(os.path.dirname(__file__), "data", "language_profiles.json")
+LANGUAGE_PROFILES_PATH = os.getenv("SENTIMENT_LANGUAGE_PROFILES", DEFAULT_LANGUAGE_PROFILES)
+# Niet-Nederlandse tekst langs de Nederlandse cascade heen sturen (0 = altijd de cascade)
+SENTIMENT_LANGUAGE_ROUTING = os.getenv("SENTIMENT_LANGUAGE_ROUTING", "1").lower() not in ("0", "false", "no")
+
+DEFAULT_LANGUAGE = "nl"
+# Te korte teksten zijn niet betrouwbaar te herkennen: die blijven Nederlands
+MIN_LETTERS = 15
+# Alleen de eerste tekens bekijken; meer maakt het resultaat zelden anders
+MAX_CHARS = 200
+# Ook met genoeg letters: één of twee (leen)woorden zoals "super professioneel" blijven Nederlands
+MIN_WORDS = 3
+# Minimaal verschil in gemiddelde log-kans per trigram t.o.v. Nederlands
+MIN_MARGIN = 0.4
+# Woorden die alleen in Nederlandse zinnen voorkomen: direct Nederlands, geen trigram score nodig
+DUTCH_MARKERS = frozenset((
+    "het", "een", "niet", "geen", "ook", "wel", "heel", "erg", "zeer", "maar", "zijn",
+    "ik", "wij", "jij", "wordt", "werd", "voor", "naar", "bij", "uit", "veel", "nog",
+    "dat", "deze", "die", "wat", "hij", "zij", "met", "vind", "lessen", "docent", "leraar",
+    "goed", "slecht", "leuk", "saai", "uitleg", "kan", "moet", "hebben", "heeft",
+))
+
+WORD = re.compile(r"[^\W\d_]+")
+ARABIC = re.compile(r"[؀-ۿݐ-ݿﭐ-﷿ﹰ-﻿]")
+
+
+class LanguageDetector:
+    """
+    Naive Bayes over karakter-trigrammen met voorberekende profielen
+    (zie scripts/build_language_profiles.py). Arabisch schrift wordt
+    herkend op het schrift zelf. Bij twijfel wint het Nederlands.
+    """
+
+    def __init__(self, path: str = LANGUAGE_PROFILES_PATH):
+        with open(path, encoding="utf-8") as handle:
+            profiles = json.load(handle)
+        self.languages: List[str] = profiles["languages"]
+        self.unseen: Tuple[float, ...] = tuple(profiles["unseen"])
+        self.trigrams: Dict[str, Tuple[float, ...]] = {
+            trigram: tuple(scores) for trigram, scores in profiles["trigrams"].items()
+        }
+        self.default_index = self.languages.index(DEFAULT_LANGUAGE)
+        # Woorden herhalen vaak ("de", "het", "les"): score per woord gecachet
+        self.word_scores = lru_cache(maxsize=16384)(self._word_scores)
+
+    def _word_scores(self, word: str) -> Tuple[int, Tuple[float, ...]]:
+        padded = f" {word} "
+        get = self.trigrams.get
+        unseen = self.unseen
+        rows = [get(padded[index:index + 3], unseen) for index in range(len(padded) - 2)]
+        return len(rows), tuple(sum(column) for column in zip(*rows))
+
+    def detect(self, text: str) -> str:
+        """ISO code van de taal ("nl", "en", "fr", "ar"); bij twijfel DEFAULT_LANGUAGE."""
+        sample = text[:MAX_CHARS].lower()
+        words = WORD.findall(sample)
+        if len(words) < MIN_WORDS or not DUTCH_MARKERS.isdisjoint(words):
+            return DEFAULT_LANGUAGE
+        letters = sum(map(len, words))
+        if letters < MIN_LETTERS:
+            return DEFAULT_LANGUAGE
+        if not sample.isascii() and len(ARABIC.findall(sample)) * 2 > letters:
+            return "ar"
+
+        scored = [self.word_scores(word) for word in words]
+        count = sum(trigram_count for trigram_count, _ in scored)
+        totals = [sum(column) for column in zip(*[scores for _, scores in scored])]
+        best = max(range(len(totals)), key=totals.__getitem__)
+        if best == self.default_index:
+            return DEFAULT_LANGUAGE
+        if (totals[best] - totals[self.default_index]) / count < MIN_MARGIN:
+            return DEFAULT_LANGUAGE
+        return self.languages[best]
+
+
+_detector = None
+
+
+def get_detector() -> LanguageDetector:
+    global _detector
+    if _detector is None:
+        _detector = LanguageDetector()
+    return _detector
+
+
+def detect_language(text: str) -> str:
+    return get_detector().detect(text)
@@ -0,0 +1,243 @@
+# Sentiment lexicon: geladen uit een versioned data file, gecompileerd en hot-reloadable
+
+import hashlib
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from .fuzzy_index import FuzzyIndex
+from .lexicon_artifact import (
+    SENTIMENT_LEXICON_ARTIFACT, ArtifactError, artifact_path, read_artifact, source_digest,
+)
+from .phrase_matcher import DensePhraseMatcher
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(__file__), "data", "sentiment_lexicon_nl.json")
+LEXICON_PATH = os.getenv("SENTIMENT_LEXICON_PATH", DEFAULT_LEXICON_PATH)
+# Poll interval (seconden) voor automatisch herladen bij een gewijzigd bestand; 0 = uit
+LEXICON_WATCH_INTERVAL = float(os.getenv("SENTIMENT_LEXICON_WATCH", "0"))
+
+VALID_LABELS = ("Positive", "Negative", "Neutral")
+WORD_SETS = (
+    "negation_neutralized", "negatable_positive", "strong_negative",
+    "negative", "positive", "intensifiers",
+)
+
+
+class LexiconError(ValueError):
+    """Het lexicon bestand ontbreekt of is ongeldig."""
+    pass
+
+
+class CompiledLexicon:
+    """
+    Onveranderlijke, gecompileerde snapshot van een lexicon bestand.
+
+    Woordlijsten zijn frozensets (O(1) lookup), alle stage-zinnen zitten in
+    één phrase automaat (DFA tabellen, eventueel gemapt uit het artefact van
+    app/lexicon_artifact.py) en de fuzzy targets in een FuzzyIndex. Een analyse
+    pakt één snapshot en gebruikt die tot het einde, ook als er ondertussen
+    herladen wordt.
+    """
+
+    def __init__(self, data: Dict[str, Any], source: str = "<memory>",
+                 phrase_matcher: Optional[DensePhraseMatcher] = None, artifact: Optional[str] = None):
+        _validate(data)
+        self.source = source
+        self.artifact = artifact
+        self.declared_version: str = str(data["version"])
+        self.checksum = hashlib.sha256(
+            json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        # Versie = gedeclareerde versie + inhoud, zodat ook een wijziging zonder
+        # versie-bump caches ongeldig maakt
+        self.version = f"{self.declared_version}+{self.checksum[:8]}"
+        self.loaded_at = time.time()
+
+        # (naam, zinnen, (label, score, confidence)) in prioriteitsvolgorde
+        self.stages: List[Tuple[str, List[str], Tuple[str, float, float]]] = [
+            (stage["name"], list(stage["phrases"]),
+             (stage["label"], float(stage["score"]), float(stage["confidence"])))
+            for stage in data["stages"]
+        ]
+        phrase_stage: Dict[str, int] = {}
+        for stage_index, (_, phrases, _) in enumerate(self.stages):
+            for phrase in phrases:
+                phrase_stage.setdefault(phrase, stage_index)
+        if phrase_matcher is None:
+            phrase_matcher = DensePhraseMatcher.compile(phrase_stage)
+        elif phrase_matcher.phrases != list(phrase_stage):
+            raise LexiconError("Artefact hoort niet bij dit lexicon (andere zinnen)")
+        self.phrase_matcher = phrase_matcher
+        self.phrase_stage_index = [phrase_stage[phrase] for phrase in self.phrase_matcher.phrases]
+
+        words = data["words"]
+        self.negation_neutralized: FrozenSet[str] = frozenset(words["negation_neutralized"])
+        self.negatable_positive: FrozenSet[str] = frozenset(words["negatable_positive"])
+        self.strong_negative: FrozenSet[str] = frozenset(words["strong_negative"])
+        self.negative: FrozenSet[str] = frozenset(words["negative"])
+        self.positive: FrozenSet[str] = frozenset(words["positive"])
+        self.intensifiers: FrozenSet[str] = frozenset(words["intensifiers"])
+
+        # Omgekeerde lookup: schrijffout -> correct woord (eerste voorkomen wint)
+        self.spelling_variants: Dict[str, List[str]] = data["spelling_variants"]
+        self.spelling_lookup: Dict[str, str] = {}
+        for correct_word, variants in self.spelling_variants.items():
+            for variant in variants:
+                self.spelling_lookup.setdefault(variant, correct_word)
+        self.spelling_strong_negatives: FrozenSet[str] = frozenset(data["spelling_strong_negatives"])
+
+        self.fuzzy_targets: List[str] = list(data["fuzzy"]["targets"])
+        self.fuzzy_threshold = float(data["fuzzy"]["threshold"])
+        self.fuzzy_index = FuzzyIndex(self.fuzzy_targets)
+        # Tokens herhalen vaak: per snapshot gecachet
+        self.fuzzy_strong_negative = lru_cache(maxsize=4096)(self._fuzzy_strong_negative)
+
+    def _fuzzy_strong_negative(self, word: str) -> Tuple[bool, str]:
+        return self.fuzzy_index.lookup(word, self.fuzzy_threshold)
+
+    def match_stage(self, text_lower: str, trace=None) -> Optional[Tuple[int, str]]:
+        """
+        Zoek in één pass de hoogst geprioriteerde stage met een match.
+        Met een SentimentTrace worden alle gevonden zinnen geregistreerd (geen
+        vroege exit); een profiler sample telt alleen de zinnen tot de beslissing.
+        Returns (stage_index, phrase) of None.
+        """
+        best_stage = len(self.stages)
+        best_phrase = None
+        phrases = self.phrase_matcher.phrases
+        for _, phrase_id in self.phrase_matcher.iter_matches(text_lower):
+            stage_index = self.phrase_stage_index[phrase_id]
+            if trace is not None:
+                trace.phrase_hit(self.stages[stage_index][0], phrases[phrase_id])
+            if stage_index < best_stage:
+                best_stage = stage_index
+                best_phrase = phrases[phrase_id]
+                if best_stage == 0 and (trace is None or not trace.exhaustive):
+                    break
+        if best_phrase is None:
+            return None
+        return best_stage, best_phrase
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "declared_version": self.declared_version,
+            "checksum": self.checksum,
+            "source": self.source,
+            "artifact": self.artifact,
+            "loaded_at": self.loaded_at,
+            "stages": [name for name, _, _ in self.stages],
+            "phrases": len(self.phrase_matcher),
+            "fuzzy_targets": len(self.fuzzy_index),
+        }
+
+
+def _validate(data: Dict[str, Any]) -> None:
+    if not isinstance(data, dict):
+        raise LexiconError("Lexicon moet een JSON object zijn")
+    for key in ("version", "stages", "words", "spelling_variants", "spelling_strong_negatives", "fuzzy"):
+        if key not in data:
+            raise LexiconError(f"Lexicon mist veld '{key}'")
+    for stage in data["stages"]:
+        for key in ("name", "label", "score", "confidence", "phrases"):
+            if key not in stage:
+                raise LexiconError(f"Stage mist veld '{key}': {stage.get('name', '?')}")
+        if stage["label"] not in VALID_LABELS:
+            raise LexiconError(f"Ongeldig label '{stage['label']}' in stage {stage['name']}")
+    for name in WORD_SETS:
+        if name not in data["words"]:
+            raise LexiconError(f"Lexicon mist woordenlijst '{name}'")
+    threshold = data["fuzzy"].get("threshold")
+    if not isinstance(threshold, (int, float)) or not 0 < threshold <= 1:
+        raise LexiconError("fuzzy.threshold moet tussen 0 en 1 liggen")
+
+
+def load_lexicon(path: str) -> CompiledLexicon:
+    """
+    Lees en compileer een lexicon bestand; raises LexiconError bij fouten.
+    Staat er een actueel artefact naast (python -m app.lexicon_artifact),
+    dan wordt de automaat daaruit gemapt in plaats van opnieuw gebouwd.
+    """
+    try:
+        with open(path, "rb") as handle:
+            raw = handle.read()
+    except OSError as error:
+        raise LexiconError(f"Kan lexicon niet laden uit {path}: {error}") from error
+
+    artifact = artifact_path(path)
+    if SENTIMENT_LEXICON_ARTIFACT and os.path.exists(artifact):
+        try:
+            data, matcher = read_artifact(artifact, source_digest(raw))
+            return CompiledLexicon(data, source=path, phrase_matcher=matcher, artifact=artifact)
+        except (ArtifactError, LexiconError):
+            # Verouderd of onbruikbaar artefact: gewoon zelf compileren
+            pass
+
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as error:
+        raise LexiconError(f"Kan lexicon niet laden uit {path}: {error}") from error
+    return CompiledLexicon(data, source=path)
+
+
+_active = load_lexicon(LEXICON_PATH)
+_reload_lock = threading.Lock()
+_watcher: Optional[threading.Thread] = None
+_watcher_stop = threading.Event()
+
+
+def get_lexicon() -> CompiledLexicon:
+    """De actieve snapshot. Eén keer ophalen per analyse."""
+    return _active
+
+
+def reload_lexicon(path: Optional[str] = None) -> CompiledLexicon:
+    """
+    Laad het lexicon opnieuw en wissel atomisch naar de nieuwe snapshot.
+    Bij een fout blijft de huidige snapshot actief en volgt een LexiconError.
+    """
+    global _active
+    with _reload_lock:
+        compiled = load_lexicon(path or _active.source)
+        _active = compiled
+    return compiled
+
+
+def _file_signature(path: str) -> Optional[Tuple[float, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+
+def _watch(interval: float) -> None:
+    signature = _file_signature(_active.source)
+    while not _watcher_stop.wait(interval):
+        current = _file_signature(_active.source)
+        if current is None or current == signature:
+            continue
+        signature = current
+        try:
+            reload_lexicon()
+        except LexiconError:
+            # Half geschreven of ongeldig bestand: oude snapshot blijft actief
+            continue
+
+
+def start_watcher(interval: float = LEXICON_WATCH_INTERVAL) -> bool:
+    """Start een daemon thread die het lexicon bestand op wijzigingen controleert."""
+    global _watcher
+    if interval <= 0 or (_watcher is not None and _watcher.is_alive()):
+        return False
+    _watcher_stop.clear()
+    _watcher = threading.Thread(target=_watch, args=(interval,), name="lexicon-watcher", daemon=True)
+    _watcher.start()
+    return True
+
+
+def stop_watcher() -> None:
+    _watcher_stop.set()
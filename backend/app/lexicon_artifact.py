@@ -0,0 +1,163 @@
+# Gecompileerd lexicon als binair artefact: workers mmap'en de automaat tabellen read-only
+#
+# Formaat:
+#   header   "SLXB", format versie (u32), offset en lengte van de metadata (u64, u32), little endian
+#   tabellen DFA transities en outputs van de phrase automaat, 8-byte aligned, native byte order
+#   metadata JSON: lexicon data, checksum van het bron bestand, alfabet,
+#            zinnen en per tabel (offset, aantal, typecode)
+#
+# Bouwen (ook in de Dockerfile):  python -m app.lexicon_artifact [lexicon.json] [-o pad]
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .phrase_matcher import DensePhraseMatcher
+
+MAGIC = b"SLXB"
+ARTIFACT_FORMAT = 1
+ARTIFACT_SUFFIX = ".lexbin"
+HEADER = struct.Struct("<4sIQI")
+TABLES = ("delta", "out_offsets", "out_ids")
+# 0 = het artefact naast het lexicon bestand negeren en altijd zelf compileren
+SENTIMENT_LEXICON_ARTIFACT = os.getenv("SENTIMENT_LEXICON_ARTIFACT", "1").lower() not in ("0", "false", "no")
+
+
+class ArtifactError(ValueError):
+    """Het artefact ontbreekt, is verouderd of heeft een onbekend formaat."""
+    pass
+
+
+def artifact_path(source: str) -> str:
+    """Pad van het artefact naast een lexicon bestand (.json -> .lexbin)."""
+    return os.path.splitext(source)[0] + ARTIFACT_SUFFIX
+
+
+def source_digest(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def write_artifact(path: str, data: Dict[str, Any], matcher: DensePhraseMatcher, digest: str,
+                   version: str = "") -> int:
+    """Schrijf het artefact atomisch (tmp + rename: gemapte oude versies blijven geldig)."""
+    tables = {name: getattr(matcher, name) for name in TABLES}
+    metadata = {
+        "version": version,
+        "source_sha256": digest,
+        "built_at": time.time(),
+        "byteorder": sys.byteorder,
+        "lexicon": data,
+        "alphabet": matcher.alphabet,
+        "phrases": matcher.phrases,
+        "tables": {},
+    }
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(b"\0" * HEADER.size)
+        for name, table in tables.items():
+            handle.write(b"\0" * (_align(handle.tell()) - handle.tell()))
+            metadata["tables"][name] = [handle.tell(), len(table), table.typecode]
+            handle.write(table.tobytes())
+        metadata_offset = handle.tell()
+        encoded = json.dumps(metadata, ensure_ascii=False).encode("utf-8")
+        handle.write(encoded)
+        size = handle.tell()
+        handle.seek(0)
+        handle.write(HEADER.pack(MAGIC, ARTIFACT_FORMAT, metadata_offset, len(encoded)))
+    os.replace(temporary, path)
+    return size
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def read_artifact(path: str, expected_digest: Optional[str] = None) -> Tuple[Dict[str, Any], DensePhraseMatcher]:
+    """
+    Map het artefact read-only en geef (lexicon data, matcher). De tabellen
+    van de matcher zijn views op de gemapte pagina's (geen kopie), zodat alle
+    processen die hetzelfde bestand mappen dezelfde pagina's delen.
+    """
+    try:
+        with open(path, "rb") as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as error:
+        raise ArtifactError(f"Kan artefact niet openen: {path}: {error}") from error
+    if len(mapped) < HEADER.size:
+        raise ArtifactError(f"Artefact is te kort: {path}")
+    magic, artifact_format, metadata_offset, metadata_length = HEADER.unpack_from(mapped)
+    if magic != MAGIC or artifact_format != ARTIFACT_FORMAT:
+        raise ArtifactError(f"Onbekend artefact formaat in {path}, opnieuw bouwen")
+    try:
+        metadata = json.loads(mapped[metadata_offset:metadata_offset + metadata_length].decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise ArtifactError(f"Artefact {path} is beschadigd (metadata)") from error
+    try:
+        return _unpack(path, mapped, metadata, expected_digest)
+    except ArtifactError:
+        raise
+    except (KeyError, TypeError, ValueError, struct.error) as error:
+        # Geldige JSON met ontbrekende of verkeerde velden: ook beschadigd
+        raise ArtifactError(f"Artefact {path} is beschadigd (metadata)") from error
+
+
+def _unpack(path: str, mapped: mmap.mmap, metadata: Dict[str, Any],
+            expected_digest: Optional[str]) -> Tuple[Dict[str, Any], DensePhraseMatcher]:
+    if metadata["byteorder"] != sys.byteorder:
+        raise ArtifactError(f"Artefact {path} is gebouwd voor een andere architectuur, opnieuw bouwen")
+    if expected_digest is not None and metadata["source_sha256"] != expected_digest:
+        raise ArtifactError(f"Artefact {path} is verouderd t.o.v. het lexicon bestand")
+
+    view = memoryview(mapped)
+    tables = {}
+    for name in TABLES:
+        offset, count, typecode = metadata["tables"][name]
+        table = view[offset:offset + count * struct.calcsize(typecode)].cast(typecode)
+        if len(table) != count:
+            raise ArtifactError(f"Artefact {path} is beschadigd (tabel {name})")
+        tables[name] = table
+    matcher = DensePhraseMatcher(metadata["phrases"], metadata["alphabet"], **tables)
+    return metadata["lexicon"], matcher
+
+
+def build(source: str, output: Optional[str] = None) -> Tuple[str, int, str]:
+    """Compileer een lexicon bestand naar een artefact; returns (pad, bytes, versie)."""
+    from .lexicon import CompiledLexicon, LexiconError
+
+    try:
+        with open(source, "rb") as handle:
+            raw = handle.read()
+        data = json.loads(raw)
+    except (OSError, json.JSONDecodeError) as error:
+        raise LexiconError(f"Kan lexicon niet laden uit {source}: {error}") from error
+    compiled = CompiledLexicon(data, source=source)
+    path = output or artifact_path(source)
+    size = write_artifact(path, data, compiled.phrase_matcher, source_digest(raw), compiled.version)
+    return path, size, compiled.version
+
+
+def main(argv=None) -> int:
+    """Bouw het lexicon artefact"""
+    from .lexicon import LEXICON_PATH, LexiconError
+
+    parser = argparse.ArgumentParser(description="Compileer het sentiment lexicon naar een mmap artefact")
+    parser.add_argument("source", nargs="?", default=LEXICON_PATH, help="lexicon JSON bestand")
+    parser.add_argument("-o", "--output", help="artefact pad (standaard naast het lexicon, .lexbin)")
+    args = parser.parse_args(argv)
+    try:
+        path, size, version = build(args.source, args.output)
+    except LexiconError as error:
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+    print(f"✅ Lexicon {version} gecompileerd naar {path} ({size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# Lineair sentiment model op gehashte woord-features (vereist numpy)
+
+import hashlib
+import re
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+LABELS = ("Negative", "Neutral", "Positive")
+DEFAULT_FEATURES = 1 << 18
+
+# Teksten worden per batch samengevoegd met een scheidingsteken en in één
+# regex pass getokenized; het scheidingsteken markeert de tekstgrenzen
+SEPARATOR = "\x00"
+TOKEN = re.compile(r"\w+|\x00")
+# Woordpaar feature = combinatie van de hashes van beide woorden
+PAIR_MULTIPLIER = 1000003
+
+
+class _HashCache(dict):
+    # Token -> crc32 (stabiel over processen heen, anders dan hash())
+    def __init__(self, limit: int):
+        super().__init__({SEPARATOR: -1})
+        self.limit = limit
+
+    def __missing__(self, token: str) -> int:
+        value = zlib.crc32(token.encode("utf-8"))
+        if len(self) < self.limit:
+            self[token] = value
+        return value
+
+
+class FeatureHasher:
+    """
+    Woorden en woordparen ("niet goed") -> kolom in een vaste feature ruimte
+    van n_features kolommen. Alleen de token hashes zijn Python werk (en
+    gecachet); paren en kolommen worden met numpy over de hele batch berekend.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_FEATURES, cache_size: int = 200000):
+        self.n_features = n_features
+        self._hashes = _HashCache(cache_size)
+
+    def transform(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, columns): tekst index en feature kolom van elke feature."""
+        joined = SEPARATOR.join(texts)
+        if joined.count(SEPARATOR) != len(texts) - 1:
+            joined = SEPARATOR.join(text.replace(SEPARATOR, " ") for text in texts)
+        tokens = TOKEN.findall(joined.lower())
+        hashes = np.fromiter(map(self._hashes.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+
+        separator = hashes < 0
+        rows = np.cumsum(separator)
+        words = ~separator
+        pairs = words[:-1] & words[1:]
+        columns = np.concatenate([hashes[words], hashes[:-1][pairs] * PAIR_MULTIPLIER + hashes[1:][pairs]])
+        rows = np.concatenate([rows[words], rows[:-1][pairs]])
+        return rows, columns % self.n_features
+
+
+def _row_sums(weights: np.ndarray, rows: np.ndarray, columns: np.ndarray, count: int) -> np.ndarray:
+    # Som van de feature gewichten per tekst (lege teksten: 0)
+    gathered = weights[columns]
+    return np.column_stack([
+        np.bincount(rows, weights=gathered[:, label], minlength=count)
+        for label in range(weights.shape[1])
+    ])
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= logits.sum(axis=1, keepdims=True)
+    return logits
+
+
+class LinearModel:
+    """
+    Multinomiale logistische regressie (Negative, Neutral, Positive) over
+    gehashte features. Een batch wordt in één keer gescoord met numpy
+    array operaties; alleen het tokenizen gebeurt per tekst.
+    """
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, trained_on: int = 0):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.trained_on = trained_on
+        self.hasher = FeatureHasher(self.weights.shape[0])
+        digest = hashlib.sha256(self.weights.tobytes() + self.bias.tobytes()).hexdigest()
+        self.version = f"linear+{digest[:8]}"
+
+    @classmethod
+    def load(cls, path: str) -> "LinearModel":
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"], int(data["trained_on"]))
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as handle:
+            np.savez_compressed(handle, weights=self.weights, bias=self.bias, trained_on=self.trained_on)
+
+    def probabilities(self, texts: Sequence[str]) -> np.ndarray:
+        rows, columns = self.hasher.transform(texts)
+        return _softmax(_row_sums(self.weights, rows, columns, len(texts)) + self.bias)
+
+    def predict(self, texts: Sequence[str]) -> List[Tuple[str, float, float]]:
+        """(label, score, confidence) per tekst; score = P(Positive) - P(Negative)."""
+        if not texts:
+            return []
+        probabilities = self.probabilities(texts)
+        best = probabilities.argmax(axis=1)
+        scores = probabilities[:, 2] - probabilities[:, 0]
+        confidences = probabilities[np.arange(len(texts)), best]
+        return [
+            (LABELS[label], score, confidence)
+            for label, score, confidence in zip(best.tolist(), scores.tolist(), confidences.tolist())
+        ]
+
+
+def train(texts: Sequence[str], labels: Sequence[str], n_features: int = DEFAULT_FEATURES,
+          epochs: int = 100, learning_rate: float = 1.0, l2: float = 1e-4,
+          hasher: Optional[FeatureHasher] = None) -> LinearModel:
+    """
+    Train het model met full-batch gradient descent. Labels zijn
+    "Positive", "Negative" of "Neutral" (zoals in Feedback.sentiment_label).
+    """
+    if not texts:
+        raise ValueError("Geen trainingsdata")
+    hasher = hasher or FeatureHasher(n_features)
+    rows, columns = hasher.transform(texts)
+    targets = np.zeros((len(texts), len(LABELS)))
+    targets[np.arange(len(texts)), [LABELS.index(label) for label in labels]] = 1.0
+
+    weights = np.zeros((hasher.n_features, len(LABELS)))
+    bias = np.zeros(len(LABELS))
+    for _ in range(epochs):
+        probabilities = _softmax(_row_sums(weights, rows, columns, len(texts)) + bias)
+        error = (probabilities - targets) / len(texts)
+        gradient = np.column_stack([
+            np.bincount(columns, weights=error[rows, label], minlength=hasher.n_features)
+            for label in range(len(LABELS))
+        ])
+        weights -= learning_rate * (gradient + l2 * weights)
+        bias -= learning_rate * error.sum(axis=0)
+    return LinearModel(weights, bias, trained_on=len(texts))
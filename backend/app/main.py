@@ -1,12 +1,13 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import os
 
-from .database import engine, get_db
-from .models import Base, User, Category, Subject
-from .auth import hash_password
-from .sentiment import analyze_sentiment
+from .database import SessionLocal, async_engine, pool_stats, run_migrations
+from .models import User, Category, Subject
+from .auth import get_current_active_user, hash_password
+from . import feedback_ingest, lexicon, sentiment_engines, sentiment_executor, sentiment_shadow
+from .sentiment import explain_sentiment
 
 # Import routers
 from .routers_auth import router as auth_router
@@ -14,9 +15,10 @@ from .routers_feedback import router as feedback_router
 from .routers_catalog import router as catalog_router
 from .routers_analytics import router as analytics_router
 from .routers_users import router as users_router
+from .routers_sentiment import router as sentiment_router
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create/upgrade database tables (migrations/versions/)
+run_migrations()
 
 app = FastAPI(title="School Feedback Platform", version="1.0.0")
 
@@ -27,6 +29,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor voor de volgende pagina van GET /feedback
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -35,19 +39,30 @@ app.include_router(feedback_router, prefix="", tags=["feedback"])
 app.include_router(catalog_router, prefix="", tags=["catalog"])
 app.include_router(analytics_router, prefix="", tags=["analytics"])
 app.include_router(users_router, prefix="/users", tags=["users"])
+app.include_router(sentiment_router, prefix="/sentiment", tags=["sentiment"])
 
 # Test endpoint voor sentiment analyse
 @app.get("/test-sentiment")
-def test_sentiment_endpoint(text: str = "test"):
+async def test_sentiment_endpoint(text: str = "test", trace: bool = False):
     try:
-        label, score, confidence = analyze_sentiment(text)
-        return {
+        if trace:
+            # Tracing altijd inline en zonder cache, zodat alle regels zichtbaar zijn
+            explanation = await run_in_threadpool(explain_sentiment, text)
+            label, score, confidence = explanation.result
+        else:
+            engine = sentiment_engines.get_engine()
+            label, score, confidence = await engine.analyze_async(text)
+        response = {
             "text": text,
+            "engine": "rules" if trace else engine.name,
             "label": label,
             "score": score,
             "confidence": confidence,
             "status": "success"
         }
+        if trace:
+            response["trace"] = explanation.to_dict()
+        return response
     except Exception as e:
         return {
             "text": text,
@@ -59,10 +74,16 @@ def test_sentiment_endpoint(text: str = "test"):
 def read_root():
     return {"message": "School Feedback Platform API", "version": "1.0.0"}
 
+@app.get("/db/pool")
+def get_pool_stats(current_user: User = Depends(get_current_active_user)):
+    # Bezetting van de connection pool en de actieve SQLite pragmas
+    return pool_stats()
+
 # Startup event to create initial data
 @app.on_event("startup")
 def startup_event():
-    db = next(get_db())
+    # Eenmalig bij het opstarten: synchrone sessie, de endpoints gebruiken get_db (async)
+    db = SessionLocal()
     
     # Create admin user
     admin_email = os.getenv("ADMIN_EMAIL", "admin@school.com")
@@ -141,8 +162,39 @@ def startup_event():
             print(f"Updated teacher: {existing_teacher.username}")
     
     db.commit()
+    db.close()
     print("Database initialization completed!")
 
+    # Watch the lexicon file for changes (only when SENTIMENT_LEXICON_WATCH > 0)
+    if lexicon.start_watcher():
+        print(f"Watching sentiment lexicon: {lexicon.get_lexicon().source}")
+    print(f"Sentiment lexicon version: {lexicon.get_lexicon().version}")
+    engine = sentiment_engines.get_engine()
+    print(f"Sentiment engine: {engine.name} ({engine.version})")
+    if sentiment_shadow.SHADOW.start():
+        print(f"Sentiment shadow mode: {sentiment_shadow.SHADOW.description} (1 op {sentiment_shadow.SHADOW.sample_rate})")
+
+    # Pre-warm the sentiment process pool (only when SENTIMENT_EXECUTOR=process)
+    if sentiment_executor.start_pool() is not None:
+        print(f"Sentiment process pool started with {sentiment_executor.SENTIMENT_POOL_SIZE} workers")
+
+    # Write-behind ingestion worker (only when FEEDBACK_INGEST_MODE=queue)
+    if feedback_ingest.INGEST.start():
+        print(f"Feedback ingest queue started (max {feedback_ingest.INGEST.queue_size}, batch {feedback_ingest.INGEST.batch_size})")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Eerst de ingestie queue leegschrijven: die heeft de engine, de process pool en de database nog nodig
+    if feedback_ingest.INGEST.enabled:
+        pending = await run_in_threadpool(feedback_ingest.INGEST.stop)
+        if pending:
+            print(f"Feedback ingest queue: {pending} submissions niet weggeschreven (FEEDBACK_INGEST_DRAIN_TIMEOUT)")
+    lexicon.stop_watcher()
+    sentiment_shadow.SHADOW.stop()
+    sentiment_executor.shutdown_pool()
+    # Connecties van de async pool netjes sluiten (asyncpg/aiosqlite)
+    await async_engine.dispose()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,5 +1,5 @@
 # Database models for School Feedback Platform
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -46,6 +46,9 @@ class Feedback(Base):
     sentiment_label = Column(String)  # Positive, Negative, Neutral
     sentiment_score = Column(Float)   # -1.0 to 1.0
     sentiment_confidence = Column(Float)  # 0.0 to 1.0
+    lexicon_version = Column(String)  # Lexicon (of model) versie waarmee gescoord is
+    sentiment_engine = Column(String)  # Engine die het sentiment bepaalde (rules, linear)
+    language = Column(String)  # Herkende taal (nl, en, fr, ar)
     category_id = Column(Integer, ForeignKey("categories.id"))
     subject_id = Column(Integer, ForeignKey("subjects.id"))
     created_at = Column(DateTime, default=func.now())
@@ -54,3 +57,13 @@ class Feedback(Base):
     # Relationships
     category = relationship("Category", back_populates="feedback")
     subject = relationship("Subject", back_populates="feedback")
+
+    # Indexes voor de dashboard queries (filter + sortering op created_at, id);
+    # aangemaakt door migratie 0002, zie migrations/versions/
+    __table_args__ = (
+        Index("ix_feedback_created_at_id", "created_at", "id"),
+        Index("ix_feedback_category_created", "category_id", "created_at", "id"),
+        Index("ix_feedback_subject_created", "subject_id", "created_at", "id"),
+        Index("ix_feedback_sentiment_created", "sentiment_label", "created_at", "id"),
+        Index("ix_feedback_language_sentiment", "language", "sentiment_label"),
+    )
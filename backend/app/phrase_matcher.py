@@ -0,0 +1,168 @@
+# Aho-Corasick phrase matcher voor de sentiment lexicons
+
+from array import array
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+
+class PhraseMatcher:
+    """
+    Multi-pattern substring matcher (Aho-Corasick automaat).
+
+    Alle zinnen worden eenmalig in één automaat gecompileerd, zodat een
+    tekst in één enkele pass doorzocht wordt, ongeacht het aantal zinnen.
+    Matches zijn gewone substring matches, net als `phrase in text`.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        index: Dict[str, int] = {}
+        for phrase in phrases:
+            if not phrase or phrase in index:
+                continue
+            index[phrase] = len(self.phrases)
+            self.phrases.append(phrase)
+            self._add(phrase, index[phrase])
+        self._link()
+
+    def _add(self, phrase: str, phrase_id: int) -> None:
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+        self._out[state] = self._out[state] + (phrase_id,)
+
+    def _link(self) -> None:
+        # Breadth-first: fail links wijzen naar de langste echte suffix die
+        # ook een prefix in de trie is; outputs van die suffix worden geërfd
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (end_offset, phrase_id) voor elke (ook overlappende) match.
+        end_offset is exclusief: text[end - len(phrase):end] == phrase.
+        """
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                for phrase_id in out[state]:
+                    yield position + 1, phrase_id
+
+    def find_all(self, text: str) -> List[str]:
+        """Alle gevonden zinnen in volgorde van voorkomen."""
+        return [self.phrases[phrase_id] for _, phrase_id in self.iter_matches(text)]
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+
+class DensePhraseMatcher:
+    """
+    Dezelfde automaat als PhraseMatcher, uitgeschreven als volledige DFA in
+    platte tabellen: één transitie per (state, teken klasse), fail links zijn
+    vooraf uitgerekend. De tabellen mogen uit een gedeeld buffer komen (zie
+    app/lexicon_artifact.py); matchen is één tabel lookup per teken.
+    """
+
+    def __init__(self, phrases: Sequence[str], alphabet: str, delta: Sequence[int],
+                 out_offsets: Sequence[int], out_ids: Sequence[int]):
+        self.phrases: List[str] = list(phrases)
+        self.alphabet = alphabet
+        self.delta = delta
+        self.out_offsets = out_offsets
+        self.out_ids = out_ids
+        # Klasse 0 = teken dat in geen enkele zin voorkomt (altijd terug naar de root)
+        self._classes: Dict[str, int] = {char: index for index, char in enumerate(alphabet, 1)}
+        self._width = len(alphabet) + 1
+        self._out: List[Tuple[int, ...]] = [
+            tuple(out_ids[start:end]) if end > start else ()
+            for start, end in zip(out_offsets, out_offsets[1:])
+        ]
+
+    @classmethod
+    def compile(cls, phrases: Iterable[str]) -> "DensePhraseMatcher":
+        matcher = PhraseMatcher(phrases)
+        goto, fail = matcher._goto, matcher._fail
+        alphabet = "".join(sorted({char for transitions in goto for char in transitions}))
+        width = len(alphabet) + 1
+        delta = array("H" if len(goto) < 1 << 16 else "I", [0]) * (len(goto) * width)
+
+        # Breadth-first, zodat de fail state (altijd ondieper) al ingevuld is
+        queue = deque([0])
+        while queue:
+            state = queue.popleft()
+            base = state * width
+            fail_base = fail[state] * width
+            for index, char in enumerate(alphabet, 1):
+                next_state = goto[state].get(char)
+                if next_state is not None:
+                    delta[base + index] = next_state
+                    queue.append(next_state)
+                elif state:
+                    delta[base + index] = delta[fail_base + index]
+
+        out_offsets = array("I", [0])
+        out_ids = array("I")
+        for outputs in matcher._out:
+            out_ids.extend(outputs)
+            out_offsets.append(len(out_ids))
+        return cls(matcher.phrases, alphabet, delta, out_offsets, out_ids)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Zelfde matches, in dezelfde volgorde, als PhraseMatcher.iter_matches."""
+        classes = self._classes
+        width = self._width
+        delta = self.delta
+        out = self._out
+        state = 0
+        for position, char in enumerate(text):
+            state = delta[state * width + classes.get(char, 0)]
+            if out[state]:
+                for phrase_id in out[state]:
+                    yield position + 1, phrase_id
+
+    def scan(self, text: str, state: int = 0) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+        """
+        (state, zinnen die hier eindigen) na elk teken van text, vanaf een
+        eerder bereikte state: zo kan een scan na een gedeelde prefix hervat worden.
+        """
+        classes = self._classes
+        width = self._width
+        delta = self.delta
+        out = self._out
+        for char in text:
+            state = delta[state * width + classes.get(char, 0)]
+            yield state, out[state]
+
+    def find_all(self, text: str) -> List[str]:
+        """Alle gevonden zinnen in volgorde van voorkomen."""
+        return [self.phrases[phrase_id] for _, phrase_id in self.iter_matches(text)]
+
+    def __len__(self) -> int:
+        return len(self.phrases)
@@ -0,0 +1,191 @@
+# Fallback polariteit zonder TextBlob: voorberekende polariteitstabel in arrays
+
+import os
+import re
+from array import array
+from typing import Callable, Dict, List
+
+DEFAULT_POLARITY_TABLE = os.path.join(os.path.dirname(__file__), "data", "polarity_en.tsv")
+POLARITY_TABLE_PATH = os.getenv("SENTIMENT_POLARITY_TABLE", DEFAULT_POLARITY_TABLE)
+# "table" (standaard, ingebouwd) of "textblob" (optionele plug-in, vereist textblob)
+SENTIMENT_FALLBACK = os.getenv("SENTIMENT_FALLBACK", "table").lower()
+
+# Zelfde tokenizer regels en modifiers als de pattern analyzer van TextBlob
+PUNCTUATION = tuple(".,;:!?()[]{}`''\"@#$^&*+-|=~_".replace(".", ""))
+ABBREVIATIONS = frozenset((
+    "a.", "adj.", "adv.", "al.", "a.m.", "c.", "cf.", "comp.", "conf.", "def.",
+    "ed.", "e.g.", "esp.", "etc.", "ex.", "f.", "fig.", "gen.", "id.", "i.e.",
+    "int.", "l.", "m.", "Med.", "Mil.", "Mr.", "n.", "n.q.", "orig.", "pl.",
+    "pred.", "pres.", "p.m.", "ref.", "v.", "vs.", "w/",
+))
+RE_ABBREVIATION = re.compile(r"^(?:[A-Za-z]\.)+$|^[A-Z][|bcdfghjklmnpqrstvwxz]+.$")
+CONTRACTIONS = ("'d", "'m", "'s", "'ll", "'re", "'ve", "n't")
+RE_PARAGRAPH = re.compile(r"\n{2,}")
+EOS = "END-OF-SENTENCE"
+NEGATIONS = frozenset(("no", "not", "n't", "never"))
+
+EMOTICONS = (
+    (1.00, ("<3", "♥")),
+    (1.00, (">:D", ":-D", ":D", "=-D", "=D", "X-D", "x-D", "XD", "xD", "8-D")),
+    (0.75, (">:P", ":-P", ":P", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)")),
+    (0.50, (">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)")),
+    (0.25, (">;]", ";-)", ";)", ";-]", ";]", ";D", ";^)", "*-)", "*)")),
+    (0.05, (">:o", ":-O", ":O", ":o", ":-o", "o_O", "o.O", "°O°", "°o°")),
+    (-0.25, (">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ":S", ":-S", ">.>")),
+    (-0.75, (">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/")),
+    (-1.00, (":'(", ":'''(", ";'(")),
+)
+EMOTICON_POLARITY: Dict[str, float] = {}
+for _polarity, _faces in EMOTICONS:
+    for _face in _faces:
+        EMOTICON_POLARITY.setdefault(_face.lower(), _polarity)
+# Emoticons die de tokenizer in losse tekens knipt weer samenvoegen (": )" -> ":)"),
+# langste eerst zodat ">:D" niet als ":D" herkend wordt
+RE_EMOTICONS = re.compile("(%s)($|\\s)" % "|".join(
+    " ?".join(re.escape(char) for char in face)
+    for face in sorted((face for _, faces in EMOTICONS for face in faces), key=len, reverse=True)
+))
+RE_SARCASM = re.compile(r"\( ?\! ?\)")
+
+
+def _split_token(token: str, tokens: List[str]) -> None:
+    # Leestekens aan begin en eind afsplitsen, punt alleen als het geen afkorting is
+    tail = []
+    while token.startswith(PUNCTUATION) and token not in CONTRACTIONS:
+        tokens.append(token[0])
+        token = token[1:]
+    while token.endswith(PUNCTUATION + (".",)) and token not in CONTRACTIONS:
+        if token.endswith(PUNCTUATION):
+            tail.append(token[-1])
+            token = token[:-1]
+        if token.endswith("..."):
+            tail.append("...")
+            token = token[:-3].rstrip(".")
+        if token.endswith("."):
+            if token in ABBREVIATIONS or RE_ABBREVIATION.match(token):
+                break
+            tail.append(".")
+            token = token[:-1]
+    if token:
+        tokens.append(token)
+    tokens.extend(reversed(tail))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase tokens met afgesplitste leestekens, emoticons en '(!)' als één token."""
+    for contraction in CONTRACTIONS:
+        if contraction in text:
+            text = text.replace(contraction, " " + contraction)
+    text = (text.replace("“", " “ ").replace("”", " ” ").replace("‘", " ‘ ")
+            .replace("’", " ’ ").replace("'", " ' ").replace('"', ' " '))
+    text = RE_PARAGRAPH.sub(" %s " % EOS, text.replace("\r\n", "\n"))
+    tokens: List[str] = []
+    for token in text.split():
+        _split_token(token, tokens)
+    joined = " ".join(token for token in tokens if token != EOS)
+    joined = RE_SARCASM.sub("(!)", joined)
+    joined = RE_EMOTICONS.sub(lambda match: match.group(1).replace(" ", "") + match.group(2), joined)
+    return joined.lower().split()
+
+
+class PolarityTable:
+    """
+    Woord -> (polariteit, intensiteit, modifier) in compacte arrays.
+    Eén keer geladen per process; de scoring volgt de pattern regels van
+    TextBlob (modifiers, negatie, uitroeptekens, emoticons).
+    """
+
+    def __init__(self, path: str = POLARITY_TABLE_PATH):
+        self.path = path
+        self.index: Dict[str, int] = {}
+        self.polarity = array("d")
+        self.intensity = array("d")
+        self.modifier = bytearray()
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                if line.startswith("#"):
+                    continue
+                word, polarity, intensity, modifier = line.rstrip("\n").split("\t")
+                self.index[word] = len(self.polarity)
+                self.polarity.append(float(polarity))
+                self.intensity.append(float(intensity))
+                self.modifier.append(modifier == "1")
+
+    def __len__(self) -> int:
+        return len(self.polarity)
+
+    def score(self, text: str) -> float:
+        """Polariteit tussen -1.0 en 1.0 (gemiddelde over de herkende woorden)."""
+        # Per herkend woord: [polariteit, intensiteit, negatie]
+        assessments = []
+        modifier = None
+        negation = None
+        for word in tokenize(text):
+            position = self.index.get(word)
+            if position is not None:
+                polarity = self.polarity[position]
+                if modifier is None:
+                    assessments.append([polarity, self.intensity[position], 1])
+                else:
+                    # "very good": polariteit maal de intensiteit van de modifier
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(polarity * last[1], 1.0))
+                    last[1] = self.intensity[position]
+                if negation is not None:
+                    assessments[-1][1] = 1.0 / assessments[-1][1]
+                    assessments[-1][2] = -1
+                modifier = word if self.modifier[position] else None
+                negation = word if word in NEGATIONS else None
+                continue
+
+            if word in NEGATIONS:
+                negation = word
+            elif negation and len(word.strip("'")) > 1:
+                negation = None
+            if negation is not None and modifier is not None and modifier.endswith("ly"):
+                # "really not good"
+                assessments[-1][2] = -1
+                negation = None
+            elif modifier and len(word) > 2:
+                modifier = None
+            if word == "!" and assessments:
+                assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, 1.0))
+            if word == "(!)":
+                assessments.append([0.0, 1.0, 1])
+            if not word.isalpha():
+                emoticon = EMOTICON_POLARITY.get(word)
+                if emoticon is not None:
+                    assessments.append([emoticon, 1.0, 1])
+
+        if not assessments:
+            return 0.0
+        # "not good" = licht negatief, "not bad" = licht positief
+        return sum(polarity * -0.5 if negated < 0 else polarity
+                   for polarity, _, negated in assessments) / len(assessments)
+
+
+def textblob_polarity(text: str) -> float:
+    """Optionele plug-in: de oorspronkelijke TextBlob polariteit."""
+    from textblob import TextBlob
+    return float(TextBlob(text).sentiment.polarity)
+
+
+_table = None
+
+
+def get_polarity_table() -> PolarityTable:
+    global _table
+    if _table is None:
+        _table = PolarityTable()
+    return _table
+
+
+def get_fallback() -> Callable[[str], float]:
+    """De geconfigureerde fallback scorer (SENTIMENT_FALLBACK)."""
+    if SENTIMENT_FALLBACK == "textblob":
+        try:
+            import textblob  # noqa: F401
+        except ImportError as error:
+            raise RuntimeError("SENTIMENT_FALLBACK=textblob vereist het textblob package") from error
+        return textblob_polarity
+    return get_polarity_table().score
@@ -0,0 +1,90 @@
+# Controle of de dashboard queries de feedback indexes gebruiken (EXPLAIN op de echte database)
+#
+#   python -m app.query_plans          # plan per query, exit 1 bij een full table scan
+#
+# De query vormen volgen GET /feedback (filter + sortering op created_at, id)
+# en /analytics (group by). Let op: PostgreSQL kiest op een kleine tabel
+# terecht vaak een seq scan; draai de controle op een database met data.
+
+import sys
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import func, select, tuple_
+
+from .models import Category, Feedback, Subject
+
+
+def query_shapes() -> Dict[str, object]:
+    """Naam -> statement voor elke query vorm die een index hoort te gebruiken."""
+    from .routers_feedback import feedback_list_query
+
+    return {
+        "feedback_page": feedback_list_query().limit(50),
+        "feedback_by_category": feedback_list_query(category_id=1).limit(50),
+        "feedback_by_subject": feedback_list_query(subject_id=1).limit(50),
+        "feedback_by_sentiment": feedback_list_query(sentiment="Negative").limit(50),
+        "feedback_after_cursor": feedback_list_query(category_id=1).limit(50).where(
+            tuple_(Feedback.created_at, Feedback.id) < tuple_(datetime(2026, 1, 1), 1000),
+        ),
+        "analytics_sentiment": (
+            select(Feedback.sentiment_label, func.count(Feedback.id))
+            .group_by(Feedback.sentiment_label)
+        ),
+        "analytics_category": (
+            select(Category.name, func.count(Feedback.id))
+            .join(Feedback).group_by(Category.name)
+        ),
+        "analytics_subject": (
+            select(Subject.name, func.count(Feedback.id))
+            .join(Feedback).group_by(Subject.name)
+        ),
+        "analytics_language": (
+            select(Feedback.language, Feedback.sentiment_label, func.count(Feedback.id))
+            .group_by(Feedback.language, Feedback.sentiment_label)
+        ),
+    }
+
+
+def explain(connection, statement) -> List[str]:
+    """Het query plan als regels tekst (SQLite: EXPLAIN QUERY PLAN, anders EXPLAIN)."""
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+        return [row[-1] for row in rows]
+    return [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {compiled}").all()]
+
+
+def scans_feedback(plan: List[str]) -> bool:
+    """True als de feedback tabel zonder index doorlopen of na afloop gesorteerd wordt."""
+    for line in plan:
+        line = line.strip()
+        if line == "SCAN feedback" or "Seq Scan on feedback" in line:
+            return True
+        if "USE TEMP B-TREE FOR ORDER BY" in line:
+            return True
+    return False
+
+
+def check(connection) -> Dict[str, Dict[str, object]]:
+    return {
+        name: {"plan": plan, "full_scan": scans_feedback(plan)}
+        for name, plan in ((name, explain(connection, statement)) for name, statement in query_shapes().items())
+    }
+
+
+def main() -> int:
+    from .database import DATABASE_URL, engine
+
+    print(f"Query plannen voor {DATABASE_URL}")
+    with engine.connect() as connection:
+        results = check(connection)
+    for name, result in results.items():
+        print(f"{'❌' if result['full_scan'] else '✅'} {name}")
+        for line in result["plan"]:
+            print(f"     {line}")
+    return 1 if any(result["full_scan"] for result in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
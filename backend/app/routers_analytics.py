@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from .database import get_db
 from .models import Feedback, Category, Subject
 from .auth import get_current_active_user
@@ -8,30 +8,42 @@ from .auth import get_current_active_user
 router = APIRouter()
 
 @router.get("/analytics")
-def get_analytics(current_user = Depends(get_current_active_user), db: Session = Depends(get_db)):
+async def get_analytics(current_user = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
     # Total feedback count
-    total_feedback = db.query(Feedback).count()
+    total_feedback = await db.scalar(select(func.count(Feedback.id)))
     
     # Sentiment distribution
-    sentiment_stats = db.query(
+    sentiment_stats = (await db.execute(select(
         Feedback.sentiment_label,
         func.count(Feedback.id).label('count')
-    ).group_by(Feedback.sentiment_label).all()
+    ).group_by(Feedback.sentiment_label))).all()
     
     # Feedback by category
-    category_stats = db.query(
+    category_stats = (await db.execute(select(
         Category.name,
         func.count(Feedback.id).label('count')
-    ).join(Feedback).group_by(Category.name).all()
+    ).join(Feedback).group_by(Category.name))).all()
     
     # Feedback by subject
-    subject_stats = db.query(
+    subject_stats = (await db.execute(select(
         Subject.name,
         func.count(Feedback.id).label('count')
-    ).join(Feedback).group_by(Subject.name).all()
+    ).join(Feedback).group_by(Subject.name))).all()
+    
+    # Feedback by language (en sentiment per taal)
+    language_stats = (await db.execute(select(
+        Feedback.language,
+        Feedback.sentiment_label,
+        func.count(Feedback.id).label('count')
+    ).group_by(Feedback.language, Feedback.sentiment_label))).all()
+    feedback_by_language = {}
+    for stat in language_stats:
+        entry = feedback_by_language.setdefault(stat.language or "onbekend", {"total": 0, "sentiment": {}})
+        entry["total"] += stat.count
+        entry["sentiment"][stat.sentiment_label] = stat.count
     
     # Average sentiment score
-    avg_sentiment = db.query(func.avg(Feedback.sentiment_score)).scalar() or 0
+    avg_sentiment = await db.scalar(select(func.avg(Feedback.sentiment_score))) or 0
     
     return {
         "total_feedback": total_feedback,
@@ -44,5 +56,6 @@ def get_analytics(current_user = Depends(get_current_active_user), db: Session =
         },
         "feedback_by_subject": {
             stat.name: stat.count for stat in subject_stats
-        }
+        },
+        "feedback_by_language": feedback_by_language
     }
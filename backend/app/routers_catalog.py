@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .database import get_db
 from .models import Category, Subject
 
 router = APIRouter()
 
 @router.get("/categories")
-def get_categories(db: Session = Depends(get_db)):
-    categories = db.query(Category).all()
+async def get_categories(db: AsyncSession = Depends(get_db)):
+    categories = (await db.scalars(select(Category))).all()
     return [
         {
             "id": cat.id,
@@ -18,8 +19,8 @@ def get_categories(db: Session = Depends(get_db)):
     ]
 
 @router.get("/subjects")
-def get_subjects(db: Session = Depends(get_db)):
-    subjects = db.query(Subject).all()
+async def get_subjects(db: AsyncSession = Depends(get_db)):
+    subjects = (await db.scalars(select(Subject))).all()
     return [
         {
             "id": subj.id,
@@ -1,23 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import String, insert, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
 from pydantic import BaseModel
+from datetime import datetime
+import asyncio
+import base64
+import binascii
+import json
+import os
+import time
 from .database import get_db
+from .feedback_ingest import FEEDBACK_INGEST_RETRY_AFTER, INGEST, QueueFullError, score_rows
 from .models import Feedback, Category, Subject, User
 from .auth import get_current_active_user
-from .sentiment import analyze_sentiment
+from .language import detect_language
+from .sentiment_engines import get_engine
+from .sentiment_shadow import SHADOW
+from .segmentation import SENTIMENT_MAX_TEXT_LENGTH, TextTooLongError, exceeds_limit
 
 router = APIRouter()
 
+# Maximaal aantal items per batch import en aantal rijen per INSERT statement
+FEEDBACK_BATCH_MAX_ITEMS = int(os.getenv("FEEDBACK_BATCH_MAX_ITEMS", "50000"))
+FEEDBACK_BATCH_INSERT_CHUNK = int(os.getenv("FEEDBACK_BATCH_INSERT_CHUNK", "1000"))
+# Maximale paginagrootte van GET /feedback
+FEEDBACK_LIST_MAX_LIMIT = int(os.getenv("FEEDBACK_LIST_MAX_LIMIT", "1000"))
+
 class FeedbackCreate(BaseModel):
     text: str
     category_id: int
     subject_id: int
 
+class FeedbackBatchCreate(BaseModel):
+    items: List[FeedbackCreate]
+
 @router.post("/feedback")
-def submit_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db)):
-    # Analyze sentiment
-    sentiment_label, sentiment_score, sentiment_confidence = analyze_sentiment(feedback.text)
+async def submit_feedback(feedback: FeedbackCreate, response: Response, db: AsyncSession = Depends(get_db)):
+    if INGEST.enabled:
+        return _enqueue_feedback(feedback, response)
+
+    # Analyze sentiment met de actieve engine (regels: threadpool of process pool)
+    engine = get_engine()
+    started = time.perf_counter()
+    try:
+        # De versie waarmee echt gescoord is (een pool worker kan nog op een oudere zitten);
+        # de taal voor de opgeslagen rij wordt tegelijk in de threadpool herkend, niet op de event loop
+        ((sentiment_label, sentiment_score, sentiment_confidence), lexicon_version), language = (
+            await asyncio.gather(
+                engine.analyze_async_versioned(feedback.text),
+                run_in_threadpool(detect_language, feedback.text)
+            )
+        )
+    except TextTooLongError:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Feedback mag maximaal {SENTIMENT_MAX_TEXT_LENGTH} tekens bevatten"
+        )
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Sentiment analyse duurde te lang, probeer later opnieuw")
+    elapsed = time.perf_counter() - started
     
     # Create feedback entry
     db_feedback = Feedback(
@@ -25,14 +68,19 @@ def submit_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db)):
         sentiment_label=sentiment_label,
         sentiment_score=sentiment_score,
         sentiment_confidence=sentiment_confidence,
+        lexicon_version=lexicon_version,
+        sentiment_engine=engine.name,
+        language=language,
         category_id=feedback.category_id,
         subject_id=feedback.subject_id,
         is_anonymous=True
     )
     
     db.add(db_feedback)
-    db.commit()
-    db.refresh(db_feedback)
+    await db.commit()
+
+    # Shadow mode: alleen in de queue zetten, de kandidaat scoort in de achtergrond
+    SHADOW.offer(feedback.text, (sentiment_label, sentiment_score, sentiment_confidence), elapsed)
     
     return {
         "message": "Feedback succesvol ingediend",
@@ -43,58 +91,223 @@ def submit_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db)):
         }
     }
 
+def _enqueue_feedback(feedback: FeedbackCreate, response: Response):
+    # Write-behind (FEEDBACK_INGEST_MODE=queue): direct 202 met een ticket,
+    # scoren en opslaan gebeurt in de achtergrond thread van app/feedback_ingest.py
+    if exceeds_limit(feedback.text):
+        raise HTTPException(
+            status_code=413,
+            detail=f"Feedback mag maximaal {SENTIMENT_MAX_TEXT_LENGTH} tekens bevatten"
+        )
+    try:
+        ticket = INGEST.submit(feedback)
+    except QueueFullError as error:
+        raise HTTPException(
+            status_code=503,
+            detail=str(error),
+            headers={"Retry-After": str(FEEDBACK_INGEST_RETRY_AFTER)}
+        )
+    response.status_code = 202
+    return {
+        "message": "Feedback ontvangen",
+        "id": ticket,
+        "status": "queued"
+    }
+
+@router.get("/feedback/queue")
+def get_ingest_stats(current_user: User = Depends(get_current_active_user)):
+    # Queue diepte, batch groottes en commit latency van de write-behind ingestie
+    return INGEST.snapshot()
+
+@router.get("/feedback/queue/{ticket}")
+def get_ingest_status(ticket: str):
+    # Status van een ingediende feedback: queued, stored (met id en sentiment) of failed
+    status = INGEST.status(ticket)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Onbekend ticket")
+    return {"id": ticket, **status}
+
+@router.post("/feedback/batch")
+async def submit_feedback_batch(
+    batch: FeedbackBatchCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # Only admin can import feedback in bulk
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Alleen admins kunnen feedback importeren")
+    if len(batch.items) > FEEDBACK_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Maximaal {FEEDBACK_BATCH_MAX_ITEMS} items per batch"
+        )
+
+    # Validate references once for the whole batch
+    category_ids = set((await db.scalars(select(Category.id))).all())
+    subject_ids = set((await db.scalars(select(Subject.id))).all())
+
+    results = [None] * len(batch.items)
+    accepted = []
+    for index, item in enumerate(batch.items):
+        if not item.text.strip():
+            error = "Lege feedback tekst"
+        elif exceeds_limit(item.text):
+            error = "Feedback tekst is te lang"
+        elif item.category_id not in category_ids:
+            error = "Onbekende categorie"
+        elif item.subject_id not in subject_ids:
+            error = "Onbekend vak"
+        else:
+            accepted.append(index)
+            continue
+        results[index] = {"index": index, "status": "rejected", "error": error}
+
+    # Analyze sentiment for all accepted items in one pass (CPU werk, niet op de event loop)
+    engine = get_engine()
+    try:
+        rows = await run_in_threadpool(score_rows, engine, [batch.items[index] for index in accepted])
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Sentiment analyse duurde te lang, probeer later opnieuw")
+
+    # Insert everything in a single transaction, in chunks of multi-row INSERTs
+    ids = []
+    for start in range(0, len(rows), FEEDBACK_BATCH_INSERT_CHUNK):
+        chunk = rows[start:start + FEEDBACK_BATCH_INSERT_CHUNK]
+        ids.extend((await db.scalars(
+            insert(Feedback).returning(Feedback.id, sort_by_parameter_order=True),
+            chunk
+        )).all())
+    await db.commit()
+
+    for index, feedback_id, row in zip(accepted, ids, rows):
+        results[index] = {
+            "index": index,
+            "status": "created",
+            "id": feedback_id,
+            "sentiment": {
+                "label": row["sentiment_label"],
+                "score": row["sentiment_score"],
+                "confidence": row["sentiment_confidence"]
+            }
+        }
+
+    return {
+        "message": f"{len(rows)} van {len(batch.items)} feedback items ingediend",
+        "received": len(batch.items),
+        "created": len(rows),
+        "rejected": len(batch.items) - len(rows),
+        "results": results
+    }
+
+# Header met de cursor voor de volgende pagina van GET /feedback
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, feedback_id: int) -> str:
+    """Opaque cursor voor de positie na (created_at, id)."""
+    raw = json.dumps([created_at.isoformat(), feedback_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, feedback_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(feedback_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Ongeldige cursor")
+
+def _after_cursor(db: AsyncSession, created_at: datetime, feedback_id: int):
+    # SQLite bewaart func.now() als tekst zonder microseconden; vergelijk in
+    # dezelfde tekstvorm, anders sorteert "12:00:07" vóór "12:00:07.000000"
+    if db.get_bind().dialect.name == "sqlite":
+        created_at = literal(created_at.isoformat(sep=" "), String)
+    return tuple_(Feedback.created_at, Feedback.id) < tuple_(created_at, feedback_id)
+
+# Alleen de kolommen uit het antwoord; categorie en vak komen uit een join
+# in dezelfde query (geen lazy load per rij)
+FEEDBACK_LIST_COLUMNS = (
+    Feedback.id,
+    Feedback.text,
+    Feedback.sentiment_label,
+    Feedback.sentiment_score,
+    Feedback.sentiment_confidence,
+    Feedback.lexicon_version,
+    Feedback.sentiment_engine,
+    Feedback.language,
+    Category.name.label("category"),
+    Subject.name.label("subject"),
+    Feedback.created_at,
+)
+
+def feedback_list_query(category_id: Optional[int] = None, subject_id: Optional[int] = None,
+                        sentiment: Optional[str] = None, language: Optional[str] = None):
+    """De query achter GET /feedback (zonder paginatie), ook gebruikt door app.query_plans."""
+    # Nieuwste eerst, met id als tiebreaker zodat de volgorde stabiel is
+    query = (
+        select(*FEEDBACK_LIST_COLUMNS)
+        .outerjoin(Category, Feedback.category_id == Category.id)
+        .outerjoin(Subject, Feedback.subject_id == Subject.id)
+        .order_by(Feedback.created_at.desc(), Feedback.id.desc())
+    )
+    
+    if category_id:
+        query = query.where(Feedback.category_id == category_id)
+    if subject_id:
+        query = query.where(Feedback.subject_id == subject_id)
+    if sentiment:
+        query = query.where(Feedback.sentiment_label == sentiment)
+    if language:
+        query = query.where(Feedback.language == language)
+    return query
+
 @router.get("/feedback")
-def get_feedback(
+async def get_feedback(
+    response: Response,
     skip: int = 0, 
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=FEEDBACK_LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
     category_id: Optional[int] = None,
     subject_id: Optional[int] = None,
     sentiment: Optional[str] = None,
+    language: Optional[str] = None,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(Feedback)
+    query = feedback_list_query(category_id, subject_id, sentiment, language)
     
-    if category_id:
-        query = query.filter(Feedback.category_id == category_id)
-    if subject_id:
-        query = query.filter(Feedback.subject_id == subject_id)
-    if sentiment:
-        query = query.filter(Feedback.sentiment_label == sentiment)
+    if cursor:
+        # Keyset paginatie: elke pagina is een index range scan vanaf de
+        # cursor, onafhankelijk van de diepte (geen OFFSET)
+        query = query.where(_after_cursor(db, *decode_cursor(cursor)))
+    elif skip:
+        query = query.offset(skip)
     
-    feedback_list = query.offset(skip).limit(limit).all()
+    # Eén rij extra om te weten of er een volgende pagina is
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if last.created_at is not None:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
     
-    return [
-        {
-            "id": f.id,
-            "text": f.text,
-            "sentiment_label": f.sentiment_label,
-            "sentiment_score": f.sentiment_score,
-            "sentiment_confidence": f.sentiment_confidence,
-            "category": f.category.name if f.category else None,
-            "subject": f.subject.name if f.subject else None,
-            "created_at": f.created_at
-        }
-        for f in feedback_list
-    ]
+    return [dict(row._mapping) for row in rows]
 
 @router.delete("/feedback/{feedback_id}")
-def delete_feedback(
+async def delete_feedback(
     feedback_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Only admin can delete feedback
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Alleen admins kunnen feedback verwijderen")
 
     # Find feedback
-    feedback = db.query(Feedback).filter(Feedback.id == feedback_id).first()
+    feedback = await db.get(Feedback, feedback_id)
     if not feedback:
         raise HTTPException(status_code=404, detail="Feedback niet gevonden")
 
     # Delete feedback
-    db.delete(feedback)
-    db.commit()
+    await db.delete(feedback)
+    await db.commit()
 
     return {"message": "Feedback succesvol verwijderd"}
@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from .models import User
+from .auth import get_current_active_user
+from . import lexicon, sentiment, sentiment_engines, sentiment_preview, sentiment_profiler, sentiment_shadow
+
+router = APIRouter()
+
+@router.get("/cache")
+def get_cache_stats(current_user: User = Depends(get_current_active_user)):
+    return sentiment.RESULT_CACHE.stats()
+
+@router.delete("/cache")
+def clear_cache(current_user: User = Depends(get_current_active_user)):
+    # Only admin can clear the cache
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    sentiment.RESULT_CACHE.clear()
+    return {"message": "Sentiment cache geleegd"}
+
+@router.get("/engines")
+def get_engines(current_user: User = Depends(get_current_active_user)):
+    # Geregistreerde engines; "active" = SENTIMENT_ENGINE voor nieuwe feedback
+    return sentiment_engines.list_engines()
+
+@router.get("/lexicon")
+def get_lexicon_info(current_user: User = Depends(get_current_active_user)):
+    return lexicon.get_lexicon().info()
+
+@router.post("/lexicon/reload")
+def reload_lexicon(current_user: User = Depends(get_current_active_user)):
+    # Only admin can reload the lexicon
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    previous = lexicon.get_lexicon().version
+    try:
+        compiled = lexicon.reload_lexicon()
+    except lexicon.LexiconError as error:
+        raise HTTPException(status_code=422, detail=str(error))
+    return {
+        "message": "Lexicon herladen",
+        "previous_version": previous,
+        "version": compiled.version,
+        "changed": compiled.version != previous
+    }
+
+@router.get("/profile")
+def get_profile(top: int = 25, current_user: User = Depends(get_current_active_user)):
+    # Hit-rate en latency per stage; unmatched_candidates (alleen bij SENTIMENT_PROFILE=1) = zinnen zonder hit sinds de reset
+    return sentiment_profiler.PROFILER.snapshot(lexicon.get_lexicon(), top=top)
+
+@router.delete("/profile")
+def reset_profile(current_user: User = Depends(get_current_active_user)):
+    # Only admin can reset the profiler
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    sentiment_profiler.PROFILER.reset()
+    return {"message": "Sentiment profiler gereset"}
+
+@router.get("/shadow")
+def get_shadow(current_user: User = Depends(get_current_active_user)):
+    # Overeenstemming en latency van de kandidaat engine t.o.v. productie
+    return sentiment_shadow.SHADOW.snapshot()
+
+@router.delete("/shadow")
+def reset_shadow(current_user: User = Depends(get_current_active_user)):
+    # Only admin can reset the shadow statistics
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    sentiment_shadow.SHADOW.reset()
+    return {"message": "Shadow statistieken gereset"}
+
+@router.get("/preview")
+def get_preview_stats(current_user: User = Depends(get_current_active_user)):
+    # Actieve en geweigerde live preview verbindingen
+    return sentiment_preview.SESSIONS.stats()
+
+@router.websocket("/preview")
+async def preview_socket(websocket: WebSocket):
+    # Live preview tijdens het typen, anoniem net als /test-sentiment
+    await websocket.accept()
+    if not sentiment_preview.SESSIONS.acquire():
+        # 1013 = "try again later": de frontend valt terug op /test-sentiment
+        await websocket.close(code=sentiment_preview.CLOSE_TRY_AGAIN_LATER, reason="Te veel preview verbindingen")
+        return
+    session = None
+    try:
+        session = sentiment_preview.new_session()
+        await sentiment_preview.serve(websocket, session)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sentiment_preview.SESSIONS.release(session)
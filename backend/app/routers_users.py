@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .database import get_db
 from .models import User
 from .auth import get_current_active_user
@@ -18,12 +19,12 @@ def get_current_user_info(current_user: User = Depends(get_current_active_user))
     }
 
 @router.get("/")
-def get_users(current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+async def get_users(current_user: User = Depends(get_current_active_user), db: AsyncSession = Depends(get_db)):
     # Only admin can see all users
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    users = db.query(User).all()
+    users = (await db.scalars(select(User))).all()
     return [
         {
             "id": user.id,
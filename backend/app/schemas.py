@@ -53,6 +53,9 @@ class Feedback(FeedbackBase):
     sentiment_label: Optional[str]
     sentiment_score: Optional[float]
     sentiment_confidence: Optional[float]
+    lexicon_version: Optional[str] = None
+    sentiment_engine: Optional[str] = None
+    language: Optional[str] = None
     is_anonymous: bool
     created_at: datetime
 
@@ -0,0 +1,95 @@
+# Lengtegrens en gesegmenteerde scoring voor lange feedback teksten
+#
+# Aggregatieregel (spiegelt de regel-cascade voor korte teksten):
+#   1. Segmenten die door een regel beslist zijn (confidence >= 0.8) gaan voor
+#      segmenten die via de polariteit fallback (confidence <= 0.6) beslist zijn.
+#   2. Binnen de regel-segmenten wint Negative van Positive, Positive van
+#      Neutral ("negatief wint", net als in de woord-analyse). Score en
+#      confidence zijn het gemiddelde van de segmenten met het winnende label.
+#   3. Zonder regel-segmenten: lengte-gewogen gemiddelde fallback polariteit
+#      met dezelfde drempels als de fallback (> 0.1 Positive, < -0.1 Negative).
+
+import os
+from typing import List, Sequence, Tuple
+
+# Harde grens (tekens); langere teksten worden afgekapt of geweigerd vóór het scoren
+SENTIMENT_MAX_TEXT_LENGTH = int(os.getenv("SENTIMENT_MAX_TEXT_LENGTH", "20000"))
+# "truncate" (standaard) of "reject"
+SENTIMENT_OVERSIZE_POLICY = os.getenv("SENTIMENT_OVERSIZE_POLICY", "truncate").lower()
+# Teksten langer dan dit worden in segmenten van maximaal deze lengte gescoord
+SENTIMENT_SEGMENT_LENGTH = int(os.getenv("SENTIMENT_SEGMENT_LENGTH", "2000"))
+
+RULE_CONFIDENCE = 0.8
+LABEL_PRIORITY = ("Negative", "Positive", "Neutral")
+
+SENTENCE_BREAKS = (". ", "! ", "? ", "; ", "\n")
+CLAUSE_BREAKS = (", ", ": ")
+
+
+class TextTooLongError(ValueError):
+    """De tekst is langer dan SENTIMENT_MAX_TEXT_LENGTH en de policy is 'reject'."""
+    pass
+
+
+def exceeds_limit(text: str) -> bool:
+    """True als de tekst geweigerd zou worden door bound_text."""
+    return SENTIMENT_OVERSIZE_POLICY == "reject" and len(text) > SENTIMENT_MAX_TEXT_LENGTH
+
+
+def bound_text(text: str) -> str:
+    """Pas de harde lengtegrens toe: afkappen of TextTooLongError."""
+    if len(text) <= SENTIMENT_MAX_TEXT_LENGTH:
+        return text
+    if SENTIMENT_OVERSIZE_POLICY == "reject":
+        raise TextTooLongError(
+            f"Tekst is {len(text)} tekens, maximaal {SENTIMENT_MAX_TEXT_LENGTH} toegestaan"
+        )
+    return text[:SENTIMENT_MAX_TEXT_LENGTH]
+
+
+def _cut_position(window: str) -> int:
+    # Liefst na een zin, anders na een bijzin, anders op een spatie;
+    # niet in het eerste kwart zodat er geen mini-segmenten ontstaan
+    minimum = len(window) // 4
+    for breaks in (SENTENCE_BREAKS, CLAUSE_BREAKS):
+        position = max(window.rfind(mark) for mark in breaks)
+        if position >= minimum:
+            return position + 1
+    position = window.rfind(" ")
+    return position + 1 if position >= minimum else len(window)
+
+
+def split_segments(text: str, max_length: int = SENTIMENT_SEGMENT_LENGTH) -> List[str]:
+    """
+    Knip een tekst op zin- of bijzingrenzen in segmenten van maximaal
+    max_length tekens. Korte teksten blijven één segment (ongewijzigd).
+    """
+    if max_length <= 0 or len(text) <= max_length:
+        return [text]
+    segments = []
+    start = 0
+    while len(text) - start > max_length:
+        cut = _cut_position(text[start:start + max_length])
+        segments.append(text[start:start + cut])
+        start += cut
+    segments.append(text[start:])
+    return [segment for segment in (segment.strip() for segment in segments) if segment]
+
+
+def aggregate_segments(scored: Sequence[Tuple[int, Tuple[str, float, float]]]) -> Tuple[str, float, float]:
+    """Combineer (segment lengte, (label, score, confidence)) volgens de regel bovenaan."""
+    decisive = [result for _, result in scored if result[2] >= RULE_CONFIDENCE]
+    for label in LABEL_PRIORITY:
+        matching = [result for result in decisive if result[0] == label]
+        if matching:
+            score = sum(result[1] for result in matching) / len(matching)
+            confidence = sum(result[2] for result in matching) / len(matching)
+            return (label, score, confidence)
+
+    total = sum(length for length, _ in scored)
+    polarity = sum(length * result[1] for length, result in scored) / total if total else 0.0
+    if polarity > 0.1:
+        return ("Positive", polarity, 0.6)
+    if polarity < -0.1:
+        return ("Negative", polarity, 0.6)
+    return ("Neutral", polarity, 0.5)
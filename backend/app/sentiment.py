@@ -1,352 +1,291 @@
 import os
-from textblob import TextBlob
-from difflib import SequenceMatcher
+from functools import lru_cache
+
+from .fuzzy_index import FuzzyIndex
+from .language import DEFAULT_LANGUAGE, SENTIMENT_LANGUAGE_ROUTING, detect_language
+from .lexicon import CompiledLexicon, get_lexicon
+from .polarity import get_fallback
+from .segmentation import aggregate_segments, bound_text, split_segments
+from .sentiment_cache import SentimentCache, content_key
+from .sentiment_profiler import PROFILER, ProfileSample
+from .sentiment_trace import SentimentTrace
+from .tokenizer import Tokens
 
 POSITIVE_THRESHOLD = float(os.getenv("POSITIVE_THRESHOLD", "0.1"))
 NEGATIVE_THRESHOLD = float(os.getenv("NEGATIVE_THRESHOLD", "-0.1"))
 
-# Geavanceerde Nederlandse sentiment woordenboek
-STRONG_NEGATIVE = [
-    'kk', 'kanker', 'racist', 'racistisch', 'kut', 'shit', 'klote', 'kak',
-    'verschrikkelijk', 'afschuwelijk', 'vreselijk', 'waardeloos', 'idioot',
-    'tering', 'godverdomme', 'klootzak', 'lul', 'eikel', 'hoer', 'hoeren'
-]
-
-NEGATIVE_WORDS = [
-    'slecht', 'dom', 'stom', 'achterlijk', 'debiel', 'mongool', 'lui', 
-    'nutteloos', 'irritant', 'vervelend', 'rot', 'sukkel', 'saai',
-    'onnozel', 'zinloos', 'onzin', 'belachelijk', 'idioot', 'stom',
-    'verkeerd', 'fout', 'mislukt', 'teleurstellend', 'zwak', 'slap'
-]
-
-NEGATIVE_PHRASES = [
-    'niet goed', 'niet leuk', 'niet fijn', 'niet prettig', 'niet duidelijk',
-    'niet handig', 'niet nuttig', 'niet interessant', 'niet boeiend',
-    'niet makkelijk', 'niet begrijpelijk', 'niet overzichtelijk', 'niet leerrijk',
-    'beetje onnozel', 'niet zo', 'weinig leerrijk', 'te simpel', 'te makkelijk',
-    'geen zin', 'geen nut', 'geen waarde', 'verspilling van tijd'
-]
-
-POSITIVE_WORDS = [
-    'geweldig', 'fantastisch', 'super', 'excellent', 'perfect', 'mooi',
-    'goed', 'goeie', 'goede', 'leuk', 'fijn', 'prettig', 'duidelijk', 'helder', 'inspirerend',
-    'top', 'prima', 'uitstekend', 'cool', 'nice', 'lief', 'aardig',
-    'vriendelijk', 'behulpzaam', 'interessant', 'boeiend', 'nuttig',
-    'handig', 'makkelijk', 'begrijpelijk', 'overzichtelijk', 'leerrijk',
-    'knap', 'slim', 'intelligent', 'vakkundig', 'professioneel', 'deskundig',
-    'gemotiveerd', 'enthousiast', 'energiek', 'actief', 'betrokken', 'toegewijd',
-    'gepassioneerd', 'gedreven', 'zorgzaam', 'attent', 'geduldig', 'ondersteunend',
-    'creatief', 'innovatief', 'flexibel', 'aanpasbaar', 'betrouwbaar', 'punctueel',
-    'georganiseerd', 'gestructureerd', 'systematisch', 'efficiënt', 'effectief'
-]
+# De woordenlijsten staan in app/data/sentiment_lexicon_nl.json en worden door
+# app/lexicon.py gecompileerd (frozensets, phrase automaat, fuzzy index).
 
-# Context modifiers - woorden die sentiment kunnen veranderen
-INTENSIFIERS = ['heel', 'zeer', 'erg', 'super', 'enorm', 'extreem', 'echt', 'hartstikke', 'ontzettend', 'verschrikkelijk', 'geweldig', 'fantastisch', 'buitengewoon', 'uitzonderlijk']
-DIMINISHERS = ['beetje', 'een beetje', 'iets', 'enigszins', 'redelijk', 'tamelijk', 'vrij', 'nogal', 'best', 'wel']
-NEGATORS = ['niet', 'geen', 'nooit', 'niemand', 'niets', 'nergens']
+# Polariteit voor teksten waar geen Nederlandse regel op matcht: standaard de
+# voorberekende tabel uit app/polarity.py, TextBlob via SENTIMENT_FALLBACK=textblob
+FALLBACK_POLARITY = get_fallback()
 
-# Nederlandse positieve uitroepen en bevestigingen
-POSITIVE_EXCLAMATIONS = ['ja!', 'top!', 'geweldig!', 'perfect!', 'prima!', 'mooi!', 'goed zo!', 'precies!', 'klopt!', 'helemaal goed!']
+@lru_cache(maxsize=32)
+def _fuzzy_index_for(targets: tuple) -> FuzzyIndex:
+    return FuzzyIndex(targets)
 
 def fuzzy_match(word: str, target_list: list, threshold: float = 0.8) -> tuple[bool, str]:
     """
-    Fuzzy matching voor schrijffouten.
+    Fuzzy matching voor schrijffouten via een (gecachete) fuzzy index.
     Returns (match_found, matched_word)
     """
-    for target in target_list:
-        # Simpele Levenshtein-achtige matching
-        similarity = SequenceMatcher(None, word.lower(), target.lower()).ratio()
-        if similarity >= threshold:
-            return True, target
-    return False, ""
+    return _fuzzy_index_for(tuple(target_list)).lookup(word, threshold)
+
+def match_phrase_stage(text_lower: str, trace: SentimentTrace | None = None) -> tuple[int, str] | None:
+    """
+    Hoogst geprioriteerde stage met een match in het actieve lexicon.
+    Returns (stage_index, phrase) of None.
+    """
+    return get_lexicon().match_stage(text_lower, trace)
 
-# Schrijffout varianten van belangrijke woorden
-SPELLING_VARIANTS = {
-    'racist': ['rassist', 'rasist', 'racis', 'rassis'],
-    'racistisch': ['rassistisch', 'rasistisch', 'racistich', 'rassistich'],
-    'leerkrachten': ['kleerkrachten', 'lerkrachten', 'leerkrachte', 'kleerkrachte'],
-    'onnozel': ['onozzel', 'onozel', 'onnosel', 'onozzel'],
-    'slecht': ['slegt', 'sleght', 'slech'],
-    'verschrikkelijk': ['verschrikelijk', 'verschrikkeljk', 'verschrikeljk'],
-    'waardeloos': ['waardeloss', 'waardelos', 'waardeloze'],
-    'motivatie': ['motivasie', 'motivacie', 'motivati']
-}
+# Resultaten cache: SENTIMENT_CACHE_SIZE=0 schakelt de cache uit, TTL=0 = geen verloop
+RESULT_CACHE = SentimentCache(
+    maxsize=int(os.getenv("SENTIMENT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("SENTIMENT_CACHE_TTL", "3600")),
+)
+
+def get_cached_sentiment(text: str) -> tuple[str, float, float] | None:
+    """Gecachet resultaat voor deze tekst onder de huidige lexicon versie, of None."""
+    if not RESULT_CACHE.enabled:
+        return None
+    version = get_lexicon().version
+    RESULT_CACHE.sync_version(version)
+    return RESULT_CACHE.get(content_key(text, version))
+
+def cache_sentiment(text: str, result: tuple[str, float, float], lexicon_version: str | None = None) -> None:
+    if RESULT_CACHE.enabled:
+        RESULT_CACHE.put(content_key(text, lexicon_version or get_lexicon().version), result)
 
 def analyze_sentiment(text: str) -> tuple[str, float, float]:
     """
     Nederlandse sentiment analyse met verbeterde negatie detectie.
     Detecteert constructieve kritiek en subtiele negatieve patronen.
+    Resultaten worden gecachet op (lexicon versie, genormaliseerde tekst).
+    Lange teksten worden begrensd en per segment gescoord (zie app/segmentation.py).
     
     Returns:
         tuple: (label, score, confidence)
+    Raises:
+        TextTooLongError: als de tekst te lang is en de policy 'reject' is
     """
-    text_lower = text.lower().strip()
-    
-    print(f"\n=== ANALYZING: '{text}' ===")
+    text = bound_text(text)
+    result = get_cached_sentiment(text)
+    if result is not None:
+        if PROFILER.enabled:
+            PROFILER.record_cache_hit()
+        return result
+    lexicon = get_lexicon()
+    segments = split_segments(text)
+    if len(segments) == 1:
+        result = _score(text, lexicon)
+    else:
+        result = aggregate_segments([(len(segment), _score(segment, lexicon)) for segment in segments])
+    cache_sentiment(text, result, lexicon.version)
+    return result
 
-    # DIRECT NEGATIVE DETECTION - INCLUSIEF SUBTIELE KRITIEK
-    SUPER_NEGATIVE_TRIGGERS = [
-        'racist', 'racistisch', 'kk', 'kanker', 'kut', 'shit', 'klote',
-        'onnozel', 'dom', 'stom', 'waardeloos', 'verschrikkelijk',
-        'niet goed', 'niet leuk', 'niet leerrijk', 'beetje onnozel',
-        'hebben nood aan', 'moeten beter', 'kunnen beter', 'missen',
-        'ontbreekt', 'tekort', 'probleem', 'klacht', 'verbetering nodig',
-        'onnodige', 'onnodig', 'moeilijker te volgen', 'moeilijk te volgen',
-        'te moeilijk', 'verwarrend', 'onduidelijk', 'chaotisch'
-    ]
-    
-    # NEGATION NEUTRALIZERS - "niet + negatief woord" = NEUTRAAL
-    NEGATION_NEUTRALIZERS = [
-        'niet slecht', 'niet zo slecht', 'niet erg slecht', 'niet heel slecht',
-        'niet verschrikkelijk', 'niet waardeloos', 'niet zo erg'
-    ]
+def _score(text: str, lexicon: CompiledLexicon) -> tuple[str, float, float]:
+    if not PROFILER.should_sample():
+        return _analyze_uncached(text, lexicon=lexicon)
+    sample = PROFILER.sample()
+    result = _analyze_uncached(text, sample, lexicon)
+    PROFILER.record(sample)
+    return result
 
-    # NEGATION NEGATIVE - "niet + positief woord" = NEGATIEF
-    NEGATION_NEGATIVE = [
-        'niet goed', 'niet zo goed', 'niet erg goed', 'niet heel goed',
-        'niet leuk', 'niet zo leuk', 'niet erg leuk', 'niet heel leuk',
-        'niet fijn', 'niet zo fijn', 'niet prettig', 'niet zo prettig',
-        'niet duidelijk', 'niet zo duidelijk', 'niet helder', 'niet zo helder',
-        'niet interessant', 'niet zo interessant', 'niet boeiend', 'niet zo boeiend',
-        'niet nuttig', 'niet zo nuttig', 'niet handig', 'niet zo handig',
-        'niet makkelijk', 'niet zo makkelijk', 'niet begrijpelijk', 'niet zo begrijpelijk',
-        'niet overzichtelijk', 'niet zo overzichtelijk', 'niet leerrijk', 'niet zo leerrijk',
-        'niet georganiseerd', 'niet goed georganiseerd', 'niet zo goed georganiseerd',
-        'niet gemotiveerd', 'niet zo gemotiveerd', 'niet erg gemotiveerd', 'niet heel gemotiveerd',
-        'niet enthousiast', 'niet zo enthousiast', 'niet energiek', 'niet zo energiek',
-        'niet actief', 'niet zo actief', 'niet betrokken', 'niet zo betrokken',
-        'niet toegewijd', 'niet zo toegewijd', 'niet gedreven', 'niet zo gedreven',
-        'niet zorgzaam', 'niet zo zorgzaam', 'niet geduldig', 'niet zo geduldig',
-        'niet ondersteunend', 'niet zo ondersteunend', 'niet behulpzaam', 'niet zo behulpzaam',
-        'niet creatief', 'niet zo creatief', 'niet flexibel', 'niet zo flexibel',
-        'niet betrouwbaar', 'niet zo betrouwbaar', 'niet punctueel', 'niet zo punctueel',
-        'niet gestructureerd', 'niet zo gestructureerd', 'niet efficiënt', 'niet zo efficiënt'
-    ]
-    
-    # NEUTRAL/OK INDICATORS
-    NEUTRAL_INDICATORS = [
-        'het is ok', 'is ok', 'gaat wel', 'kan ermee door', 'redelijk',
-        'niet slecht', 'wel ok', 'prima zo', 'acceptabel'
-    ]
-    
-    SUPER_POSITIVE_TRIGGERS = [
-        'geweldig', 'fantastisch', 'super', 'perfect', 'excellent',
-        'heel goed', 'erg leuk', 'zeer interessant', 'goeie leerkracht',
-        'goede leerkracht', 'goeie docent', 'goede docent', 'top docent',
-        'prima leerkracht', 'uitstekende', 'knap', 'slim', 'vakkundig'
-    ]
+def analyze_with_lexicon(text: str, lexicon: CompiledLexicon) -> tuple[str, float, float]:
+    """
+    Analyse met een expliciete lexicon snapshot, bv. een kandidaat lexicon in
+    shadow mode. Zonder resultaten cache en zonder profiler.
+    """
+    text = bound_text(text)
+    segments = split_segments(text)
+    if len(segments) == 1:
+        return _analyze_uncached(text, lexicon=lexicon)
+    return aggregate_segments([
+        (len(segment), _analyze_uncached(segment, lexicon=lexicon)) for segment in segments
+    ])
 
-    # NEDERLANDSE POSITIEVE PATRONEN
-    POSITIVE_PATTERNS = [
-        'heel goed', 'erg goed', 'zeer goed', 'super goed', 'ontzettend goed',
-        'heel leuk', 'erg leuk', 'zeer leuk', 'super leuk', 'ontzettend leuk',
-        'heel fijn', 'erg fijn', 'zeer fijn', 'super fijn', 'ontzettend fijn',
-        'heel duidelijk', 'erg duidelijk', 'zeer duidelijk', 'super duidelijk',
-        'heel interessant', 'erg interessant', 'zeer interessant', 'super interessant',
-        'heel nuttig', 'erg nuttig', 'zeer nuttig', 'super nuttig',
-        'heel handig', 'erg handig', 'zeer handig', 'super handig',
-        'heel behulpzaam', 'erg behulpzaam', 'zeer behulpzaam', 'super behulpzaam',
-        'heel gemotiveerd', 'erg gemotiveerd', 'zeer gemotiveerd', 'super gemotiveerd',
-        'heel enthousiast', 'erg enthousiast', 'zeer enthousiast', 'super enthousiast',
-        'heel betrokken', 'erg betrokken', 'zeer betrokken', 'super betrokken',
-        'heel geduldig', 'erg geduldig', 'zeer geduldig', 'super geduldig',
-        'heel creatief', 'erg creatief', 'zeer creatief', 'super creatief',
-        'heel professioneel', 'erg professioneel', 'zeer professioneel', 'super professioneel',
-        'goed uitgelegd', 'duidelijk uitgelegd', 'helder uitgelegd', 'prima uitgelegd',
-        'goed georganiseerd', 'prima georganiseerd', 'netjes georganiseerd',
-        'fijne leerkracht', 'aardige leerkracht', 'lieve leerkracht', 'vriendelijke leerkracht',
-        'fijne docent', 'aardige docent', 'lieve docent', 'vriendelijke docent',
-        'goede begeleiding', 'fijne begeleiding', 'prima begeleiding', 'uitstekende begeleiding',
-        'leuke lessen', 'interessante lessen', 'boeiende lessen', 'leerzame lessen',
-        'goed tempo', 'fijn tempo', 'prima tempo', 'geschikt tempo',
-        'duidelijke uitleg', 'heldere uitleg', 'goede uitleg', 'prima uitleg',
-        'nuttige feedback', 'goede feedback', 'constructieve feedback', 'waardevolle feedback',
-        'prettige sfeer', 'goede sfeer', 'fijne sfeer', 'ontspannen sfeer',
-        'goed bereikbaar', 'makkelijk bereikbaar', 'altijd bereikbaar',
-        'snel antwoord', 'snelle reactie', 'goede communicatie', 'duidelijke communicatie',
-        'ben tevreden', 'ben blij', 'vind het fijn', 'vind het leuk', 'vind het goed',
-        'ben positief', 'ben enthousiast', 'raad aan', 'beveel aan', 'zou aanraden',
-        'hou van', 'vind leuk', 'vind goed', 'vind fijn', 'vind interessant',
-        'goede ervaring', 'positieve ervaring', 'fijne ervaring', 'leuke ervaring',
-        'tevreden over', 'blij met', 'content met', 'happy met', 'dankbaar voor',
-        'waardeer het', 'stel op prijs', 'ben dankbaar', 'appreciate',
-        'goed gedaan', 'knap gedaan', 'mooi gedaan', 'prima gedaan', 'netjes gedaan',
-        'chapeau', 'petje af', 'respect', 'waardering', 'complimenten'
-    ]
-    
-    # EERST: CHECK VOOR NEGATION NEGATIVE - "niet goed" = NEGATIEF
-    for negation_neg in NEGATION_NEGATIVE:
-        if negation_neg in text_lower:
-            print(f"NEGATION NEGATIVE FOUND: '{negation_neg}' - FORCING NEGATIVE")
-            return "Negative", -0.7, 0.8
+def explain_sentiment(text: str) -> SentimentTrace:
+    """
+    Analyseer een tekst met tracing aan (altijd zonder cache).
+    De trace bevat alle gevonden zinnen, de toegepaste woordregels met hun
+    gewicht, de tellingen en de stage die het label bepaalde. Bij een lange
+    tekst bevat de trace per segment een eigen trace.
+    """
+    text = bound_text(text)
+    segments = split_segments(text)
+    trace = SentimentTrace(text)
+    if len(segments) == 1:
+        _analyze_uncached(text, trace)
+        return trace
+    trace.phase("segments")
+    parts = []
+    for segment in segments:
+        part = SentimentTrace(segment)
+        _analyze_uncached(segment, part)
+        parts.append(part)
+    trace.segments = [part.to_dict() for part in parts]
+    trace.decide("segments", aggregate_segments([(len(part.text), part.result) for part in parts]))
+    return trace
 
-    # TWEEDE: CHECK VOOR NEUTRALIZERS - "niet slecht" = NEUTRAAL
-    for neutralizer in NEGATION_NEUTRALIZERS:
-        if neutralizer in text_lower:
-            print(f"NEUTRALIZER FOUND: '{neutralizer}' - FORCING NEUTRAL")
-            return "Neutral", 0.0, 0.8
-    
-    # TWEEDE: CHECK VOOR NEUTRAL INDICATORS
-    for indicator in NEUTRAL_INDICATORS:
-        if indicator in text_lower:
-            print(f"NEUTRAL INDICATOR FOUND: '{indicator}' - FORCING NEUTRAL")
-            return "Neutral", 0.0, 0.8
-    
-    # DERDE: CHECK FOR IMMEDIATE NEGATIVE TRIGGERS (EXACT + FUZZY)
-    for trigger in SUPER_NEGATIVE_TRIGGERS:
-        if trigger in text_lower:
-            print(f"NEGATIVE TRIGGER FOUND (EXACT): '{trigger}'")
-            return "Negative", -0.8, 0.9
-    
-    # CHECK FOR SPELLING VARIANTS OF TRIGGERS
-    spelling_trigger_variants = {
-        'racistisch': ['rassistisch', 'rasistisch', 'racistich'],
-        'racist': ['rassist', 'rasist'],
-        'onnozel': ['onozzel', 'onozel'],
-        'verschrikkelijk': ['verschrikelijk', 'verschrikkeljk']
-    }
-    
-    for correct_trigger, variants in spelling_trigger_variants.items():
-        for variant in variants:
-            if variant in text_lower:
-                print(f"NEGATIVE TRIGGER FOUND (SPELLING): '{variant}' -> '{correct_trigger}'")
-                return "Negative", -0.8, 0.9
-    
-    # CHECK FOR IMMEDIATE POSITIVE TRIGGERS
-    for trigger in SUPER_POSITIVE_TRIGGERS:
-        if trigger in text_lower:
-            print(f"POSITIVE TRIGGER FOUND (EXACT): '{trigger}'")
-            return "Positive", 0.8, 0.9
+def _analyze_uncached(text: str, trace: SentimentTrace | ProfileSample | None = None,
+                      lexicon: CompiledLexicon | None = None) -> tuple[str, float, float]:
+    # Eén snapshot voor de hele analyse, ook als er ondertussen herladen wordt
+    lexicon = lexicon or get_lexicon()
+    text_lower = text.lower().strip()
 
-    # CHECK FOR POSITIVE PATTERNS
-    for pattern in POSITIVE_PATTERNS:
-        if pattern in text_lower:
-            print(f"POSITIVE PATTERN FOUND: '{pattern}'")
-            return "Positive", 0.7, 0.8
+    # ZIN-STAGES: negaties, neutralizers, triggers en patronen in één pass
+    stage_match = lexicon.match_stage(text_lower, trace)
+    if stage_match is not None:
+        stage_index, phrase = stage_match
+        stage_name, _, result = lexicon.stages[stage_index]
+        if trace is not None:
+            trace.rule(stage_name, "phrase", phrase)
+            trace.decide(stage_name, result)
+        return result
+
+    # TAALHERKENNING: niet-Nederlandse tekst slaat de woord-analyse en fuzzy
+    # matching over (die zouden toch in de fallback eindigen) en gaat direct
+    # naar de polariteit. Een Nederlandse zin-match hierboven gaat altijd voor.
+    if SENTIMENT_LANGUAGE_ROUTING:
+        result = language_result(text, text_lower, trace)
+        if result is not None:
+            return result
 
-    # CHECK FOR POSITIVE EXCLAMATIONS
-    for exclamation in POSITIVE_EXCLAMATIONS:
-        if exclamation in text_lower:
-            print(f"POSITIVE EXCLAMATION FOUND: '{exclamation}'")
-            return "Positive", 0.8, 0.9
-    
-    # SPECIAL PATTERNS - SUBTLE NEGATIVITY + CONSTRUCTIEVE KRITIEK
-    SUBTLE_NEGATIVE_PATTERNS = [
-        'hebben nood aan', 'hebben behoefte aan', 'zouden moeten', 'kunnen beter',
-        'missen nog', 'ontbreekt nog', 'zou fijn zijn als', 'hopelijk wordt',
-        'jammer dat', 'spijtig dat', 'zou helpen als', 'meer aandacht voor',
-        'vaak onnodige', 'te veel', 'te weinig', 'moeilijker maakt',
-        'maakt het moeilijk', 'zorgt voor verwarring', 'leidt tot problemen',
-        'veroorzaakt', 'hindert', 'stoort', 'belemmert', 'bemoeilijkt',
-        'slecht georganiseerd', 'niet georganiseerd', 'chaotisch', 'rommelig',
-        'door elkaar', 'onduidelijke structuur', 'geen structuur', 'warrig',
-        'verwarrende opzet', 'slechte planning', 'geen planning', 'ongestructureerd'
-    ]
-    
-    for pattern in SUBTLE_NEGATIVE_PATTERNS:
-        if pattern in text_lower:
-            print(f"SUBTLE NEGATIVE PATTERN FOUND: '{pattern}'")
-            return "Negative", -0.6, 0.8
-    
-    # EXTRA: PROBLEEM-VEROORZAKENDE PATRONEN
-    PROBLEM_CAUSING_PATTERNS = [
-        'maakt moeilijker', 'maakt het moeilijk', 'maakt verwarrend',
-        'zorgt voor problemen', 'leidt tot verwarring', 'veroorzaakt problemen',
-        'commentaren wat', 'gedrag wat', 'houding die'
-    ]
-    
-    for pattern in PROBLEM_CAUSING_PATTERNS:
-        if pattern in text_lower:
-            print(f"PROBLEM-CAUSING PATTERN FOUND: '{pattern}'")
-            return "Negative", -0.7, 0.8
-    
     # SLIMME WORD-BY-WORD ANALYSE MET NEGATIE CONTEXT
-    words = text_lower.split()
+    if trace is not None:
+        trace.phase("word_loop")
+    tokens = Tokens(text_lower)
+    negative_count, positive_count = count_words(tokens.clean, tokens.negation, lexicon, trace)
+    return word_result(text, negative_count, positive_count, trace)
+
+def language_result(text: str, text_lower: str,
+                    trace: SentimentTrace | ProfileSample | None = None) -> tuple[str, float, float] | None:
+    """Fallback resultaat voor niet-Nederlandse tekst, None voor Nederlands."""
+    if trace is not None:
+        trace.phase("language")
+    language = detect_language(text_lower)
+    if language == DEFAULT_LANGUAGE:
+        return None
+    result = _fallback_result(FALLBACK_POLARITY(text))
+    if trace is not None:
+        trace.rule("language", "detected", language)
+        trace.decide(f"language:{language}", result)
+    return result
+
+def count_words(clean_words: list[str], negation: dict[int, str], lexicon: CompiledLexicon,
+                trace: SentimentTrace | ProfileSample | None = None,
+                start: int = 0, stop: int | None = None) -> tuple[int, int]:
+    """
+    Woordregels over de tokens [start, stop). Een token hangt alleen af van
+    zichzelf en de twee tokens ervoor (negatie venster, intensifier), zodat
+    een deelbereik opnieuw geteld kan worden (zie app/sentiment_preview.py).
+    Returns (negative_count, positive_count)
+    """
     negative_count = 0
     positive_count = 0
 
-    for i, word in enumerate(words):
-        clean_word = word.strip('.,!?;:"()[]{}')
-        
-        # CHECK VOOR NEGATIE CONTEXT
-        if i > 0 and words[i-1] == 'niet':
+    for i, clean_word in enumerate(clean_words[start:stop], start):
+        # CHECK VOOR NEGATIE CONTEXT ("niet" / "niet zo" direct ervoor)
+        window = negation.get(i) if negation else None
+        if window is not None:
             # "niet + negatief woord" = NEUTRAAL (skip)
-            if clean_word in ['slecht', 'verschrikkelijk', 'waardeloos', 'dom', 'stom']:
-                print(f"NEGATION NEUTRALIZER: 'niet {clean_word}' - SKIPPING NEGATIVE")
+            if window == "niet" and clean_word in lexicon.negation_neutralized:
+                if trace is not None:
+                    trace.rule("word_loop", "negation_neutralizer", f"niet {clean_word}")
                 continue  # Skip deze negatieve woord omdat het geneutraliseerd is
 
-            # "niet + positief woord" = NEGATIEF (count as negative)
-            if clean_word in ['goed', 'goeie', 'goede', 'leuk', 'fijn', 'prettig', 'duidelijk', 'helder', 'interessant', 'boeiend', 'nuttig', 'handig', 'makkelijk', 'begrijpelijk', 'overzichtelijk', 'leerrijk', 'georganiseerd', 'gemotiveerd', 'enthousiast', 'energiek', 'actief', 'betrokken', 'toegewijd', 'gedreven', 'zorgzaam', 'geduldig', 'ondersteunend', 'creatief', 'flexibel', 'betrouwbaar', 'punctueel', 'gestructureerd', 'efficiënt']:
-                negative_count += 1
-                print(f"NEGATION NEGATIVE: 'niet {clean_word}' - COUNTING AS NEGATIVE")
-                continue  # Skip de normale positieve verwerking
-
-        # CHECK VOOR "NIET ZO" CONTEXT
-        if i > 1 and words[i-2] == 'niet' and words[i-1] == 'zo':
-            # "niet zo + positief woord" = NEGATIEF
-            if clean_word in ['goed', 'goeie', 'goede', 'leuk', 'fijn', 'prettig', 'duidelijk', 'helder', 'interessant', 'boeiend', 'nuttig', 'handig', 'makkelijk', 'begrijpelijk', 'overzichtelijk', 'leerrijk', 'georganiseerd', 'gemotiveerd', 'enthousiast', 'energiek', 'actief', 'betrokken', 'toegewijd', 'gedreven', 'zorgzaam', 'geduldig', 'ondersteunend', 'creatief', 'flexibel', 'betrouwbaar', 'punctueel', 'gestructureerd', 'efficiënt']:
+            # "niet (zo) + positief woord" = NEGATIEF (count as negative)
+            if clean_word in lexicon.negatable_positive:
                 negative_count += 1
-                print(f"NEGATION NEGATIVE: 'niet zo {clean_word}' - COUNTING AS NEGATIVE")
+                if trace is not None:
+                    trace.rule("word_loop", "negation_negative", f"{window} {clean_word}", -1)
                 continue  # Skip de normale positieve verwerking
         
         # EXACT MATCH - NEGATIVE WORDS (alleen als niet geneutraliseerd)
-        if clean_word in ['racist', 'racistisch', 'kk', 'kanker', 'kut', 'shit', 'klote', 'onnozel', 'dom', 'stom', 'slecht', 'waardeloos', 'verschrikkelijk', 'idioot', 'debiel']:
+        if clean_word in lexicon.strong_negative:
             negative_count += 2
-            print(f"STRONG NEGATIVE WORD (EXACT): '{clean_word}'")
-        elif clean_word in ['saai', 'vervelend', 'irritant', 'nood', 'tekort', 'missen', 'ontbreekt', 'probleem', 'klacht', 'beter', 'verbetering', 'onnodige', 'onnodig', 'moeilijker', 'moeilijk', 'verwarrend', 'onduidelijk', 'chaotisch', 'hinderlijk', 'storend']:
+            if trace is not None:
+                trace.rule("word_loop", "strong_negative", clean_word, -2)
+        elif clean_word in lexicon.negative:
             negative_count += 1
-            print(f"NEGATIVE WORD (EXACT): '{clean_word}'")
+            if trace is not None:
+                trace.rule("word_loop", "negative", clean_word, -1)
         
         # FUZZY MATCH - SCHRIJFFOUTEN
         else:
             # Check spelling variants
-            for correct_word, variants in SPELLING_VARIANTS.items():
-                if clean_word in variants:
-                    if correct_word in ['racist', 'racistisch', 'onnozel', 'slecht', 'verschrikkelijk', 'waardeloos']:
-                        negative_count += 2
-                        print(f"STRONG NEGATIVE WORD (SPELLING): '{clean_word}' -> '{correct_word}'")
-                    break
+            correct_word = lexicon.spelling_lookup.get(clean_word)
+            if correct_word in lexicon.spelling_strong_negatives:
+                negative_count += 2
+                if trace is not None:
+                    trace.rule("word_loop", "strong_negative_spelling", clean_word, -2, matched=correct_word)
             
             # Fuzzy match against strong negative words
-            strong_negatives = ['racist', 'racistisch', 'onnozel', 'verschrikkelijk', 'waardeloos']
-            match_found, matched_word = fuzzy_match(clean_word, strong_negatives, 0.75)
+            match_found, matched_word = lexicon.fuzzy_strong_negative(clean_word)
             if match_found:
                 negative_count += 2
-                print(f"STRONG NEGATIVE WORD (FUZZY): '{clean_word}' -> '{matched_word}'")
+                if trace is not None:
+                    trace.rule("word_loop", "strong_negative_fuzzy", clean_word, -2, matched=matched_word)
         
         # POSITIVE WORDS (EXACT MATCH) - met intensifier check
-        if clean_word in ['geweldig', 'fantastisch', 'super', 'perfect', 'excellent', 'goed', 'goeie', 'goede', 'leuk', 'mooi', 'fijn', 'top', 'prima', 'uitstekend', 'knap', 'slim', 'vakkundig', 'professioneel', 'gemotiveerd', 'enthousiast', 'energiek', 'actief', 'betrokken', 'toegewijd', 'gedreven', 'zorgzaam', 'geduldig', 'ondersteunend', 'creatief', 'flexibel', 'betrouwbaar', 'punctueel', 'georganiseerd', 'gestructureerd', 'efficiënt']:
+        if clean_word in lexicon.positive:
             # Check for intensifier before this word
             intensifier_boost = 0
-            if i > 0 and words[i-1].strip('.,!?;:"()[]{}') in ['heel', 'zeer', 'erg', 'super', 'ontzettend', 'hartstikke']:
+            if i > 0 and clean_words[i-1] in lexicon.intensifiers:
                 intensifier_boost = 1
-                print(f"INTENSIFIER FOUND: '{words[i-1]} {clean_word}' - EXTRA BOOST")
 
             positive_count += 1 + intensifier_boost
-            print(f"POSITIVE WORD: '{clean_word}' (boost: {intensifier_boost})")
+            if trace is not None:
+                trace.rule("word_loop", "positive", clean_word, 1 + intensifier_boost,
+                           intensified=bool(intensifier_boost))
 
-    print(f"NEGATIVE COUNT: {negative_count}, POSITIVE COUNT: {positive_count}")
-    
+    return negative_count, positive_count
+
+def word_result(text: str, negative_count: int, positive_count: int,
+                trace: SentimentTrace | ProfileSample | None = None) -> tuple[str, float, float]:
+    """Label uit de woordtellingen; zonder woordhits de polariteit fallback."""
     # AGGRESSIVE DECISION MAKING
     if negative_count > 0:
         score = -0.7 - (negative_count * 0.2)
-        print(f"FORCING NEGATIVE: score = {score}")
-        return "Negative", score, 0.8
+        result = ("Negative", score, 0.8)
+        stage = "word_loop"
     elif positive_count > 0:
         score = 0.7 + (positive_count * 0.1)
-        print(f"FORCING POSITIVE: score = {score}")
-        return "Positive", score, 0.8
+        result = ("Positive", score, 0.8)
+        stage = "word_loop"
     else:
-        # FALLBACK TO TEXTBLOB BUT STILL AGGRESSIVE
-        blob = TextBlob(text)
-        textblob_score = float(blob.sentiment.polarity)
-        
-        if textblob_score > 0.1:
-            print(f"TEXTBLOB POSITIVE: {textblob_score}")
-            return "Positive", textblob_score, 0.6
-        elif textblob_score < -0.1:
-            print(f"TEXTBLOB NEGATIVE: {textblob_score}")
-            return "Negative", textblob_score, 0.6
-        else:
-            print(f"TRULY NEUTRAL: {textblob_score}")
-            return "Neutral", textblob_score, 0.5
+        # FALLBACK TO POLARITY TABLE BUT STILL AGGRESSIVE
+        if trace is not None:
+            trace.phase("fallback")
+        result = _fallback_result(FALLBACK_POLARITY(text))
+        stage = "fallback"
+
+    if trace is not None:
+        trace.decide(stage, result, negative_count, positive_count)
+    return result
+
+def _fallback_result(fallback_score: float) -> tuple[str, float, float]:
+    if fallback_score > 0.1:
+        return ("Positive", fallback_score, 0.6)
+    if fallback_score < -0.1:
+        return ("Negative", fallback_score, 0.6)
+    return ("Neutral", fallback_score, 0.5)
+
+def analyze_sentiment_batch(texts: list[str]) -> list[tuple[str, float, float]]:
+    """
+    Sentiment analyse voor een lijst teksten in één aanroep.
+    Matcher, fuzzy index en resultaten cache worden over de hele batch gedeeld
+    en identieke teksten (bv. copy-paste klachten) worden maar één keer gescoord.
+    
+    Returns:
+        list: (label, score, confidence) per tekst, in dezelfde volgorde
+    """
+    scored = {}
+    results = []
+    for text in texts:
+        result = scored.get(text)
+        if result is None:
+            result = scored[text] = analyze_sentiment(text)
+        results.append(result)
+    return results
@@ -0,0 +1,113 @@
+# Content-addressed LRU cache voor sentiment resultaten
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """
+    Alleen witruimte rondom strippen; hoofdletters blijven staan omdat de
+    polarity scorer emoticons hoofdlettergevoelig herkent (":D" is niet ":d").
+    """
+    return text.strip()
+
+
+def content_key(text: str, lexicon_version: str) -> bytes:
+    """Hash van lexicon versie + genormaliseerde tekst (de tekst zelf wordt niet bewaard)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(lexicon_version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.digest()
+
+
+class SentimentCache:
+    """
+    Begrensde LRU cache met optionele TTL.
+
+    Sleutels bevatten de lexicon versie; wisselt de versie (zie `sync_version`)
+    dan wordt de cache volledig geleegd zodat oude resultaten niet blijven
+    hangen.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, Tuple[float, tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def sync_version(self, lexicon_version: str) -> None:
+        """Leeg de cache als de lexicon versie veranderd is."""
+        if lexicon_version == self._version:
+            return
+        with self._lock:
+            if lexicon_version != self._version:
+                if self._version is not None:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = lexicon_version
+
+    def get(self, key: bytes) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at and expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: tuple) -> None:
+        if not self.enabled:
+            return
+        expires_at = self._clock() + self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "lexicon_version": self._version,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,199 @@
+# Sentiment engines: de regel-cascade en alternatieve modellen achter één interface
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from . import lexicon, sentiment_executor
+from .segmentation import bound_text
+from .sentiment import analyze_with_lexicon
+
+# Actieve engine voor nieuwe feedback: "rules" (standaard) of "linear" (vereist numpy)
+SENTIMENT_ENGINE = os.getenv("SENTIMENT_ENGINE", "rules").lower()
+DEFAULT_LINEAR_MODEL = os.path.join(os.path.dirname(__file__), "data", "sentiment_linear.npz")
+LINEAR_MODEL_PATH = os.getenv("SENTIMENT_LINEAR_MODEL", DEFAULT_LINEAR_MODEL)
+
+Result = Tuple[str, float, float]
+
+
+class EngineError(RuntimeError):
+    """De engine is onbekend of kan niet geladen worden."""
+    pass
+
+
+class SentimentEngine(ABC):
+    """
+    Interface van een sentiment engine. version en analyze_batch zijn
+    verplicht (een engine zonder kan niet aangemaakt worden); de andere
+    methodes vallen daarop terug. version komt samen met name op elke
+    gescoorde Feedback rij.
+    """
+
+    name = ""
+
+    @property
+    @abstractmethod
+    def version(self) -> str:
+        ...
+
+    @abstractmethod
+    def analyze_batch(self, texts: List[str]) -> List[Result]:
+        ...
+
+    def analyze(self, text: str) -> Result:
+        return self.analyze_batch([text])[0]
+
+    async def analyze_async(self, text: str) -> Result:
+        return await run_in_threadpool(self.analyze, text)
+
+    def analyze_batch_versioned(self, texts: List[str]) -> List[Tuple[Result, str]]:
+        """Per tekst het resultaat en de versie waarmee gescoord is (voor de opgeslagen rij)."""
+        version = self.version
+        return [(result, version) for result in self.analyze_batch(texts)]
+
+    async def analyze_async_versioned(self, text: str) -> Tuple[Result, str]:
+        version = self.version
+        return await self.analyze_async(text), version
+
+    def info(self) -> Dict[str, Any]:
+        return {"name": self.name, "version": self.version}
+
+
+class RuleEngine(SentimentEngine):
+    """De Nederlandse regel-cascade (app/sentiment.py), via de executor en cache."""
+
+    name = "rules"
+
+    @property
+    def version(self) -> str:
+        return lexicon.get_lexicon().version
+
+    def analyze(self, text: str) -> Result:
+        return sentiment_executor.analyze(text)
+
+    async def analyze_async(self, text: str) -> Result:
+        return await sentiment_executor.analyze_async(text)
+
+    def analyze_batch(self, texts: List[str]) -> List[Result]:
+        return sentiment_executor.analyze_batch(texts)
+
+    # De process pool workers melden zelf met welke lexicon versie ze scoorden
+    def analyze_batch_versioned(self, texts: List[str]) -> List[Tuple[Result, str]]:
+        return sentiment_executor.analyze_batch_versioned(texts)
+
+    async def analyze_async_versioned(self, text: str) -> Tuple[Result, str]:
+        return await sentiment_executor.analyze_async_versioned(text)
+
+
+class LexiconEngine(SentimentEngine):
+    """
+    De regel-cascade met een ander lexicon bestand dan het actieve, zonder
+    cache; bedoeld als kandidaat in shadow mode (SENTIMENT_SHADOW_LEXICON).
+    Een eigen naam, zodat shadow statistieken en opgeslagen rijen hem niet
+    met de productie regel-engine verwarren; info() bevat het bestand.
+    """
+
+    name = "lexicon"
+
+    def __init__(self, path: str):
+        self.lexicon = lexicon.load_lexicon(path)
+
+    @property
+    def version(self) -> str:
+        return self.lexicon.version
+
+    def analyze(self, text: str) -> Result:
+        return analyze_with_lexicon(text, self.lexicon)
+
+    def analyze_batch(self, texts: List[str]) -> List[Result]:
+        return [analyze_with_lexicon(text, self.lexicon) for text in texts]
+
+    def info(self) -> Dict[str, Any]:
+        info = super().info()
+        info["source"] = self.lexicon.source
+        return info
+
+
+class LinearEngine(SentimentEngine):
+    """
+    Lineair model op gehashte features (app/linear_model.py), getraind op
+    eigen Feedback rijen met scripts/train_linear_model.py. Scoort een
+    batch in één keer; geen process pool nodig.
+    """
+
+    name = "linear"
+
+    def __init__(self, path: str = LINEAR_MODEL_PATH):
+        try:
+            from .linear_model import LinearModel
+        except ImportError as error:
+            raise EngineError("SENTIMENT_ENGINE=linear vereist het numpy package") from error
+        if not os.path.exists(path):
+            raise EngineError(f"Geen lineair model gevonden in {path} (train met scripts/train_linear_model.py)")
+        self.path = path
+        self.model = LinearModel.load(path)
+
+    @property
+    def version(self) -> str:
+        return self.model.version
+
+    def analyze_batch(self, texts: List[str]) -> List[Result]:
+        return self.model.predict([bound_text(text) for text in texts])
+
+    def info(self) -> Dict[str, Any]:
+        info = super().info()
+        info.update({
+            "source": self.path,
+            "features": self.model.weights.shape[0],
+            "trained_on": self.model.trained_on,
+        })
+        return info
+
+
+# Naam -> factory; een engine wordt pas bij het eerste gebruik aangemaakt
+ENGINES: Dict[str, Callable[[], SentimentEngine]] = {
+    RuleEngine.name: RuleEngine,
+    LinearEngine.name: LinearEngine,
+}
+
+_instances: Dict[str, SentimentEngine] = {}
+_instances_lock = threading.Lock()
+
+
+def register_engine(name: str, factory: Callable[[], SentimentEngine]) -> None:
+    """Registreer (of vervang) een engine onder deze naam."""
+    with _instances_lock:
+        ENGINES[name] = factory
+        _instances.pop(name, None)
+
+
+def get_engine(name: Optional[str] = None) -> SentimentEngine:
+    """De engine met deze naam, standaard de actieve engine (SENTIMENT_ENGINE)."""
+    name = (name or SENTIMENT_ENGINE).lower()
+    engine = _instances.get(name)
+    if engine is not None:
+        return engine
+    factory = ENGINES.get(name)
+    if factory is None:
+        raise EngineError(f"Onbekende sentiment engine: {name} (beschikbaar: {', '.join(sorted(ENGINES))})")
+    with _instances_lock:
+        engine = _instances.get(name)
+        if engine is None:
+            engine = _instances[name] = factory()
+    return engine
+
+
+def list_engines() -> List[Dict[str, Any]]:
+    """Alle geregistreerde engines; niet-laadbare engines met de reden."""
+    engines = []
+    for name in sorted(ENGINES):
+        try:
+            entry = get_engine(name).info()
+        except EngineError as error:
+            entry = {"name": name, "error": str(error)}
+        entry["active"] = name == SENTIMENT_ENGINE
+        engines.append(entry)
+    return engines
@@ -0,0 +1,199 @@
+# Optionele process pool voor sentiment analyse
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from . import lexicon
+from .segmentation import aggregate_segments, bound_text, split_segments
+from .sentiment import analyze_sentiment, analyze_sentiment_batch, get_cached_sentiment, cache_sentiment
+
+# "inline" = scoren in de request thread (standaard), "process" = in een process pool
+SENTIMENT_EXECUTOR = os.getenv("SENTIMENT_EXECUTOR", "inline").lower()
+SENTIMENT_POOL_SIZE = int(os.getenv("SENTIMENT_POOL_SIZE", str(os.cpu_count() or 1)))
+SENTIMENT_TASK_TIMEOUT = float(os.getenv("SENTIMENT_TASK_TIMEOUT", "5"))
+SENTIMENT_BATCH_CHUNK = int(os.getenv("SENTIMENT_BATCH_CHUNK", "500"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _warm_worker():
+    # Draait in elk child process: de import van app.sentiment heeft de
+    # lexicons en matchers al gecompileerd, één analyse vult de caches.
+    analyze_sentiment("warm-up")
+    lexicon.start_watcher()
+
+
+def _score_in_worker(texts: list[str], lexicon_version: str, lexicon_source: str) -> tuple[str, list[tuple[str, float, float]]]:
+    # Na een hot reload in het hoofdproces laadt de worker hetzelfde bestand
+    # als het hoofdproces (dat kan een ander bestand zijn dan zijn eigen bron)
+    if lexicon.get_lexicon().version != lexicon_version:
+        lexicon.reload_lexicon(lexicon_source)
+    # De versie waarmee echt gescoord is hoort bij het resultaat (cache key, opgeslagen rij)
+    return lexicon.get_lexicon().version, analyze_sentiment_batch(texts)
+
+
+def _ping():
+    return os.getpid()
+
+
+def is_enabled() -> bool:
+    return SENTIMENT_EXECUTOR == "process"
+
+
+def start_pool() -> Optional[ProcessPoolExecutor]:
+    """Start de pool (idempotent) en wacht tot alle workers opgewarmd zijn."""
+    global _pool
+    if not is_enabled():
+        return None
+    with _pool_lock:
+        if _pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=SENTIMENT_POOL_SIZE,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            # Gelijktijdige taken dwingen de pool om alle workers te starten
+            for future in [pool.submit(_ping) for _ in range(SENTIMENT_POOL_SIZE)]:
+                future.result()
+            _pool = pool
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _submit(fn, *args) -> Future:
+    try:
+        return start_pool().submit(fn, *args)
+    except BrokenProcessPool:
+        # Een gecrashte worker maakt de hele pool onbruikbaar: opnieuw opbouwen
+        shutdown_pool()
+        return start_pool().submit(fn, *args)
+
+
+def _submit_segments(segments: list[str], active: lexicon.CompiledLexicon) -> list[Future]:
+    # Lange teksten: segmenten verdeeld over alle workers. Alleen witruimte
+    # geeft geen segmenten; _combine geeft dan hetzelfde Neutral als inline
+    if not segments:
+        return []
+    size = -(-len(segments) // SENTIMENT_POOL_SIZE)
+    return [
+        _submit(_score_in_worker, segments[start:start + size], active.version, active.source)
+        for start in range(0, len(segments), size)
+    ]
+
+
+def _combine(segments: list[str], chunks: list, version: str) -> Optional[tuple[tuple[str, float, float], str]]:
+    # chunks: (versie, resultaten) per worker taak; None als de workers met
+    # verschillende lexicon versies scoorden (reload tijdens het scoren)
+    versions = {chunk_version for chunk_version, _ in chunks} or {version}
+    if len(versions) > 1:
+        return None
+    results = [result for _, chunk in chunks for result in chunk]
+    if len(results) == 1:
+        return results[0], versions.pop()
+    return aggregate_segments([(len(segment), result) for segment, result in zip(segments, results)]), versions.pop()
+
+
+def analyze(text: str) -> tuple[str, float, float]:
+    """
+    analyze_sentiment via de pool; wacht blokkerend (zonder de GIL vast te
+    houden) op het resultaat. Lange teksten worden per segment parallel
+    gescoord. Raises TimeoutError na SENTIMENT_TASK_TIMEOUT.
+    """
+    return analyze_versioned(text)[0]
+
+
+def analyze_versioned(text: str) -> tuple[tuple[str, float, float], str]:
+    """analyze() plus de lexicon versie waarmee het resultaat gescoord is."""
+    active = lexicon.get_lexicon()
+    if not is_enabled():
+        return analyze_sentiment(text), active.version
+    text = bound_text(text)
+    result = get_cached_sentiment(text)
+    if result is not None:
+        return result, active.version
+    segments = split_segments(text)
+    scored = _combine(segments, [_wait(future) for future in _submit_segments(segments, active)], active.version)
+    if scored is None:
+        # Segmenten van verschillende lexicons niet mengen: inline met het actieve lexicon
+        return analyze_sentiment(text), active.version
+    cache_sentiment(text, *scored)
+    return scored
+
+
+async def analyze_async(text: str) -> tuple[str, float, float]:
+    """Awaitable variant van analyze() voor async endpoints."""
+    return (await analyze_async_versioned(text))[0]
+
+
+async def analyze_async_versioned(text: str) -> tuple[tuple[str, float, float], str]:
+    """Awaitable variant van analyze_versioned()."""
+    active = lexicon.get_lexicon()
+    if not is_enabled():
+        return await run_in_threadpool(analyze_sentiment, text), active.version
+    text = bound_text(text)
+    result = get_cached_sentiment(text)
+    if result is not None:
+        return result, active.version
+    segments = split_segments(text)
+    futures = [asyncio.wrap_future(future) for future in _submit_segments(segments, active)]
+    chunks = await asyncio.wait_for(asyncio.gather(*futures), SENTIMENT_TASK_TIMEOUT)
+    scored = _combine(segments, chunks, active.version)
+    if scored is None:
+        return await run_in_threadpool(analyze_sentiment, text), active.version
+    cache_sentiment(text, *scored)
+    return scored
+
+
+def analyze_batch(texts: list[str]) -> list[tuple[str, float, float]]:
+    """
+    analyze_sentiment_batch verdeeld in chunks over alle workers.
+    Teksten die al in de cache staan gaan niet naar de pool.
+    De timeout geldt per chunk.
+    """
+    return [result for result, _ in analyze_batch_versioned(texts)]
+
+
+def analyze_batch_versioned(texts: list[str]) -> list[tuple[tuple[str, float, float], str]]:
+    """analyze_batch() met per tekst de lexicon versie waarmee gescoord is."""
+    active = lexicon.get_lexicon()
+    if not is_enabled():
+        return [(result, active.version) for result in analyze_sentiment_batch(texts)]
+    scored = [get_cached_sentiment(text) for text in texts]
+    missing = [index for index, result in enumerate(scored) if result is None]
+    scored = [(result, active.version) if result is not None else None for result in scored]
+    futures = [
+        _submit(_score_in_worker, [texts[index] for index in missing[start:start + SENTIMENT_BATCH_CHUNK]],
+                active.version, active.source)
+        for start in range(0, len(missing), SENTIMENT_BATCH_CHUNK)
+    ]
+    results = []
+    for future in futures:
+        version, chunk = _wait(future)
+        results.extend((result, version) for result in chunk)
+    for index, (result, version) in zip(missing, results):
+        scored[index] = (result, version)
+        cache_sentiment(texts[index], result, version)
+    return scored
+
+
+def _wait(future: Future):
+    try:
+        return future.result(timeout=SENTIMENT_TASK_TIMEOUT)
+    except TimeoutError:
+        future.cancel()
+        raise
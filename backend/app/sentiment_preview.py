@@ -0,0 +1,239 @@
+# Live sentiment preview tijdens het typen: per WebSocket verbinding incrementeel scoren
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocket
+
+from .language import SENTIMENT_LANGUAGE_ROUTING
+from .lexicon import CompiledLexicon, get_lexicon
+from .segmentation import SENTIMENT_SEGMENT_LENGTH, TextTooLongError, bound_text
+from .sentiment import analyze_with_lexicon, count_words, language_result, word_result
+from .sentiment_engines import SentimentEngine, get_engine
+from .tokenizer import Tokens
+
+# Pas scoren als er zo lang geen nieuwe tekst binnenkwam (ms), maar bij
+# doortypen nooit later dan MAX_DELAY na het eerste onbeantwoorde bericht
+SENTIMENT_PREVIEW_DEBOUNCE_MS = int(os.getenv("SENTIMENT_PREVIEW_DEBOUNCE_MS", "150"))
+SENTIMENT_PREVIEW_MAX_DELAY_MS = int(os.getenv("SENTIMENT_PREVIEW_MAX_DELAY_MS", "1000"))
+# Maximaal aantal gelijktijdige preview verbindingen (per process); 0 = preview uit
+SENTIMENT_PREVIEW_MAX_SESSIONS = int(os.getenv("SENTIMENT_PREVIEW_MAX_SESSIONS", "200"))
+# Verbindingen zonder bericht worden na zoveel seconden gesloten
+SENTIMENT_PREVIEW_IDLE_TIMEOUT = float(os.getenv("SENTIMENT_PREVIEW_IDLE_TIMEOUT", "300"))
+
+# WebSocket close codes
+CLOSE_NORMAL = 1000
+CLOSE_TRY_AGAIN_LATER = 1013
+
+Result = Tuple[str, float, float]
+
+
+def common_prefix(previous: Sequence, current: Sequence) -> int:
+    """Lengte van de gedeelde prefix van twee strings of lijsten (binair zoeken, slices in C)."""
+    low, high = 0, min(len(previous), len(current))
+    if previous[:high] == current[:high]:
+        return high
+    while low < high:
+        middle = (low + high + 1) // 2
+        if previous[:middle] == current[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class PreviewSession:
+    """
+    Incrementele regel-cascade voor één typende gebruiker. Bewaard worden de
+    automaat state na elk teken en de cumulatieve woordtellingen na elk
+    token; bij een nieuwe versie van de tekst worden alleen de tekens en
+    tokens na de gedeelde prefix opnieuw gescoord. Het resultaat is gelijk
+    aan analyze_sentiment (zonder cache). Niet thread-safe: één sessie per
+    verbinding, berichten worden na elkaar verwerkt.
+    """
+
+    def __init__(self, engine: Optional[SentimentEngine] = None):
+        self.engine = engine
+        self.updates = 0
+        self.rescored_chars = 0
+        self._reset(None)
+
+    def _reset(self, lexicon: Optional[CompiledLexicon]) -> None:
+        self._lexicon = lexicon
+        self._text_lower = ""
+        self._states: List[int] = [0]
+        # Hoogst geprioriteerde stage (index) in de prefix; len(stages) = geen match
+        self._best: List[int] = [len(lexicon.stages) if lexicon is not None else 0]
+        self._words: List[str] = []
+        self._negative: List[int] = [0]
+        self._positive: List[int] = [0]
+
+    def update(self, text: str) -> Result:
+        """Scoor de nieuwe versie van de tekst."""
+        self.updates += 1
+        if self.engine is not None and self.engine.name != "rules":
+            # Andere engines scoren de hele tekst; ze hebben geen cascade om te hervatten
+            return self.engine.analyze(text)
+        text = bound_text(text)
+        lexicon = get_lexicon()
+        if lexicon is not self._lexicon:
+            # Herladen lexicon: opgebouwde states horen bij de oude automaat
+            self._reset(lexicon)
+        if len(text) > SENTIMENT_SEGMENT_LENGTH:
+            # Lange teksten worden per segment gescoord; niet incrementeel
+            self._reset(lexicon)
+            self.rescored_chars += len(text)
+            return analyze_with_lexicon(text, lexicon)
+
+        text_lower = text.lower().strip()
+        stage_index = self._match_stage(text_lower, lexicon)
+        if stage_index < len(lexicon.stages):
+            return lexicon.stages[stage_index][2]
+        if SENTIMENT_LANGUAGE_ROUTING:
+            result = language_result(text, text_lower)
+            if result is not None:
+                return result
+        negative_count, positive_count = self._count_words(text_lower, lexicon)
+        return word_result(text, negative_count, positive_count)
+
+    def _match_stage(self, text_lower: str, lexicon: CompiledLexicon) -> int:
+        # Automaat hervatten na de gedeelde prefix; states[i] = state na i tekens
+        keep = common_prefix(self._text_lower, text_lower)
+        states, best = self._states, self._best
+        del states[keep + 1:]
+        del best[keep + 1:]
+        stage_of = lexicon.phrase_stage_index
+        best_stage = best[keep]
+        for state, phrase_ids in lexicon.phrase_matcher.scan(text_lower[keep:], states[keep]):
+            for phrase_id in phrase_ids:
+                if stage_of[phrase_id] < best_stage:
+                    best_stage = stage_of[phrase_id]
+            states.append(state)
+            best.append(best_stage)
+        self._text_lower = text_lower
+        self.rescored_chars += len(text_lower) - keep
+        return best_stage
+
+    def _count_words(self, text_lower: str, lexicon: CompiledLexicon) -> Tuple[int, int]:
+        # Een token hangt alleen af van de twee tokens ervoor: tokens binnen de
+        # gedeelde prefix houden hun telling, de rest wordt per token herteld
+        tokens = Tokens(text_lower)
+        keep = common_prefix(self._words, tokens.words)
+        negative, positive = self._negative, self._positive
+        del negative[keep + 1:]
+        del positive[keep + 1:]
+        for index in range(keep, len(tokens)):
+            token_negative, token_positive = count_words(
+                tokens.clean, tokens.negation, lexicon, start=index, stop=index + 1
+            )
+            negative.append(negative[-1] + token_negative)
+            positive.append(positive[-1] + token_positive)
+        self._words = tokens.words
+        return negative[-1], positive[-1]
+
+
+class SessionLimiter:
+    """Begrenst het aantal gelijktijdige preview verbindingen en telt ze."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.opened = 0
+        self.rejected = 0
+        self.updates = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.active >= self.limit:
+                self.rejected += 1
+                return False
+            self.active += 1
+            self.opened += 1
+            return True
+
+    def release(self, session: Optional[PreviewSession] = None) -> None:
+        with self._lock:
+            self.active -= 1
+            if session is not None:
+                self.updates += session.updates
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active": self.active,
+                "max": self.limit,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "updates": self.updates,
+                "debounce_ms": SENTIMENT_PREVIEW_DEBOUNCE_MS,
+            }
+
+
+SESSIONS = SessionLimiter(SENTIMENT_PREVIEW_MAX_SESSIONS)
+
+
+def _parse(message: str) -> Tuple[Any, Optional[str]]:
+    # Berichten: {"text": "...", "seq": 12}; seq is optioneel en komt terug in het antwoord
+    try:
+        payload = json.loads(message)
+    except json.JSONDecodeError:
+        return None, None
+    if not isinstance(payload, dict) or not isinstance(payload.get("text"), str):
+        return payload.get("seq") if isinstance(payload, dict) else None, None
+    return payload.get("seq"), payload["text"]
+
+
+async def _debounced(websocket: WebSocket, message: str) -> str:
+    """Lees door zolang er binnen de debounce tijd nieuwe tekst komt; alleen de laatste telt."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SENTIMENT_PREVIEW_MAX_DELAY_MS / 1000
+    while True:
+        wait = min(SENTIMENT_PREVIEW_DEBOUNCE_MS / 1000, deadline - loop.time())
+        if wait <= 0:
+            return message
+        try:
+            message = await asyncio.wait_for(websocket.receive_text(), wait)
+        except asyncio.TimeoutError:
+            return message
+
+
+async def serve(websocket: WebSocket, session: PreviewSession) -> None:
+    """
+    Verwerk berichten van een geaccepteerde verbinding tot de client sluit
+    (WebSocketDisconnect) of de verbinding te lang stil is.
+    """
+    while True:
+        try:
+            message = await asyncio.wait_for(websocket.receive_text(), SENTIMENT_PREVIEW_IDLE_TIMEOUT)
+        except asyncio.TimeoutError:
+            await websocket.close(code=CLOSE_NORMAL)
+            return
+        message = await _debounced(websocket, message)
+        seq, text = _parse(message)
+        if text is None:
+            await websocket.send_json({"seq": seq, "error": "Verwacht JSON met een 'text' veld"})
+            continue
+        started = time.perf_counter()
+        try:
+            # Korte stukjes werk, maar niet op de event loop (lange teksten, fuzzy matching)
+            label, score, confidence = await run_in_threadpool(session.update, text)
+        except TextTooLongError as error:
+            await websocket.send_json({"seq": seq, "error": str(error)})
+            continue
+        await websocket.send_json({
+            "seq": seq,
+            "label": label,
+            "score": score,
+            "confidence": confidence,
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+        })
+
+
+def new_session() -> PreviewSession:
+    return PreviewSession(get_engine())
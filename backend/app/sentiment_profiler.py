@@ -0,0 +1,215 @@
+# Per-stage hit-rate en latency profiler voor de sentiment regel-cascade
+
+import bisect
+import itertools
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bucket grenzen in microseconden (laatste bucket = alles daarboven)
+LATENCY_BUCKETS_US = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+_BUCKET_BOUNDS = tuple(bound / 1e6 for bound in LATENCY_BUCKETS_US)
+
+
+class LatencyHistogram:
+    """Vaste log-buckets; percentielen worden geschat op de bucket grens."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_US) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """Bovengrens (ms) van de bucket waarin het percentiel valt."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if index < len(LATENCY_BUCKETS_US):
+                    return LATENCY_BUCKETS_US[index] / 1000
+                return round(self.max * 1000, 4)
+        return round(self.max * 1000, 4)
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}us" for bound in LATENCY_BUCKETS_US] + [f">{LATENCY_BUCKETS_US[-1]}us"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 4) if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max * 1000, 4),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+
+class ProfileSample:
+    """
+    Recorder voor één analyse (zelfde interface als SentimentTrace).
+    Houdt alleen tuples en tijdstempels bij; aggregatie gebeurt in StageProfiler.
+    """
+
+    __slots__ = ("started", "phase_name", "phase_started", "phases", "phrase_hits", "rules", "decided_by")
+
+    # De zinnen scan mag net als zonder recorder stoppen bij een match in de hoogste stage
+    exhaustive = False
+
+    def __init__(self):
+        self.started = self.phase_started = time.perf_counter()
+        self.phase_name = "phrase_scan"
+        self.phases: List[Tuple[str, float]] = []
+        self.phrase_hits: List[Tuple[str, str]] = []
+        self.rules: List[Tuple[str, str, str]] = []
+        self.decided_by: Optional[str] = None
+
+    def phrase_hit(self, stage: str, phrase: str) -> None:
+        self.phrase_hits.append((stage, phrase))
+
+    def rule(self, stage: str, rule: str, token: str, weight: int = 0, **details: Any) -> None:
+        self.rules.append((stage, rule, token))
+
+    def phase(self, name: Optional[str]) -> None:
+        now = time.perf_counter()
+        self.phases.append((self.phase_name, now - self.phase_started))
+        self.phase_name = name
+        self.phase_started = now
+
+    def decide(self, stage: str, result: tuple, negative_count: int = 0, positive_count: int = 0) -> None:
+        self.phase(None)
+        self.decided_by = stage
+
+    @property
+    def elapsed(self) -> float:
+        return self.phase_started - self.started
+
+
+class StageProfiler:
+    """
+    Tellers en latency histogrammen per beslissende stage, per fase van de
+    cascade (ook fases die doorvallen) en per gematchte regel.
+    De cijfers gelden per process.
+    """
+
+    def __init__(self, enabled: bool = True, sample_rate: int = 1):
+        self.enabled = enabled and sample_rate > 0
+        # 1 = elke analyse, N = één op N (verhoudingen blijven geldig)
+        self.sample_rate = max(1, sample_rate)
+        self._ticks = itertools.count()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def should_sample(self) -> bool:
+        if not self.enabled:
+            return False
+        return self.sample_rate == 1 or next(self._ticks) % self.sample_rate == 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self.analyses = 0
+            self.cache_hits = 0
+            self.decided: Counter = Counter()
+            self.stage_latency: Dict[str, LatencyHistogram] = {}
+            self.phase_latency: Dict[str, LatencyHistogram] = {}
+            self.phrase_hits: Counter = Counter()
+            self.rule_hits: Counter = Counter()
+
+    def sample(self) -> ProfileSample:
+        return ProfileSample()
+
+    def record_cache_hit(self) -> None:
+        with self._lock:
+            self.cache_hits += 1
+
+    def record(self, sample: ProfileSample) -> None:
+        stage = sample.decided_by or "unknown"
+        with self._lock:
+            self.analyses += 1
+            self.decided[stage] += 1
+            histogram = self.stage_latency.get(stage)
+            if histogram is None:
+                histogram = self.stage_latency[stage] = LatencyHistogram()
+            histogram.observe(sample.elapsed)
+            phase_latency = self.phase_latency
+            for phase, seconds in sample.phases:
+                histogram = phase_latency.get(phase)
+                if histogram is None:
+                    histogram = phase_latency[phase] = LatencyHistogram()
+                histogram.observe(seconds)
+            # Counter.update is relatief duur voor lijstjes van 0-3 elementen
+            if sample.phrase_hits:
+                phrase_hits = self.phrase_hits
+                for key in sample.phrase_hits:
+                    phrase_hits[key] += 1
+            if sample.rules:
+                rule_hits = self.rule_hits
+                for key in sample.rules:
+                    rule_hits[key] += 1
+
+    def snapshot(self, lexicon=None, top: int = 25) -> Dict[str, Any]:
+        with self._lock:
+            analyses = self.analyses
+            stages = {
+                stage: {
+                    "decided": count,
+                    "decided_rate": round(count / analyses, 4) if analyses else 0.0,
+                    "latency": self.stage_latency[stage].to_dict(),
+                }
+                for stage, count in self.decided.most_common()
+            }
+            phases = {phase: histogram.to_dict() for phase, histogram in self.phase_latency.items()}
+            phrase_hits = self.phrase_hits.copy()
+            rule_hits = self.rule_hits.most_common(top)
+            result = {
+                "enabled": self.enabled,
+                "sample_rate": self.sample_rate,
+                "since": self.started_at,
+                "analyses": analyses,
+                "cache_hits": self.cache_hits,
+                "stages": stages,
+                "phases": phases,
+                "top_phrases": [
+                    {"stage": stage, "phrase": phrase, "hits": hits}
+                    for (stage, phrase), hits in phrase_hits.most_common(top)
+                ],
+                "top_word_rules": [
+                    {"stage": stage, "rule": rule, "token": token, "hits": hits}
+                    for (stage, rule, token), hits in rule_hits
+                ],
+            }
+        if lexicon is not None and self.sample_rate == 1:
+            # Zinnen zonder geregistreerde hit sinds de reset: kandidaten om te
+            # schrappen, geen bewijs. Alleen zonder sampling, en ook dan telt
+            # een sample geen zinnen na een beslissende match in de eerste stage.
+            matched = {(stage, phrase) for stage, phrase in phrase_hits}
+            result["unmatched_candidates"] = {
+                name: [phrase for phrase in phrases if (name, phrase) not in matched]
+                for name, phrases, _ in lexicon.stages
+            }
+        return result
+
+
+def _sample_rate_from_env() -> int:
+    value = os.getenv("SENTIMENT_PROFILE", "100").lower()
+    if value in ("false", "no", "off"):
+        return 0
+    if value in ("true", "yes", "on"):
+        return 1
+    return int(value)
+
+
+# Globale profiler; SENTIMENT_PROFILE=0 schakelt hem uit, N profileert één op N
+# analyses (standaard 100: een sample kost een lock en een recorder per analyse)
+PROFILER = StageProfiler(sample_rate=_sample_rate_from_env())
@@ -0,0 +1,303 @@
+# Shadow mode: een kandidaat engine of lexicon meedraaien op live feedback, buiten het request pad
+
+import functools
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .lexicon import LexiconError
+from .sentiment_engines import EngineError, LexiconEngine, SentimentEngine, get_engine
+from .sentiment_profiler import LatencyHistogram
+
+# Kandidaat: een geregistreerde engine (bv. "linear") of een lexicon bestand
+# voor de regel-cascade; beide leeg = shadow mode uit
+SENTIMENT_SHADOW_ENGINE = os.getenv("SENTIMENT_SHADOW_ENGINE", "").lower()
+SENTIMENT_SHADOW_LEXICON = os.getenv("SENTIMENT_SHADOW_LEXICON", "")
+# 1 = elke feedback, N = één op N submissions
+SENTIMENT_SHADOW_SAMPLE = int(os.getenv("SENTIMENT_SHADOW_SAMPLE", "10"))
+# Maximaal aantal wachtende items; bij een volle queue wordt "newest" (het
+# nieuwe item) of "oldest" (het oudste wachtende item) weggegooid
+SENTIMENT_SHADOW_QUEUE = int(os.getenv("SENTIMENT_SHADOW_QUEUE", "1000"))
+SENTIMENT_SHADOW_DROP = os.getenv("SENTIMENT_SHADOW_DROP", "newest").lower()
+
+# Aantal recente meningsverschillen dat bewaard wordt voor inspectie
+DISAGREEMENT_SAMPLES = 20
+# Maximaal aantal items per taak voor het shadow process
+SHADOW_TASK_BATCH = 50
+# Nice waarde van het shadow process (hoger = lagere prioriteit)
+SHADOW_NICE = 19
+
+Result = Tuple[str, float, float]
+
+# Kandidaat in het shadow process (per process één keer geladen)
+_worker_candidate: Optional[SentimentEngine] = None
+_worker_error: Optional[str] = None
+
+
+def _load_in_worker(factory: Callable[[], SentimentEngine]) -> None:
+    # Initializer van het shadow process; een fout wordt bij elke taak teruggemeld
+    global _worker_candidate, _worker_error
+    if hasattr(os, "nice"):
+        # Lagere prioriteit: op een volle machine krijgen de requests voorrang op de CPU
+        os.nice(SHADOW_NICE)
+    try:
+        _worker_candidate = factory()
+    except (EngineError, LexiconError) as error:
+        _worker_error = str(error)
+
+
+def _score_in_worker(texts: List[str]) -> Tuple[Optional[Dict[str, Any]], Optional[str], list]:
+    # Draait in het shadow process: (kandidaat info, laadfout, per tekst (resultaat, seconden) of None)
+    if _worker_candidate is None:
+        return None, _worker_error, [None] * len(texts)
+    scored = []
+    for text in texts:
+        started = time.perf_counter()
+        try:
+            result = _worker_candidate.analyze(text)
+        except Exception:
+            scored.append(None)
+            continue
+        scored.append((result, time.perf_counter() - started))
+    return _worker_candidate.info(), None, scored
+
+
+class ShadowEvaluator:
+    """
+    Submissions worden bemonsterd en zonder te wachten in een begrensde queue
+    gezet; een achtergrond thread stuurt ze naar een eigen process met de
+    kandidaat en vergelijkt met het productie resultaat (label overeenstemming,
+    score verschil, latency). Het scoren concurreert zo niet om de GIL met de
+    requests. Een volle queue of een falende kandidaat raakt de request nooit.
+    Met isolated=False scoort de thread zelf (de factory hoeft dan niet
+    pickle-baar te zijn).
+    """
+
+    def __init__(self, candidate: Optional[Callable[[], SentimentEngine]], sample_rate: int = 10,
+                 queue_size: int = 1000, drop: str = "newest", description: str = "",
+                 isolated: bool = True):
+        self.candidate_factory = candidate
+        self.description = description
+        self.isolated = isolated
+        self.enabled = candidate is not None and sample_rate > 0 and queue_size > 0
+        self.sample_rate = max(1, sample_rate)
+        self.queue_size = max(1, queue_size)
+        self.drop = "oldest" if drop == "oldest" else "newest"
+        self._ticks = itertools.count()
+        self._queue: Deque[Tuple[str, Result, float]] = deque(maxlen=self.queue_size)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._candidate: Optional[SentimentEngine] = None
+        self.candidate_info: Optional[Dict[str, Any]] = None
+        self.candidate_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self.offered = 0
+            self.sampled = 0
+            self.dropped = 0
+            self.evaluated = 0
+            self.errors = 0
+            self.agreed = 0
+            self.score_difference = 0.0
+            self.confusion: Counter = Counter()
+            self.production_latency = LatencyHistogram()
+            self.candidate_latency = LatencyHistogram()
+            self.disagreements: Deque[Dict[str, Any]] = deque(maxlen=DISAGREEMENT_SAMPLES)
+
+    def offer(self, text: str, production: Result, production_seconds: float) -> bool:
+        """
+        Bied een submission aan (niet-blokkerend). True als hij in de queue
+        kwam. Het scoren zelf gebeurt later in het shadow process.
+        """
+        if not self.enabled:
+            return False
+        sampled = self.sample_rate == 1 or next(self._ticks) % self.sample_rate == 0
+        with self._lock:
+            self.offered += 1
+            if not sampled:
+                return False
+            self.sampled += 1
+            if len(self._queue) >= self.queue_size:
+                self.dropped += 1
+                if self.drop == "newest":
+                    return False
+            # deque(maxlen) gooit bij "oldest" zelf het oudste item weg
+            self._queue.append((text, production, production_seconds))
+        self._wakeup.set()
+        return True
+
+    def start(self) -> bool:
+        """Start de achtergrond thread (idempotent)."""
+        if not self.enabled or (self._worker is not None and self._worker.is_alive()):
+            return False
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="sentiment-shadow", daemon=True)
+        self._worker.start()
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop de thread en het shadow process; wat nog in de queue staat wordt niet meer gescoord."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def _load_candidate(self) -> Optional[SentimentEngine]:
+        # Model of lexicon laden gebeurt in de achtergrond thread, niet bij het opstarten
+        if self._candidate is None and self.candidate_error is None:
+            try:
+                self._candidate = self.candidate_factory()
+                self.candidate_info = self._candidate.info()
+            except (EngineError, LexiconError) as error:
+                self.candidate_error = str(error)
+        return self._candidate
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        # Eén worker: shadow werk mag nooit meer dan één core kosten
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_load_in_worker,
+            initargs=(self.candidate_factory,),
+        )
+
+    def _take(self) -> List[Tuple[str, Result, float]]:
+        with self._lock:
+            return [self._queue.popleft() for _ in range(min(SHADOW_TASK_BATCH, len(self._queue)))]
+
+    def _run(self) -> None:
+        pool = None
+        try:
+            while not self._stop.is_set():
+                self._wakeup.wait(1.0)
+                self._wakeup.clear()
+                while not self._stop.is_set():
+                    batch = self._take()
+                    if not batch:
+                        break
+                    if not self.isolated:
+                        for item in batch:
+                            self.evaluate(*item)
+                        continue
+                    if pool is None:
+                        pool = self._start_pool()
+                    try:
+                        future = pool.submit(_score_in_worker, [text for text, _, _ in batch])
+                        self._evaluate_scored(batch, *future.result())
+                    except Exception as error:
+                        with self._lock:
+                            self.errors += len(batch)
+                        if isinstance(error, BrokenProcessPool):
+                            # Gecrasht shadow process: bij het volgende item opnieuw opbouwen
+                            pool.shutdown(wait=False)
+                            pool = None
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def _evaluate_scored(self, batch: List[Tuple[str, Result, float]], info: Optional[Dict[str, Any]],
+                         error: Optional[str], scored: list) -> None:
+        self.candidate_info = info or self.candidate_info
+        self.candidate_error = error
+        for (text, production, production_seconds), item in zip(batch, scored):
+            if item is None:
+                with self._lock:
+                    self.errors += 1
+                continue
+            self._record(text, production, production_seconds, *item)
+
+    def evaluate(self, text: str, production: Result, production_seconds: float) -> None:
+        """Scoor één item met de kandidaat in dit process en leg de vergelijking vast."""
+        candidate = self._load_candidate()
+        if candidate is None:
+            with self._lock:
+                self.errors += 1
+            return
+        started = time.perf_counter()
+        try:
+            result = candidate.analyze(text)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return
+        self._record(text, production, production_seconds, result, time.perf_counter() - started)
+
+    def _record(self, text: str, production: Result, production_seconds: float,
+                result: Result, seconds: float) -> None:
+        with self._lock:
+            self.evaluated += 1
+            self.production_latency.observe(production_seconds)
+            self.candidate_latency.observe(seconds)
+            self.confusion[(production[0], result[0])] += 1
+            self.score_difference += abs(result[1] - production[1])
+            if result[0] == production[0]:
+                self.agreed += 1
+            else:
+                self.disagreements.append({
+                    "text": text[:200],
+                    "production": {"label": production[0], "score": production[1], "confidence": production[2]},
+                    "candidate": {"label": result[0], "score": result[1], "confidence": result[2]},
+                })
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            evaluated = self.evaluated
+            confusion: Dict[str, Dict[str, int]] = {}
+            for (production, candidate), count in sorted(self.confusion.items()):
+                confusion.setdefault(production, {})[candidate] = count
+            return {
+                "enabled": self.enabled,
+                "running": self._worker is not None and self._worker.is_alive(),
+                "isolated": self.isolated,
+                "candidate": self.candidate_info or {"description": self.description},
+                "candidate_error": self.candidate_error,
+                "sample_rate": self.sample_rate,
+                "queue": {"size": len(self._queue), "max": self.queue_size, "drop": self.drop},
+                "since": self.started_at,
+                "offered": self.offered,
+                "sampled": self.sampled,
+                "dropped": self.dropped,
+                "evaluated": evaluated,
+                "errors": self.errors,
+                "agreement_rate": round(self.agreed / evaluated, 4) if evaluated else None,
+                "mean_score_difference": round(self.score_difference / evaluated, 4) if evaluated else None,
+                # productie label -> kandidaat label -> aantal
+                "confusion": confusion,
+                "latency": {
+                    "production": self.production_latency.to_dict(),
+                    "candidate": self.candidate_latency.to_dict(),
+                },
+                "recent_disagreements": list(self.disagreements),
+            }
+
+
+def _candidate_from_env() -> Tuple[Optional[Callable[[], SentimentEngine]], str]:
+    # partial in plaats van lambda: de factory gaat naar het shadow process
+    if SENTIMENT_SHADOW_LEXICON:
+        return functools.partial(LexiconEngine, SENTIMENT_SHADOW_LEXICON), f"rules met {SENTIMENT_SHADOW_LEXICON}"
+    if SENTIMENT_SHADOW_ENGINE:
+        return functools.partial(get_engine, SENTIMENT_SHADOW_ENGINE), SENTIMENT_SHADOW_ENGINE
+    return None, ""
+
+
+_candidate, _description = _candidate_from_env()
+# Globale evaluator; zonder SENTIMENT_SHADOW_ENGINE/SENTIMENT_SHADOW_LEXICON staat hij uit
+SHADOW = ShadowEvaluator(
+    _candidate,
+    sample_rate=SENTIMENT_SHADOW_SAMPLE,
+    queue_size=SENTIMENT_SHADOW_QUEUE,
+    drop=SENTIMENT_SHADOW_DROP,
+    description=_description,
+)
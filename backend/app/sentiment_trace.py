@@ -0,0 +1,67 @@
+# Gestructureerde uitleg (trace) van een sentiment analyse
+
+import time
+from typing import Any, Dict, List, Optional
+
+
+class SentimentTrace:
+    """
+    Verzamelt welke regels in welke stage matchten en met welk gewicht.
+    Wordt alleen aangemaakt als tracing gevraagd is; zonder trace doet de
+    analyse geen enkele formattering of I/O.
+    """
+
+    # Alle gevonden zinnen registreren, ook na een match in de hoogste stage
+    exhaustive = True
+
+    def __init__(self, text: str):
+        self.text = text
+        self.phrase_hits: List[Dict[str, Any]] = []
+        self.rules: List[Dict[str, Any]] = []
+        self.decided_by: Optional[str] = None
+        self.negative_count = 0
+        self.positive_count = 0
+        self.result: Optional[tuple] = None
+        self.timings_ms: Dict[str, float] = {}
+        self.segments: List[Dict[str, Any]] = []
+        self._phase = "phrase_scan"
+        self._phase_started = time.perf_counter()
+
+    def phrase_hit(self, stage: str, phrase: str) -> None:
+        self.phrase_hits.append({"stage": stage, "phrase": phrase})
+
+    def rule(self, stage: str, rule: str, token: str, weight: int = 0, **details: Any) -> None:
+        entry = {"stage": stage, "rule": rule, "token": token, "weight": weight}
+        entry.update(details)
+        self.rules.append(entry)
+
+    def phase(self, name: Optional[str]) -> None:
+        """Sluit de huidige fase van de cascade af en start de volgende."""
+        now = time.perf_counter()
+        self.timings_ms[self._phase] = round((now - self._phase_started) * 1000, 4)
+        self._phase = name
+        self._phase_started = now
+
+    def decide(self, stage: str, result: tuple, negative_count: int = 0, positive_count: int = 0) -> None:
+        self.phase(None)
+        self.decided_by = stage
+        self.result = result
+        self.negative_count = negative_count
+        self.positive_count = positive_count
+
+    def to_dict(self) -> Dict[str, Any]:
+        label, score, confidence = self.result if self.result else (None, None, None)
+        return {
+            "decided_by": self.decided_by,
+            "label": label,
+            "score": score,
+            "confidence": confidence,
+            "counts": {
+                "negative": self.negative_count,
+                "positive": self.positive_count,
+            },
+            "phrase_hits": self.phrase_hits,
+            "rules": self.rules,
+            "timings_ms": self.timings_ms,
+            "segments": self.segments,
+        }
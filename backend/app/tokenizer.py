@@ -0,0 +1,46 @@
+# Eén tokenizatie pass voor de woord-stages van de sentiment analyse
+
+from typing import Dict, List
+
+# Leestekens die rond een woord gestript worden
+PUNCTUATION = '.,!?;:"()[]{}'
+
+NEGATION = "niet"
+NEGATION_SOFTENER = "zo"
+
+
+def negation_windows(words: List[str]) -> Dict[int, str]:
+    """
+    Token index -> negatie venster ("niet" of "niet zo") dat eraan voorafgaat.
+    Kijkt naar de ruwe tokens, dus "niet," opent geen venster.
+    """
+    windows: Dict[int, str] = {}
+    if NEGATION not in words:
+        return windows
+    last = len(words) - 1
+    for index, word in enumerate(words):
+        if word != NEGATION or index == last:
+            continue
+        windows[index + 1] = NEGATION
+        if index + 2 <= last and words[index + 1] == NEGATION_SOFTENER:
+            windows[index + 2] = "niet zo"
+    return windows
+
+
+class Tokens:
+    """
+    Tokens van een (lowercase) tekst: ruwe woorden, gestripte woorden en
+    negatie vensters worden één keer berekend en door alle woordregels
+    gedeeld (geen re-strip van buren voor negatie of intensifiers).
+    """
+
+    __slots__ = ("text", "words", "clean", "negation")
+
+    def __init__(self, text_lower: str):
+        self.text = text_lower
+        self.words = text_lower.split()
+        self.clean = [word.strip(PUNCTUATION) for word in self.words]
+        self.negation = negation_windows(self.words)
+
+    def __len__(self) -> int:
+        return len(self.words)
@@ -0,0 +1,88 @@
+"""baseline schema
+
+Het schema zoals Base.metadata.create_all en add_missing_columns het tot nu
+toe aanmaakten. Idempotent: ontbrekende tabellen worden aangemaakt en aan
+bestaande tabellen (databases van vóór de migraties) worden ontbrekende
+kolommen toegevoegd, zodat zowel een lege als een bestaande database op
+deze revisie uitkomt.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def baseline_metadata() -> sa.MetaData:
+    # Bevroren kopie van app/models.py op deze revisie; latere model
+    # wijzigingen horen in een nieuwe migratie, niet hier
+    metadata = sa.MetaData()
+    sa.Table(
+        "users", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("username", sa.String, unique=True, index=True, nullable=False),
+        sa.Column("email", sa.String, unique=True, index=True, nullable=False),
+        sa.Column("password_hash", sa.String, nullable=False),
+        sa.Column("role", sa.String),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("is_active", sa.Boolean),
+    )
+    sa.Table(
+        "categories", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("name", sa.String, unique=True, nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("created_at", sa.DateTime),
+    )
+    sa.Table(
+        "subjects", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("name", sa.String, unique=True, nullable=False),
+        sa.Column("description", sa.Text),
+        sa.Column("created_at", sa.DateTime),
+    )
+    sa.Table(
+        "feedback", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("text", sa.Text, nullable=False),
+        sa.Column("sentiment_label", sa.String),
+        sa.Column("sentiment_score", sa.Float),
+        sa.Column("sentiment_confidence", sa.Float),
+        sa.Column("lexicon_version", sa.String),
+        sa.Column("sentiment_engine", sa.String),
+        sa.Column("language", sa.String),
+        sa.Column("category_id", sa.Integer, sa.ForeignKey("categories.id")),
+        sa.Column("subject_id", sa.Integer, sa.ForeignKey("subjects.id")),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("is_anonymous", sa.Boolean),
+    )
+    return metadata
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    metadata = baseline_metadata()
+    metadata.create_all(bind=bind, checkfirst=True)
+
+    inspector = sa.inspect(bind)
+    for table in metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                # Later toegevoegde kolommen zijn altijd nullable
+                op.add_column(table.name, sa.Column(column.name, column.type, nullable=True))
+
+
+def downgrade() -> None:
+    baseline_metadata().drop_all(bind=op.get_bind())
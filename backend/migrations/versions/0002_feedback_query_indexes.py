@@ -0,0 +1,40 @@
+"""feedback query indexes
+
+Samengestelde indexes voor de query vormen van het dashboard:
+GET /feedback filtert op categorie, vak of sentiment en sorteert op
+(created_at, id); /analytics groepeert op sentiment, categorie, vak en
+taal. Controle van het query plan: python -m app.query_plans
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_feedback_created_at_id", ["created_at", "id"]),
+    ("ix_feedback_category_created", ["category_id", "created_at", "id"]),
+    ("ix_feedback_subject_created", ["subject_id", "created_at", "id"]),
+    ("ix_feedback_sentiment_created", ["sentiment_label", "created_at", "id"]),
+    ("ix_feedback_language_sentiment", ["language", "sentiment_label"]),
+)
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES:
+        op.create_index(name, "feedback", columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="feedback", if_exists=True)
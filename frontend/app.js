@@ -156,9 +156,13 @@ async function handleFeedbackSubmit(e) {
             document.querySelector('.char-counter').textContent = '0/1000 karakters';
             hideSentimentPreview();
             
-            // Show sentiment result
-            showSentimentResult(result.sentiment);
+            // Show sentiment result (not available yet when the server queues the submission: 202)
+            if (result.sentiment) {
+                showSentimentResult(result.sentiment);
+            }
             
+        } else if (response.status === 503) {
+            showToast('Het is nu erg druk, probeer het over een paar seconden opnieuw.', 'error');
         } else {
             throw new Error('Fout bij het versturen van feedback');
         }
@@ -375,29 +379,91 @@ function displayFeedbackList(feedbackList) {
     `).join('');
 }
 
-async function showSentimentPreview(text) {
+// Live sentiment preview: one WebSocket per page, the server debounces and
+// only re-scores the changed tail. Falls back to /test-sentiment when the
+// socket is unavailable or the server is at its session limit (code 1013).
+let previewSocket = null;
+let previewSocketFailed = false;
+let previewSeq = 0;
+let previewHiddenSeq = 0;
+let previewPendingText = null;
+
+function getPreviewSocket() {
+    if (previewSocketFailed || !('WebSocket' in window)) return null;
+    if (previewSocket) return previewSocket;
+
+    const socket = new WebSocket('ws://localhost:8000/sentiment/preview');
+    socket.addEventListener('open', function() {
+        if (previewPendingText !== null) {
+            socket.send(JSON.stringify({ text: previewPendingText, seq: previewSeq }));
+            previewPendingText = null;
+        }
+    });
+    socket.addEventListener('message', function(event) {
+        const result = JSON.parse(event.data);
+        if (result.error || result.seq <= previewHiddenSeq) return;
+        renderSentimentPreview(result);
+    });
+    socket.addEventListener('close', function(event) {
+        previewSocket = null;
+        // Idle timeout (1000) just reconnects on the next input
+        if (event.code !== 1000) {
+            previewSocketFailed = true;
+            if (previewPendingText !== null) {
+                fetchSentimentPreview(previewPendingText);
+                previewPendingText = null;
+            }
+        }
+    });
+    previewSocket = socket;
+    return socket;
+}
+
+function showSentimentPreview(text) {
     if (text.length < 10) return;
-    
+
+    const socket = getPreviewSocket();
+    if (!socket) {
+        fetchSentimentPreview(text);
+        return;
+    }
+    previewSeq += 1;
+    if (socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify({ text: text, seq: previewSeq }));
+    } else {
+        previewPendingText = text;
+    }
+}
+
+async function fetchSentimentPreview(text) {
     try {
         const response = await fetch(`http://localhost:8000/test-sentiment?text=${encodeURIComponent(text)}`);
         if (response.ok) {
-            const result = await response.json();
-            const preview = document.getElementById('sentimentPreview');
-            const label = preview.querySelector('.sentiment-label');
-            const score = preview.querySelector('.sentiment-score');
-            
-            label.textContent = result.label;
-            label.className = `sentiment-label ${result.label.toLowerCase()}`;
-            score.textContent = `Score: ${result.score.toFixed(2)}`;
-            
-            preview.style.display = 'block';
+            renderSentimentPreview(await response.json());
         }
     } catch (error) {
         console.error('Error getting sentiment preview:', error);
     }
 }
 
+function renderSentimentPreview(result) {
+    if (!result.label) return;
+
+    const preview = document.getElementById('sentimentPreview');
+    const label = preview.querySelector('.sentiment-label');
+    const score = preview.querySelector('.sentiment-score');
+    
+    label.textContent = result.label;
+    label.className = `sentiment-label ${result.label.toLowerCase()}`;
+    score.textContent = `Score: ${result.score.toFixed(2)}`;
+    
+    preview.style.display = 'block';
+}
+
 function hideSentimentPreview() {
+    // Ignore preview answers for text typed before the preview was hidden
+    previewHiddenSeq = previewSeq;
+    previewPendingText = null;
     document.getElementById('sentimentPreview').style.display = 'none';
 }
 
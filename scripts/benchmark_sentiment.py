@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# Micro-benchmark for the sentiment analysis of the School Feedback Platform
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+from app import sentiment  # noqa: E402
+from app.lexicon import get_lexicon  # noqa: E402
+
+DEFAULT_BASELINE = PROJECT_ROOT / "scripts" / "sentiment_benchmark_baseline.json"
+
+# Neutral Dutch filler that does not hit any lexicon rule
+FILLER_WORDS = [
+    "de", "het", "een", "les", "lessen", "docent", "vandaag", "gisteren", "week",
+    "opdracht", "lokaal", "uur", "klas", "groep", "project", "vak", "boek",
+    "slides", "examen", "toets", "huiswerk", "pauze", "studenten", "wij", "ik",
+    "hebben", "gedaan", "gewerkt", "gelezen", "gemaakt", "over", "met", "na",
+    "voor", "in", "op", "en", "dan", "ook", "nog", "alleen", "soms", "meestal",
+]
+
+# English/other text for the polarity fallback
+FALLBACK_TEXTS = [
+    "the lecture covered chapter four today",
+    "we discussed the assignment in class",
+    "the room was on the second floor",
+    "the course was great and very helpful",
+    "terrible slides and a boring session",
+    "nothing special happened this week",
+]
+
+CATEGORIES = ("short", "long", "misspelled", "fallback", "negation")
+
+
+def _perturb(word: str, rng: random.Random) -> str:
+    letters = list(word)
+    position = rng.randrange(len(letters))
+    operation = rng.choice(("double", "drop", "swap"))
+    if operation == "double":
+        letters.insert(position, letters[position])
+    elif operation == "drop" and len(letters) > 3:
+        del letters[position]
+    elif position + 1 < len(letters):
+        letters[position], letters[position + 1] = letters[position + 1], letters[position]
+    return "".join(letters)
+
+
+def generate_corpus(size: int = 2000, seed: int = 42) -> list:
+    """Reproducible synthetic feedback corpus built from the active lexicon."""
+    rng = random.Random(seed)
+    lexicon = get_lexicon()
+    positive = sorted(lexicon.positive)
+    negative = sorted(lexicon.negative | lexicon.strong_negative)
+    negatable = sorted(lexicon.negatable_positive)
+    neutralized = sorted(lexicon.negation_neutralized)
+    variants = sorted(lexicon.spelling_lookup)
+    fuzzy_targets = list(lexicon.fuzzy_targets)
+
+    def filler(count):
+        return [rng.choice(FILLER_WORDS) for _ in range(count)]
+
+    corpus = []
+    for index in range(size):
+        category = CATEGORIES[index % len(CATEGORIES)]
+        if category == "short":
+            words = filler(rng.randint(0, 2)) + [rng.choice(positive + negative)]
+        elif category == "long":
+            words = filler(rng.randint(80, 200))
+            for _ in range(rng.randint(1, 4)):
+                words.insert(rng.randrange(len(words)), rng.choice(positive + negative))
+        elif category == "misspelled":
+            words = filler(rng.randint(3, 12))
+            typo = rng.choice(variants) if rng.random() < 0.5 else _perturb(rng.choice(fuzzy_targets), rng)
+            words.insert(rng.randrange(len(words)), typo)
+        elif category == "fallback":
+            words = rng.choice(FALLBACK_TEXTS).split() + (filler(rng.randint(0, 10)) if rng.random() < 0.5 else [])
+        else:
+            target = rng.choice(negatable + neutralized)
+            words = filler(rng.randint(2, 10)) + (["niet", "zo", target] if rng.random() < 0.5 else ["niet", target])
+        corpus.append((category, " ".join(words)))
+    return corpus
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[position]
+
+
+def _summary(latencies: list) -> dict:
+    total = sum(latencies)
+    return {
+        "count": len(latencies),
+        "texts_per_sec": round(len(latencies) / total, 1) if total else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 4),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 4),
+    }
+
+
+def run_benchmark(size: int = 2000, seed: int = 42, repeat: int = 3) -> dict:
+    """Time uncached analyze_sentiment per text; group by corpus category and deciding stage."""
+    corpus = generate_corpus(size, seed)
+    # Measure the analysis itself, not the result cache
+    cache_size = sentiment.RESULT_CACHE.maxsize
+    sentiment.RESULT_CACHE.maxsize = 0
+    try:
+        stages = [sentiment.explain_sentiment(text).decided_by for _, text in corpus]
+        for _, text in corpus[:50]:
+            sentiment.analyze_sentiment(text)  # warm-up
+
+        best = [float("inf")] * len(corpus)
+        for _ in range(repeat):
+            for index, (_, text) in enumerate(corpus):
+                start = time.perf_counter()
+                sentiment.analyze_sentiment(text)
+                elapsed = time.perf_counter() - start
+                if elapsed < best[index]:
+                    best[index] = elapsed
+    finally:
+        sentiment.RESULT_CACHE.maxsize = cache_size
+
+    by_category, by_stage = {}, {}
+    for (category, _), stage, latency in zip(corpus, stages, best):
+        by_category.setdefault(category, []).append(latency)
+        by_stage.setdefault(stage, []).append(latency)
+
+    return {
+        "lexicon_version": get_lexicon().version,
+        "corpus": {"size": size, "seed": seed},
+        "overall": _summary(best),
+        "categories": {name: _summary(values) for name, values in sorted(by_category.items())},
+        "stages": {name: _summary(values) for name, values in sorted(by_stage.items())},
+    }
+
+
+def compare_to_baseline(results: dict, baseline: dict, max_regression: float) -> list:
+    """Return a list of regressions (throughput drop larger than max_regression)."""
+    regressions = []
+    sections = [("overall", {"overall": results["overall"]}, {"overall": baseline.get("overall", {})})]
+    sections.append(("categories", results["categories"], baseline.get("categories", {})))
+    for section, current, reference in sections:
+        for name, stats in current.items():
+            expected = reference.get(name, {}).get("texts_per_sec")
+            if not expected:
+                continue
+            ratio = stats["texts_per_sec"] / expected
+            if ratio < 1 - max_regression:
+                regressions.append(
+                    f"{section}/{name}: {stats['texts_per_sec']} texts/sec "
+                    f"vs baseline {expected} ({(1 - ratio) * 100:.0f}% slower)"
+                )
+    return regressions
+
+
+def print_report(results: dict):
+    header = f"{'':<28}{'n':>6}{'texts/sec':>12}{'p50 ms':>10}{'p99 ms':>10}"
+    print(f"Lexicon version: {results['lexicon_version']}")
+    for section in ("categories", "stages"):
+        print(f"\n{section.upper()}")
+        print(header)
+        for name, stats in list(results[section].items()):
+            print(f"{name:<28}{stats['count']:>6}{stats['texts_per_sec']:>12}{stats['p50_ms']:>10}{stats['p99_ms']:>10}")
+    stats = results["overall"]
+    print(f"\n{'overall':<28}{stats['count']:>6}{stats['texts_per_sec']:>12}{stats['p50_ms']:>10}{stats['p99_ms']:>10}")
+
+
+def main():
+    """Run the benchmark, print a report and compare against the stored baseline"""
+    parser = argparse.ArgumentParser(description="Sentiment analysis micro-benchmark")
+    parser.add_argument("--size", type=int, default=2000, help="number of synthetic texts")
+    parser.add_argument("--seed", type=int, default=42, help="corpus seed")
+    parser.add_argument("--repeat", type=int, default=3, help="timing rounds (best per text is kept)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--max-regression", type=float, default=0.5,
+                        help="allowed throughput drop versus the baseline (0.5 = 50%%)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.size, args.seed, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️  No baseline at {args.baseline} (run with --save-baseline)")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    regressions = compare_to_baseline(results, baseline, args.max_regression)
+    if regressions:
+        print("\n❌ Performance regression versus baseline:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("\n✅ No regressions versus baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Build the character trigram language profiles (backend/app/data/language_profiles.json)
+
+import argparse
+import json
+import math
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SAMPLES_DIR = PROJECT_ROOT / "scripts" / "language_samples"
+DEFAULT_OUTPUT = PROJECT_ROOT / "backend" / "app" / "data" / "language_profiles.json"
+
+WORD = re.compile(r"[^\W\d_]+")
+
+
+def trigrams(text: str):
+    """Character trigrams of every word, padded with spaces (" de " -> " de", "de ")."""
+    for word in WORD.findall(text.lower()):
+        padded = f" {word} "
+        for index in range(len(padded) - 2):
+            yield padded[index:index + 3]
+
+
+def build_profiles(samples_dir: Path) -> dict:
+    """Add-one smoothed trigram log-probabilities per language sample file."""
+    counts = {path.stem: Counter(trigrams(path.read_text(encoding="utf-8")))
+              for path in sorted(samples_dir.glob("*.txt"))}
+    if not counts:
+        raise SystemExit(f"❌ No language samples found in {samples_dir}")
+    languages = list(counts)
+    vocabulary = sorted(set().union(*counts.values()))
+    denominators = {language: sum(counts[language].values()) + len(vocabulary) for language in languages}
+    unseen = [round(math.log(1 / denominators[language]), 3) for language in languages]
+    table = {
+        trigram: [round(math.log((counts[language][trigram] + 1) / denominators[language]), 3)
+                  for language in languages]
+        for trigram in vocabulary
+    }
+    return {"languages": languages, "unseen": unseen, "trigrams": table}
+
+
+def main():
+    """Write the language profiles"""
+    parser = argparse.ArgumentParser(description="Build character trigram language profiles")
+    parser.add_argument("--samples", default=str(SAMPLES_DIR), help="directory with <language>.txt samples")
+    parser.add_argument("-o", "--output", default=str(DEFAULT_OUTPUT), help="output JSON file")
+    args = parser.parse_args()
+
+    profiles = build_profiles(Path(args.samples))
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(profiles, handle, ensure_ascii=False, separators=(",", ":"), sort_keys=False)
+        handle.write("\n")
+    print(f"✅ {len(profiles['trigrams'])} trigrams for {', '.join(profiles['languages'])} written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
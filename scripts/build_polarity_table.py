@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# Build the fallback polarity table (backend/app/data/polarity_en.tsv) from TextBlob's pattern lexicon
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT = PROJECT_ROOT / "backend" / "app" / "data" / "polarity_en.tsv"
+
+
+def build_rows():
+    """(word, polarity, intensity, is_modifier) for every word TextBlob can score."""
+    try:
+        from importlib.metadata import version
+        from textblob.en import sentiment
+    except ImportError:
+        raise SystemExit("❌ TextBlob is required to build the table: pip install textblob")
+
+    sentiment.load()  # also derives the "-ly" adverbs, like TextBlob does lazily
+    rows = []
+    for word in sorted(dict.keys(sentiment)):
+        if " " in word:
+            continue  # multi-word entries never match a single token
+        senses = dict.__getitem__(sentiment, word)
+        polarity, _subjectivity, intensity = senses[None]
+        is_modifier = any(pos in senses for pos in sentiment.modifiers)
+        rows.append((word, polarity, intensity, is_modifier))
+    return version("textblob"), rows
+
+
+def main():
+    """Write the polarity table"""
+    parser = argparse.ArgumentParser(description="Build the fallback polarity table from TextBlob")
+    parser.add_argument("-o", "--output", default=str(DEFAULT_OUTPUT), help="output TSV file")
+    args = parser.parse_args()
+
+    version, rows = build_rows()
+    with open(args.output, "w", encoding="utf-8", newline="\n") as handle:
+        handle.write(f"# Generated by scripts/build_polarity_table.py from textblob {version} (pattern en-sentiment.xml)\n")
+        handle.write("# word\tpolarity\tintensity\tmodifier\n")
+        for word, polarity, intensity, is_modifier in rows:
+            handle.write(f"{word}\t{polarity!r}\t{intensity!r}\t{int(is_modifier)}\n")
+    print(f"✅ {len(rows)} words written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
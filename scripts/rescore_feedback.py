@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# Re-score stored feedback after a lexicon or engine change (keyset pagination, process pool, bulk UPDATEs)
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+# Workers score in their own process; no nested sentiment process pools
+os.environ["SENTIMENT_EXECUTOR"] = "inline"
+
+from sqlalchemy import or_, select, update  # noqa: E402
+
+from app.database import DATABASE_URL, SessionLocal, run_migrations  # noqa: E402
+from app.models import Feedback  # noqa: E402
+from app.segmentation import SENTIMENT_MAX_TEXT_LENGTH, TextTooLongError  # noqa: E402
+from app.sentiment_engines import SENTIMENT_ENGINE, get_engine  # noqa: E402
+from score_feedback import Progress  # noqa: E402
+
+
+def _score_page(engine_name: str, texts: list) -> list:
+    """
+    (result, version) per text, with the version the worker actually scored
+    with; None for texts skipped as too long (SENTIMENT_OVERSIZE_POLICY=reject).
+    """
+    # Runs in a worker process; the engine (lexicon/model) loads once per worker
+    engine = get_engine(engine_name)
+    try:
+        return engine.analyze_batch_versioned(texts)
+    except TextTooLongError:
+        return [_score_one(engine, text) for text in texts]
+
+
+def _score_one(engine, text: str):
+    try:
+        return engine.analyze_batch_versioned([text])[0]
+    except TextTooLongError:
+        return None
+
+
+def build_filter(engine_name: str, version: str, versions=None, engines=None, rescore_all: bool = False):
+    """WHERE clause for the rows to re-score (default: everything not scored by engine@version)."""
+    conditions = []
+    if versions:
+        conditions.append(Feedback.lexicon_version.in_(versions))
+    if engines:
+        conditions.append(Feedback.sentiment_engine.in_(engines))
+    if not conditions and not rescore_all:
+        conditions.append(or_(
+            Feedback.lexicon_version.is_(None),
+            Feedback.lexicon_version != version,
+            Feedback.sentiment_engine.is_(None),
+            Feedback.sentiment_engine != engine_name,
+        ))
+    return conditions
+
+
+def read_pages(conditions, page_size: int, after_id: int = 0):
+    """(last_id, ids, texts) pages in id order; keyset pagination, no OFFSET."""
+    while True:
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(Feedback.id, Feedback.text)
+                .where(Feedback.id > after_id, *conditions)
+                .order_by(Feedback.id)
+                .limit(page_size)
+            ).all()
+        if not rows:
+            return
+        after_id = rows[-1][0]
+        yield after_id, [row[0] for row in rows], [row[1] for row in rows]
+
+
+def write_page(ids: list, scored: list, engine_name: str) -> None:
+    """One bulk UPDATE (executemany by primary key) and one commit per page; skipped rows (None) are left as they are."""
+    rows = []
+    for feedback_id, item in zip(ids, scored):
+        if item is None:
+            continue
+        (label, score, confidence), version = item
+        rows.append({
+            "id": feedback_id,
+            "sentiment_label": label,
+            "sentiment_score": score,
+            "sentiment_confidence": confidence,
+            "lexicon_version": version,
+            "sentiment_engine": engine_name,
+        })
+    if not rows:
+        return
+    with SessionLocal() as db:
+        db.execute(update(Feedback), rows)
+        db.commit()
+
+
+class Checkpoint:
+    """Last committed id per target (engine@version), written atomically after every page."""
+
+    def __init__(self, path: str, target: str):
+        self.path = path
+        self.target = target
+        self.last_id = 0
+        self.rescored = 0
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as handle:
+                state = json.load(handle)
+            if state.get("target") == target:
+                self.last_id = state["last_id"]
+                self.rescored = state["rescored"]
+
+    def save(self, last_id: int, count: int) -> None:
+        self.last_id = last_id
+        self.rescored += count
+        if not self.path:
+            return
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump({"target": self.target, "last_id": last_id, "rescored": self.rescored,
+                       "updated_at": time.time()}, handle)
+        os.replace(temporary, self.path)
+
+
+class Throttle:
+    """Sleep between pages so the run stays under max_rate rows/sec (0 = unthrottled)."""
+
+    def __init__(self, max_rate: float, pause: float = 0.0):
+        self.max_rate = max_rate
+        self.pause = pause
+        self.started = time.perf_counter()
+        self.rows = 0
+
+    def wait(self, rows: int) -> None:
+        self.rows += rows
+        delay = self.pause
+        if self.max_rate > 0:
+            delay = max(delay, self.rows / self.max_rate - (time.perf_counter() - self.started))
+        if delay > 0:
+            time.sleep(delay)
+
+
+def rescore(pages, engine_name: str, checkpoint: Checkpoint, throttle: Throttle,
+            progress: Progress, workers: int = 0, dry_run: bool = False) -> None:
+    """
+    Score pages and write them back in id order. Pages are scored ahead in
+    the pool (at most 2 x workers in flight) while earlier pages are written;
+    the checkpoint only moves past pages that are committed. Rows stored with
+    the version their worker scored with; over-long rows are skipped.
+    """
+    def apply(last_id, ids, scored):
+        if not dry_run:
+            write_page(ids, scored, engine_name)
+            checkpoint.save(last_id, sum(item is not None for item in scored))
+        for item in scored:
+            if item is None:
+                progress.skipped += 1
+                progress.update(None, f"skipped: text longer than {SENTIMENT_MAX_TEXT_LENGTH} characters")
+            else:
+                progress.update(item[0], None)
+        throttle.wait(len(ids))
+
+    if workers <= 0:
+        for last_id, ids, texts in pages:
+            apply(last_id, ids, _score_page(engine_name, texts))
+        return
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for last_id, ids, texts in pages:
+            pending.append((last_id, ids, pool.submit(_score_page, engine_name, texts)))
+            if len(pending) >= workers * 2:
+                last_id, ids, future = pending.popleft()
+                apply(last_id, ids, future.result())
+        while pending:
+            last_id, ids, future = pending.popleft()
+            apply(last_id, ids, future.result())
+
+
+def main(argv=None):
+    """Re-score stored feedback rows"""
+    parser = argparse.ArgumentParser(description="Re-score stored feedback with the current lexicon/engine")
+    parser.add_argument("--engine", default=SENTIMENT_ENGINE, help="engine to score with (default: SENTIMENT_ENGINE)")
+    parser.add_argument("--lexicon-version", action="append", dest="versions",
+                        help="only rows scored with this lexicon/model version (repeatable)")
+    parser.add_argument("--from-engine", action="append", dest="engines",
+                        help="only rows scored by this engine (repeatable)")
+    parser.add_argument("--all", action="store_true", help="re-score every row, also up-to-date ones")
+    parser.add_argument("--batch-size", type=int, default=2000, help="rows per page and per bulk UPDATE")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (0 = score in this process)")
+    parser.add_argument("--checkpoint", default="", help="checkpoint file; an existing one resumes the run")
+    parser.add_argument("--max-rate", type=float, default=0, help="max rows/sec written (0 = unthrottled)")
+    parser.add_argument("--pause", type=float, default=0, help="seconds to sleep after every page")
+    parser.add_argument("--dry-run", action="store_true", help="score but do not write")
+    parser.add_argument("--progress", type=float, default=5.0,
+                        help="seconds between progress reports on stderr (0 = off)")
+    args = parser.parse_args(argv)
+
+    run_migrations()
+    engine = get_engine(args.engine)
+    target = f"{engine.name}@{engine.version}"
+    checkpoint = Checkpoint(args.checkpoint, target)
+    conditions = build_filter(engine.name, engine.version, args.versions, args.engines, args.all)
+
+    print(f"🔁 Re-scoring {DATABASE_URL} with {target}", file=sys.stderr)
+    if checkpoint.last_id:
+        print(f"   Resuming after id {checkpoint.last_id} ({checkpoint.rescored} rows done)", file=sys.stderr)
+    progress = Progress(args.progress)
+    rescore(
+        read_pages(conditions, max(1, args.batch_size), checkpoint.last_id),
+        engine.name, checkpoint, Throttle(args.max_rate, args.pause), progress,
+        workers=args.workers, dry_run=args.dry_run,
+    )
+
+    summary = progress.summary()
+    print(f"✅ {summary['records']} rows in {summary['seconds']}s "
+          f"({summary['records_per_sec']} rows/sec), {summary['skipped']} skipped as too long"
+          f"{' (dry run)' if args.dry_run else ''}", file=sys.stderr)
+    print(f"   Labels: {json.dumps(summary['labels'])}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
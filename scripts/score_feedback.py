@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# Offline bulk scoring of feedback dumps (NDJSON/CSV) with the platform's sentiment analysis
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+from app.lexicon import get_lexicon  # noqa: E402
+from app.segmentation import SENTIMENT_MAX_TEXT_LENGTH, TextTooLongError  # noqa: E402
+from app.sentiment import analyze_sentiment, analyze_sentiment_batch  # noqa: E402
+
+# Same names as the Feedback columns
+RESULT_FIELDS = ("sentiment_label", "sentiment_score", "sentiment_confidence")
+FORMATS = ("ndjson", "csv")
+
+
+def _score_chunk(texts: list) -> list:
+    # Runs in a worker process; the lexicon is compiled once per worker on import
+    try:
+        return analyze_sentiment_batch(texts)
+    except TextTooLongError:
+        # SENTIMENT_OVERSIZE_POLICY=reject: skip only the over-long texts (None), not the run
+        return [_score_one(text) for text in texts]
+
+
+def _score_one(text: str):
+    try:
+        return analyze_sentiment(text)
+    except TextTooLongError:
+        return None
+
+
+def _detect_format(path: str, default: str = "ndjson") -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".ndjson", ".jsonl", ".json"):
+        return "ndjson"
+    return default
+
+
+def read_ndjson(handle, text_field: str):
+    """Yield (record, text, error) per line; invalid lines yield an error instead of a text."""
+    for line_number, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield {"line": line_number}, None, f"invalid JSON: {error.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield {"line": line_number}, None, "record is not a JSON object"
+            continue
+        text = record.get(text_field)
+        if not isinstance(text, str):
+            yield record, None, f"missing text field '{text_field}'"
+            continue
+        yield record, text, None
+
+
+def read_csv(handle, text_field: str):
+    """Yield (record, text, error) per CSV row."""
+    reader = csv.DictReader(handle)
+    if reader.fieldnames is None or text_field not in reader.fieldnames:
+        raise SystemExit(f"❌ CSV input has no column '{text_field}'")
+    for record in reader:
+        yield record, record[text_field] or "", None
+
+
+class ResultWriter:
+    """
+    Writes input records extended with the sentiment fields.
+    The CSV header follows the first scored record; error rows before it are
+    held back so an invalid first line cannot fix the columns for the whole run.
+    """
+
+    def __init__(self, handle, output_format: str):
+        self.handle = handle
+        self.output_format = output_format
+        self._csv = None
+        self._held = []
+
+    def write(self, record: dict, result, error) -> None:
+        if result is not None:
+            record = {**record, **dict(zip(RESULT_FIELDS, result))}
+        else:
+            record = {**record, **dict.fromkeys(RESULT_FIELDS), "error": error}
+        if self.output_format == "ndjson":
+            self.handle.write(json.dumps(record, ensure_ascii=False))
+            self.handle.write("\n")
+            return
+        if self._csv is None:
+            if result is None:
+                self._held.append(record)
+                return
+            self._start_csv([record])
+        self._csv.writerow(record)
+
+    def close(self) -> None:
+        """Write held-back error rows when no record was scored at all."""
+        if self.output_format == "csv" and self._csv is None and self._held:
+            self._start_csv(self._held)
+
+    def _start_csv(self, header_records: list) -> None:
+        fieldnames = []
+        for record in header_records:
+            fieldnames += [key for key in record
+                           if key not in RESULT_FIELDS and key != "error" and key not in fieldnames]
+        self._csv = csv.DictWriter(
+            self.handle, fieldnames=fieldnames + list(RESULT_FIELDS) + ["error"],
+            extrasaction="ignore", restval="",
+        )
+        self._csv.writeheader()
+        held, self._held = self._held, []
+        for record in held:
+            self._csv.writerow(record)
+
+
+class Progress:
+    """Periodic progress and throughput report on stderr."""
+
+    def __init__(self, interval: float, stream=sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self.started = self._last = time.perf_counter()
+        self.records = 0
+        self.errors = 0
+        self.skipped = 0
+        self.labels = Counter()
+
+    def update(self, result, error) -> None:
+        self.records += 1
+        if error is not None:
+            self.errors += 1
+        else:
+            self.labels[result[0]] += 1
+        if self.interval > 0:
+            now = time.perf_counter()
+            if now - self._last >= self.interval:
+                self._last = now
+                print(f"⏳ {self.records} records, {self.rate():.0f} records/sec", file=self.stream, flush=True)
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.records / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "records": self.records,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "seconds": round(time.perf_counter() - self.started, 3),
+            "records_per_sec": round(self.rate(), 1),
+            "labels": dict(self.labels),
+        }
+
+
+def _chunks(records, size: int):
+    chunk = []
+    for item in records:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def score_stream(records, writer: ResultWriter, progress: Progress, workers: int = 0,
+                 chunk_size: int = 1000, max_pending: int = 0) -> None:
+    """
+    Score (record, text, error) tuples and write them in input order.
+    With workers > 0 chunks go to a process pool; at most max_pending chunks
+    are in flight, so memory stays bounded regardless of the input size.
+    """
+    def emit(chunk, results):
+        scored = iter(results)
+        for record, text, error in chunk:
+            result = next(scored) if error is None else None
+            if error is None and result is None:
+                error = f"skipped: text longer than {SENTIMENT_MAX_TEXT_LENGTH} characters"
+                progress.skipped += 1
+            writer.write(record, result, error)
+            progress.update(result, error)
+
+    if workers <= 0:
+        for chunk in _chunks(records, chunk_size):
+            emit(chunk, _score_chunk([text for _, text, error in chunk if error is None]))
+        return
+
+    max_pending = max_pending or workers * 2
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in _chunks(records, chunk_size):
+            texts = [text for _, text, error in chunk if error is None]
+            pending.append((chunk, pool.submit(_score_chunk, texts)))
+            if len(pending) >= max_pending:
+                chunk, future = pending.popleft()
+                emit(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            emit(chunk, future.result())
+
+
+def _open_input(path: str):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def _open_output(path: str):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="", write_through=False)
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def main(argv=None):
+    """Stream a feedback dump through the sentiment analysis"""
+    parser = argparse.ArgumentParser(description="Score an NDJSON/CSV feedback dump with the sentiment analysis")
+    parser.add_argument("input", nargs="?", default="-", help="input file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--input-format", choices=FORMATS, help="default: from the file extension, else ndjson")
+    parser.add_argument("--output-format", choices=FORMATS, help="default: same as the input format")
+    parser.add_argument("--text-field", default="text", help="field/column with the feedback text")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (0 = score in this process)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="records per worker task")
+    parser.add_argument("--progress", type=float, default=5.0,
+                        help="seconds between progress reports on stderr (0 = off)")
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format or _detect_format(args.input)
+    output_format = args.output_format or (
+        _detect_format(args.output, input_format) if args.output != "-" else input_format
+    )
+    if input_format == "csv":
+        # Long free-text answers can exceed the default 128 KB field limit
+        csv.field_size_limit(sys.maxsize)
+
+    print(f"🔤 Lexicon version: {get_lexicon().version}", file=sys.stderr)
+    progress = Progress(args.progress)
+    with _open_input(args.input) as source, _open_output(args.output) as target:
+        reader = read_csv if input_format == "csv" else read_ndjson
+        writer = ResultWriter(target, output_format)
+        score_stream(
+            reader(source, args.text_field), writer, progress,
+            workers=args.workers, chunk_size=max(1, args.chunk_size),
+        )
+        writer.close()
+
+    summary = progress.summary()
+    print(f"✅ {summary['records']} records in {summary['seconds']}s "
+          f"({summary['records_per_sec']} records/sec), {summary['errors']} errors "
+          f"({summary['skipped']} skipped as too long)", file=sys.stderr)
+    print(f"   Labels: {json.dumps(summary['labels'])}", file=sys.stderr)
+    return 1 if summary["errors"] and summary["errors"] == summary["records"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
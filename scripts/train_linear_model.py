@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# Train the hashed-feature linear sentiment model (SENTIMENT_ENGINE=linear) on labelled Feedback rows
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+from sqlalchemy import or_, select  # noqa: E402
+
+from app.database import DATABASE_URL, SessionLocal  # noqa: E402
+from app.models import Feedback  # noqa: E402
+from app.sentiment_engines import LINEAR_MODEL_PATH  # noqa: E402
+
+
+def load_rows(min_confidence: float, engine: str) -> list:
+    """(text, label) of every labelled row, optionally only from one engine."""
+    query = (
+        select(Feedback.text, Feedback.sentiment_label)
+        .where(Feedback.sentiment_label.is_not(None))
+        .where(Feedback.sentiment_confidence >= min_confidence)
+    )
+    if engine == "rules":
+        # Rows from before the engine column existed were scored by the rules
+        query = query.where(or_(Feedback.sentiment_engine == "rules", Feedback.sentiment_engine.is_(None)))
+    elif engine != "all":
+        query = query.where(Feedback.sentiment_engine == engine)
+    with SessionLocal() as db:
+        return [(text, label) for text, label in db.execute(query.execution_options(yield_per=5000))]
+
+
+def main(argv=None):
+    """Train and write the linear model"""
+    parser = argparse.ArgumentParser(description="Train the linear sentiment model on labelled feedback")
+    parser.add_argument("-o", "--output", default=LINEAR_MODEL_PATH, help="output .npz file")
+    parser.add_argument("--min-confidence", type=float, default=0.8,
+                        help="only rows labelled with at least this confidence (0.8 = decided by a rule)")
+    parser.add_argument("--engine", default="rules", help="only rows scored by this engine ('all' = any)")
+    parser.add_argument("--features", type=int, default=1 << 18, help="hashed feature columns")
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--learning-rate", type=float, default=1.0)
+    parser.add_argument("--holdout", type=float, default=0.1, help="fraction held out for the accuracy report")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    try:
+        from app.linear_model import LABELS, train
+    except ImportError:
+        raise SystemExit("❌ NumPy is required to train the model: pip install numpy")
+
+    rows = [row for row in load_rows(args.min_confidence, args.engine) if row[1] in LABELS]
+    if not rows:
+        raise SystemExit(f"❌ No labelled feedback found in {DATABASE_URL}")
+    random.Random(args.seed).shuffle(rows)
+    split = int(len(rows) * (1 - args.holdout)) if len(rows) > 1 else len(rows)
+    training, holdout = rows[:split], rows[split:]
+    print(f"📚 {len(training)} training rows, {len(holdout)} held out: "
+          f"{dict(Counter(label for _, label in rows))}")
+
+    started = time.perf_counter()
+    model = train([text for text, _ in training], [label for _, label in training],
+                  n_features=args.features, epochs=args.epochs, learning_rate=args.learning_rate)
+    print(f"⏱️  Trained in {time.perf_counter() - started:.1f}s")
+    if holdout:
+        predicted = model.predict([text for text, _ in holdout])
+        correct = sum(result[0] == label for result, (_, label) in zip(predicted, holdout))
+        print(f"🎯 Holdout accuracy: {correct / len(holdout):.3f}")
+
+    model.save(args.output)
+    print(f"✅ Model {model.version} written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
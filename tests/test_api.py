@@ -3,6 +3,7 @@
 import pytest
 import requests
 import json
+import time
 from datetime import datetime
 
 class TestFeedbackAPI:
@@ -59,6 +60,19 @@ class TestFeedbackAPI:
         assert isinstance(result["score"], (int, float))
         assert isinstance(result["confidence"], (int, float))
     
+    def test_sentiment_endpoint_trace(self):
+        """Test the trace switch of the sentiment endpoint"""
+        response = requests.get(f"{self.BASE_URL}/test-sentiment?text=Heel slegt uitgelegd&trace=1")
+        assert response.status_code == 200
+        
+        result = response.json()
+        assert result["label"] == "Negative"
+        assert result["trace"]["decided_by"] == "word_loop"
+        assert any(rule["token"] == "slegt" for rule in result["trace"]["rules"])
+        
+        plain = requests.get(f"{self.BASE_URL}/test-sentiment?text=Heel slegt uitgelegd").json()
+        assert "trace" not in plain
+    
     def test_feedback_submission(self):
         """Test anonymous feedback submission"""
         feedback_data = {
@@ -98,6 +112,147 @@ class TestFeedbackAPI:
             # Login might fail if credentials changed
             assert response.status_code in [400, 401]
 
+    def test_feedback_batch_submission(self):
+        """Test bulk feedback import in one request"""
+        login = requests.post(
+            f"{self.BASE_URL}/auth/login",
+            data={"username": "admin", "password": "Password123!"}
+        )
+        if login.status_code != 200:
+            pytest.skip("Admin login not available")
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        
+        items = [
+            {"text": "De lessen zijn geweldig", "category_id": 1, "subject_id": 1},
+            {"text": "De lessen zijn geweldig", "category_id": 1, "subject_id": 1},
+            {"text": "Lessen zijn onnozel", "category_id": 2, "subject_id": 1},
+            {"text": "   ", "category_id": 1, "subject_id": 1},
+            {"text": "Onbekende categorie", "category_id": 9999, "subject_id": 1}
+        ]
+        response = requests.post(
+            f"{self.BASE_URL}/feedback/batch",
+            json={"items": items},
+            headers=headers
+        )
+        
+        assert response.status_code == 200
+        result = response.json()
+        assert result["received"] == 5
+        assert result["created"] == 3
+        assert result["rejected"] == 2
+        assert [r["index"] for r in result["results"]] == [0, 1, 2, 3, 4]
+        assert result["results"][0]["sentiment"]["label"] == "Positive"
+        assert result["results"][2]["sentiment"]["label"] == "Negative"
+        assert result["results"][3]["status"] == "rejected"
+        assert result["results"][4]["status"] == "rejected"
+        assert len({r["id"] for r in result["results"][:3]}) == 3
+    
+    def test_lexicon_reload(self):
+        """Test lexicon info and admin reload endpoints"""
+        login = requests.post(
+            f"{self.BASE_URL}/auth/login",
+            data={"username": "admin", "password": "Password123!"}
+        )
+        if login.status_code != 200:
+            pytest.skip("Admin login not available")
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        
+        info = requests.get(f"{self.BASE_URL}/sentiment/lexicon", headers=headers)
+        assert info.status_code == 200
+        version = info.json()["version"]
+        
+        response = requests.post(f"{self.BASE_URL}/sentiment/lexicon/reload", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["version"] == version
+        assert response.json()["changed"] is False
+    
+    def test_db_pool_stats(self):
+        """Test connection pool statistics endpoint"""
+        login = requests.post(
+            f"{self.BASE_URL}/auth/login",
+            data={"username": "admin", "password": "Password123!"}
+        )
+        if login.status_code != 200:
+            pytest.skip("Admin login not available")
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        
+        response = requests.get(f"{self.BASE_URL}/db/pool", headers=headers)
+        assert response.status_code == 200
+        stats = response.json()
+        assert "pool" in stats
+        if stats["dialect"] == "sqlite" and "journal_mode" in stats["pragmas"]:
+            assert stats["pragmas"]["journal_mode"] == "wal"
+    
+    def test_feedback_cursor_pagination(self):
+        """Test keyset pagination of the feedback list"""
+        login = requests.post(
+            f"{self.BASE_URL}/auth/login",
+            data={"username": "admin", "password": "Password123!"}
+        )
+        if login.status_code != 200:
+            pytest.skip("Admin login not available")
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        
+        for text in ["Cursor test een", "Cursor test twee", "Cursor test drie"]:
+            requests.post(f"{self.BASE_URL}/feedback", json={"text": text, "category_id": 1, "subject_id": 1})
+        
+        first = requests.get(f"{self.BASE_URL}/feedback?limit=2", headers=headers)
+        assert first.status_code == 200
+        cursor = first.headers.get("X-Next-Cursor")
+        assert cursor
+        
+        second = requests.get(f"{self.BASE_URL}/feedback?limit=2&cursor={cursor}", headers=headers)
+        assert second.status_code == 200
+        # Same rows as skip/limit, without duplicates
+        offset = requests.get(f"{self.BASE_URL}/feedback?limit=2&skip=2", headers=headers)
+        assert [f["id"] for f in second.json()] == [f["id"] for f in offset.json()]
+        assert not {f["id"] for f in first.json()} & {f["id"] for f in second.json()}
+        
+        invalid = requests.get(f"{self.BASE_URL}/feedback?cursor=niet-geldig", headers=headers)
+        assert invalid.status_code == 400
+        
+        for limit in (0, -1):
+            assert requests.get(f"{self.BASE_URL}/feedback?limit={limit}", headers=headers).status_code == 422
+    
+    def test_feedback_ingest_queue(self):
+        """Test the write-behind ingestion endpoints (queue mode when enabled on the server)"""
+        login = requests.post(
+            f"{self.BASE_URL}/auth/login",
+            data={"username": "admin", "password": "Password123!"}
+        )
+        if login.status_code != 200:
+            pytest.skip("Admin login not available")
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        
+        stats = requests.get(f"{self.BASE_URL}/feedback/queue", headers=headers)
+        assert stats.status_code == 200
+        assert "depth" in stats.json()["queue"]
+        assert requests.get(f"{self.BASE_URL}/feedback/queue/onbekend").status_code == 404
+        if not stats.json()["enabled"]:
+            return
+        
+        response = requests.post(
+            f"{self.BASE_URL}/feedback",
+            json={"text": "De uitleg was heel duidelijk", "category_id": 1, "subject_id": 1}
+        )
+        assert response.status_code == 202
+        ticket = response.json()["id"]
+        for _ in range(50):
+            status = requests.get(f"{self.BASE_URL}/feedback/queue/{ticket}").json()
+            if status["status"] != "queued":
+                break
+            time.sleep(0.1)
+        assert status["status"] == "stored"
+        assert status["feedback_id"]
+    
+    def test_feedback_batch_requires_auth(self):
+        """Test that bulk import is not anonymous"""
+        response = requests.post(
+            f"{self.BASE_URL}/feedback/batch",
+            json={"items": []}
+        )
+        assert response.status_code == 401
+
 class TestSentimentEndpoint:
     """Specific tests for sentiment analysis endpoint"""
     
@@ -148,6 +303,21 @@ class TestSentimentEndpoint:
             result = response.json()
             assert result["label"] == "Neutral"
 
+    def test_live_preview_websocket(self):
+        """Test debounced live preview over WebSocket"""
+        sync_client = pytest.importorskip("websockets.sync.client")
+
+        with sync_client.connect("ws://localhost:8000/sentiment/preview") as socket:
+            for seq, text in enumerate(["De les", "De les was", "De les was geweldig"]):
+                socket.send(json.dumps({"text": text, "seq": seq}))
+            # Snel na elkaar verstuurd: alleen de laatste tekst wordt gescoord
+            result = json.loads(socket.recv(timeout=5))
+            assert result["seq"] == 2
+            assert result["label"] == "Positive"
+
+            socket.send("geen json")
+            assert "error" in json.loads(socket.recv(timeout=5))
+
 if __name__ == "__main__":
     # Run tests
     pytest.main([__file__, "-v"])
@@ -0,0 +1,151 @@
+# Database schema and migration tests for the School Feedback Platform
+
+import pytest
+import sys
+import os
+
+# Add backend to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+pytest.importorskip("alembic")
+
+from sqlalchemy import create_engine, inspect, text
+from app.database import migration_config, run_migrations
+from app import query_plans
+
+class TestMigrations:
+    """Test cases for the versioned schema migrations"""
+
+    def test_fresh_database(self, tmp_path):
+        """An empty database is migrated to the latest revision, idempotently"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+        assert run_migrations(engine) == "0002"
+        assert run_migrations(engine) == "0002"
+
+        indexes = {index["name"] for index in inspect(engine).get_indexes("feedback")}
+        assert {"ix_feedback_created_at_id", "ix_feedback_category_created",
+                "ix_feedback_language_sentiment"} <= indexes
+
+    def test_legacy_database(self, tmp_path):
+        """A database created before migrations keeps its rows and gets new columns"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE feedback (id INTEGER PRIMARY KEY, text TEXT NOT NULL, "
+                "sentiment_label VARCHAR, category_id INTEGER, subject_id INTEGER, created_at DATETIME)"
+            ))
+            connection.execute(text("INSERT INTO feedback (text) VALUES ('bestaande feedback')"))
+
+        assert run_migrations(engine) == "0002"
+        columns = {column["name"] for column in inspect(engine).get_columns("feedback")}
+        assert {"language", "sentiment_engine", "lexicon_version"} <= columns
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT count(*) FROM feedback")).scalar() == 1
+
+    def test_dashboard_queries_use_indexes(self, tmp_path):
+        """The planner uses an index for every dashboard query shape"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+        run_migrations(engine)
+        with engine.connect() as connection:
+            results = query_plans.check(connection)
+        assert not [name for name, result in results.items() if result["full_scan"]]
+
+        from alembic import command
+        config = migration_config()
+        with engine.begin() as connection:
+            config.attributes["connection"] = connection
+            command.downgrade(config, "0001")
+        # Fresh connections: the sqlite3 statement cache keeps the old plan
+        engine.dispose()
+        with engine.connect() as connection:
+            assert query_plans.check(connection)["feedback_by_category"]["full_scan"]
+
+class TestFeedbackListing:
+    """Test cases for the query cost of the feedback listing"""
+
+    def test_constant_query_count(self, tmp_path):
+        """A page costs one query, whatever its size"""
+        import asyncio
+        from fastapi import Response
+        from sqlalchemy import event, insert
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+        from app.models import Category, Feedback, Subject
+        from app.routers_feedback import get_feedback
+
+        pytest.importorskip("aiosqlite")
+        engine = create_engine(f"sqlite:///{tmp_path / 'listing.db'}")
+        run_migrations(engine)
+        with engine.begin() as connection:
+            connection.execute(insert(Category), [{"name": f"Categorie {i}"} for i in range(1, 5)])
+            connection.execute(insert(Subject), [{"name": f"Vak {i}"} for i in range(1, 5)])
+            connection.execute(insert(Feedback), [
+                {"text": f"Feedback {i}", "category_id": i % 4 + 1, "subject_id": i % 3 + 1}
+                for i in range(120)
+            ])
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'listing.db'}")
+        statements = []
+        event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        async def page(limit):
+            async with AsyncSession(async_engine) as db:
+                return await get_feedback(Response(), limit=limit, current_user=None, db=db)
+
+        counts = {}
+        for limit in (5, 100):
+            statements.clear()
+            rows = asyncio.run(page(limit))
+            counts[limit] = len(statements)
+            assert len(rows) == limit
+            assert rows[0]["category"].startswith("Categorie") and rows[0]["subject"].startswith("Vak")
+        asyncio.run(async_engine.dispose())
+        assert counts == {5: 1, 100: 1}
+
+class TestIngestQueue:
+    """Test cases for the write-behind feedback ingestion queue"""
+
+    def make_queue(self, tmp_path, **options):
+        from sqlalchemy.orm import sessionmaker
+        from app.feedback_ingest import IngestQueue
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}")
+        run_migrations(engine)
+        return engine, IngestQueue(sessionmaker(bind=engine), enabled=True, linger=0, **options)
+
+    def test_batches_and_drain(self, tmp_path):
+        """Queued submissions are written in grouped transactions and drained on stop"""
+        from app.routers_feedback import FeedbackCreate
+
+        engine, queue = self.make_queue(tmp_path, queue_size=100, batch_size=10)
+        tickets = [queue.submit(FeedbackCreate(text=f"Goede les {i}", category_id=1, subject_id=1))
+                   for i in range(25)]
+        assert queue.snapshot()["queue"]["depth"] == 25
+
+        queue.start()
+        assert queue.stop() == 0
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT count(*) FROM feedback")).scalar() == 25
+
+        stats = queue.snapshot()
+        assert stats["stored"] == 25 and stats["queue"]["depth"] == 0
+        assert stats["batches"]["count"] == 3 and stats["batches"]["largest"] == 10
+        status = queue.status(tickets[0])
+        assert status["status"] == "stored" and status["sentiment"]["label"] == "Positive"
+
+    def test_backpressure(self, tmp_path):
+        """A full or closing queue rejects new submissions"""
+        from app.feedback_ingest import QueueFullError
+        from app.routers_feedback import FeedbackCreate
+
+        _, queue = self.make_queue(tmp_path, queue_size=2)
+        item = FeedbackCreate(text="Prima", category_id=1, subject_id=1)
+        queue.submit(item)
+        queue.submit(item)
+        with pytest.raises(QueueFullError):
+            queue.submit(item)
+
+        queue.start()
+        queue.stop()
+        with pytest.raises(QueueFullError):
+            queue.submit(item)
+        assert queue.snapshot()["rejected"] == 2
@@ -3,11 +3,20 @@
 import pytest
 import sys
 import os
+import time
 
 # Add backend to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
-from app.sentiment import analyze_sentiment
+from app.sentiment import analyze_sentiment, analyze_sentiment_batch, explain_sentiment, match_phrase_stage
+from app import lexicon
+from app.phrase_matcher import PhraseMatcher
+from app.fuzzy_index import FuzzyIndex, similarity_ratio
+from app.sentiment_cache import SentimentCache, content_key
+from app.tokenizer import Tokens
+from app.segmentation import TextTooLongError, aggregate_segments, split_segments
+from app.language import detect_language
+from app.sentiment_engines import SentimentEngine
 
 class TestSentimentAnalysis:
     """Test cases for Dutch sentiment analysis"""
@@ -101,6 +110,18 @@ class TestSentimentAnalysis:
             label, score, confidence = analyze_sentiment(text)
             assert 0 <= confidence <= 1, f"Confidence should be 0-1, got {confidence} for: {text}"
     
+    def test_batch_matches_single(self):
+        """Batch scoring returns the same results as single calls, in order"""
+        texts = [
+            "De lessen zijn geweldig en heel leuk",
+            "Lessen zijn onozzel",
+            "De lessen zijn geweldig en heel leuk",
+            "Normale lessen, niets bijzonders",
+            ""
+        ]
+        assert analyze_sentiment_batch(texts) == [analyze_sentiment(t) for t in texts]
+        assert analyze_sentiment_batch([]) == []
+    
     def test_empty_text(self):
         """Test handling of empty or whitespace text"""
         test_cases = ["", "   ", "\n\t"]
@@ -110,6 +131,658 @@ class TestSentimentAnalysis:
             # Should handle gracefully without crashing
             assert label in ["Positive", "Negative", "Neutral"]
 
+class TestSentimentTrace:
+    """Test cases for the opt-in trace mode"""
+    
+    def test_no_output_without_trace(self, capsys):
+        """Plain analysis does no printing"""
+        analyze_sentiment("De lessen zijn niet zo goed en best saai")
+        analyze_sentiment("Normale lessen, niets bijzonders")
+        assert capsys.readouterr().out == ""
+    
+    def test_trace_phrase_stage(self):
+        """A phrase stage decision lists all phrase hits"""
+        trace = explain_sentiment("Super leuk maar niet goed").to_dict()
+        assert trace["decided_by"] == "negation_negative"
+        assert trace["label"] == "Negative"
+        hits = {(hit["stage"], hit["phrase"]) for hit in trace["phrase_hits"]}
+        assert ("negation_negative", "niet goed") in hits
+        assert ("positive_trigger", "super") in hits
+    
+    def test_trace_word_loop(self):
+        """Word loop rules are listed with their weights and counts"""
+        text = "Vandaag was het saai en de uitleg was waardelos"
+        trace = explain_sentiment(text).to_dict()
+        assert trace["decided_by"] == "word_loop"
+        assert (trace["label"], trace["score"], trace["confidence"]) == analyze_sentiment(text)
+        rules = {(rule["rule"], rule["token"]): rule["weight"] for rule in trace["rules"]}
+        assert rules[("negative", "saai")] == -1
+        assert rules[("strong_negative_spelling", "waardelos")] == -2
+        assert trace["counts"]["negative"] == sum(-w for w in rules.values())
+
+class TestSentimentProfiler:
+    """Test cases for the per-stage profiler"""
+
+    def test_profile_counts_stages_and_rules(self):
+        """Deciding stages, phases and matched rules are counted"""
+        from app import sentiment
+        from app.lexicon import get_lexicon
+        from app.sentiment_profiler import StageProfiler
+
+        profiler = StageProfiler()
+        original, sentiment.PROFILER = sentiment.PROFILER, profiler
+        sentiment.RESULT_CACHE.clear()
+        try:
+            analyze_sentiment("Super leuk maar niet goed")
+            analyze_sentiment("Vandaag was het saai")
+            analyze_sentiment("Vandaag was het saai")
+        finally:
+            sentiment.PROFILER = original
+
+        profile = profiler.snapshot(get_lexicon())
+        assert profile["analyses"] == 2
+        assert profile["cache_hits"] == 1
+        assert profile["stages"]["negation_negative"]["decided"] == 1
+        assert profile["stages"]["word_loop"]["latency"]["count"] == 1
+        assert profile["phases"]["phrase_scan"]["count"] == 2
+        assert profile["phases"]["word_loop"]["count"] == 1
+        assert {"stage": "word_loop", "rule": "negative", "token": "saai", "hits": 1} in profile["top_word_rules"]
+        assert "niet goed" not in profile["unmatched_candidates"]["negation_negative"]
+        assert "niet leuk" in profile["unmatched_candidates"]["negation_negative"]
+    
+    def test_sampled_profile_omits_unmatched_candidates(self):
+        """With sampling the unmatched phrase list would be meaningless, so it is left out"""
+        from app.lexicon import get_lexicon
+        from app.sentiment_profiler import StageProfiler
+        
+        profile = StageProfiler(sample_rate=100).snapshot(get_lexicon())
+        assert "unmatched_candidates" not in profile
+
+    def test_profile_sample_keeps_early_exit(self):
+        """A profile sample does not turn off the phrase scan early exit, a trace does"""
+        from app.lexicon import get_lexicon
+        from app.sentiment_profiler import ProfileSample
+        from app.sentiment_trace import SentimentTrace
+
+        text = "niet goed en super leuk"
+        sample, trace = ProfileSample(), SentimentTrace(text)
+        assert get_lexicon().match_stage(text, sample) == get_lexicon().match_stage(text, trace)
+        assert len(sample.phrase_hits) == 1
+        assert len(trace.phrase_hits) > 1
+
+class TestSentimentExecutor:
+    """Test cases for the optional process pool executor"""
+    
+    def test_process_pool_matches_inline(self, monkeypatch):
+        """Scoring in the pool gives the same results as inline scoring"""
+        from app import sentiment, sentiment_executor
+        
+        monkeypatch.setattr(sentiment_executor, "SENTIMENT_EXECUTOR", "process")
+        monkeypatch.setattr(sentiment_executor, "SENTIMENT_POOL_SIZE", 2)
+        monkeypatch.setattr(sentiment_executor, "SENTIMENT_BATCH_CHUNK", 2)
+        texts = ["De lessen zijn geweldig", "Lessen zijn onozzel", "Het is ok", "Saai"]
+        try:
+            assert sentiment_executor.analyze(texts[0]) == analyze_sentiment(texts[0])
+            assert sentiment_executor.analyze_batch(texts) == [analyze_sentiment(t) for t in texts]
+
+            # Long texts are scored per segment across the workers
+            long_text = "De uitleg was duidelijk. " * 100 + "Maar de toets was waardeloos. " * 20
+            from_pool = sentiment_executor.analyze(long_text)
+            sentiment.RESULT_CACHE.clear()
+            assert from_pool == analyze_sentiment(long_text)
+        finally:
+            sentiment_executor.shutdown_pool()
+    
+    def test_process_pool_follows_parent_lexicon_file(self, monkeypatch, tmp_path):
+        """Workers switch to the lexicon file of the parent and report the version they used"""
+        import json
+        from app import sentiment, sentiment_executor
+        
+        monkeypatch.setattr(sentiment_executor, "SENTIMENT_EXECUTOR", "process")
+        monkeypatch.setattr(sentiment_executor, "SENTIMENT_POOL_SIZE", 1)
+        original = lexicon.get_lexicon()
+        data = json.loads(open(original.source, encoding="utf-8").read())
+        data["version"] = "test-worker"
+        data["words"]["negative"].append("huiswerk")
+        path = tmp_path / "lexicon.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        try:
+            sentiment_executor.start_pool()
+            compiled = lexicon.reload_lexicon(str(path))
+            sentiment.RESULT_CACHE.clear()
+            [(result, version)] = sentiment_executor.analyze_batch_versioned(["Veel huiswerk vandaag"])
+            assert version == compiled.version
+            assert result[0] == "Negative"
+        finally:
+            sentiment_executor.shutdown_pool()
+            lexicon.reload_lexicon(original.source)
+    
+    def test_process_pool_whitespace_text(self, monkeypatch):
+        """Long whitespace-only text gives the inline result instead of an error"""
+        import asyncio
+        from app import sentiment_executor
+        
+        monkeypatch.setattr(sentiment_executor, "SENTIMENT_EXECUTOR", "process")
+        monkeypatch.setattr(sentiment_executor, "SENTIMENT_POOL_SIZE", 2)
+        text = " " * 3000 + "\t"
+        try:
+            assert sentiment_executor.analyze(text) == analyze_sentiment(text) == ("Neutral", 0.0, 0.5)
+            assert asyncio.run(sentiment_executor.analyze_async(text)) == ("Neutral", 0.0, 0.5)
+        finally:
+            sentiment_executor.shutdown_pool()
+
+class TestSegmentation:
+    """Test cases for length-bounded segmented scoring"""
+
+    def test_split_on_sentence_boundaries(self):
+        """Short texts stay whole; long texts split at sentence ends within the limit"""
+        assert split_segments("Korte tekst. Nog een zin.", 100) == ["Korte tekst. Nog een zin."]
+        segments = split_segments("De les was goed. " * 20, 100)
+        assert all(len(segment) <= 100 for segment in segments)
+        assert all(segment.endswith(".") for segment in segments)
+        assert " ".join(segments) == ("De les was goed. " * 20).strip()
+
+    def test_aggregation_rule(self):
+        """Rule decisions beat the fallback and negative beats positive"""
+        assert aggregate_segments([(10, ("Positive", 0.8, 0.9)), (10, ("Negative", -0.9, 0.8))])[0] == "Negative"
+        assert aggregate_segments([(10, ("Positive", 0.7, 0.8)), (90, ("Negative", -0.5, 0.6))])[0] == "Positive"
+        assert aggregate_segments([(30, ("Positive", 0.4, 0.6)), (10, ("Neutral", 0.0, 0.5))]) == ("Positive", 0.3, 0.6)
+
+    def test_hard_cap(self, monkeypatch):
+        """Oversized texts are truncated or rejected before scoring"""
+        from app import segmentation
+
+        monkeypatch.setattr(segmentation, "SENTIMENT_MAX_TEXT_LENGTH", 50)
+        assert len(segmentation.bound_text("x" * 80)) == 50
+        monkeypatch.setattr(segmentation, "SENTIMENT_OVERSIZE_POLICY", "reject")
+        assert segmentation.exceeds_limit("x" * 80)
+        with pytest.raises(TextTooLongError):
+            analyze_sentiment("Geweldig! " * 10)
+
+class TestSentimentCache:
+    """Test cases for the result cache"""
+    
+    def test_lru_eviction_and_counters(self):
+        """Least recently used entries are evicted and hits/misses counted"""
+        cache = SentimentCache(maxsize=2)
+        cache.put(b"a", ("Positive", 0.8, 0.9))
+        cache.put(b"b", ("Negative", -0.8, 0.9))
+        assert cache.get(b"a") == ("Positive", 0.8, 0.9)
+        cache.put(b"c", ("Neutral", 0.0, 0.5))
+        assert cache.get(b"b") is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+    
+    def test_ttl_expiry(self):
+        """Entries expire after the TTL"""
+        now = [100.0]
+        cache = SentimentCache(maxsize=10, ttl=5, clock=lambda: now[0])
+        cache.put(b"a", ("Positive", 0.8, 0.9))
+        now[0] += 4
+        assert cache.get(b"a") is not None
+        now[0] += 2
+        assert cache.get(b"a") is None
+        assert cache.stats()["expirations"] == 1
+    
+    def test_key_normalization_and_version(self):
+        """Keys ignore outer whitespace but keep case and include the lexicon version"""
+        assert content_key("  Goed ", "v1") == content_key("Goed", "v1")
+        assert content_key("Goed", "v1") != content_key("goed", "v1")
+        assert content_key("goed", "v1") != content_key("goed", "v2")
+    
+    def test_casing_is_not_shared_through_cache(self):
+        """Emoticons are case-sensitive, so a cached casing must not answer for another"""
+        from app import sentiment
+        
+        sentiment.RESULT_CACHE.clear()
+        lower = analyze_sentiment("fun :d")
+        upper = analyze_sentiment("Fun :D")
+        assert lower != upper
+        sentiment.RESULT_CACHE.clear()
+        assert analyze_sentiment("Fun :D") == upper
+    
+    def test_version_change_invalidates(self):
+        """A new lexicon version empties the cache"""
+        cache = SentimentCache(maxsize=10)
+        cache.sync_version("v1")
+        cache.put(content_key("goed", "v1"), ("Positive", 0.8, 0.9))
+        cache.sync_version("v2")
+        assert len(cache) == 0
+        assert cache.stats()["invalidations"] == 1
+    
+    def test_analyze_sentiment_uses_cache(self):
+        """Repeated texts are served from the cache with identical results"""
+        from app import sentiment
+        
+        first = analyze_sentiment("Saai, echt saai vandaag")
+        hits = sentiment.RESULT_CACHE.hits
+        assert analyze_sentiment("  Saai, echt saai vandaag ") == first
+        assert sentiment.RESULT_CACHE.hits == hits + 1
+
+class TestLexicon:
+    """Test cases for the external, hot-reloadable lexicon"""
+    
+    def _write(self, path, data):
+        import json
+        path.write_text(json.dumps(data), encoding="utf-8")
+    
+    def test_hot_reload_swaps_snapshot(self, tmp_path):
+        """Reloading a changed file switches version and results atomically"""
+        import json
+        
+        original = lexicon.get_lexicon()
+        data = json.loads(open(original.source, encoding="utf-8").read())
+        data["version"] = "test-reload"
+        data["words"]["negative"].append("huiswerk")
+        path = tmp_path / "lexicon.json"
+        self._write(path, data)
+        try:
+            assert analyze_sentiment("Veel huiswerk vandaag")[0] != "Negative"
+            compiled = lexicon.reload_lexicon(str(path))
+            assert compiled.version.startswith("test-reload+")
+            assert lexicon.get_lexicon() is compiled
+            assert analyze_sentiment("Veel huiswerk vandaag")[0] == "Negative"
+        finally:
+            lexicon.reload_lexicon(original.source)
+        assert lexicon.get_lexicon().version == original.version
+    
+    def test_invalid_file_keeps_active_lexicon(self, tmp_path):
+        """A broken lexicon file is rejected and the old snapshot stays active"""
+        active = lexicon.get_lexicon()
+        path = tmp_path / "broken.json"
+        path.write_text("{ not json", encoding="utf-8")
+        with pytest.raises(lexicon.LexiconError):
+            lexicon.reload_lexicon(str(path))
+        self._write(path, {"version": "x", "stages": []})
+        with pytest.raises(lexicon.LexiconError):
+            lexicon.reload_lexicon(str(path))
+        assert lexicon.get_lexicon() is active
+    
+    def test_artifact_matches_compiled_lexicon(self, tmp_path):
+        """The mmap artifact gives the same automaton; a stale artifact is ignored"""
+        import shutil
+        from app import lexicon_artifact
+        
+        path = tmp_path / "lexicon.json"
+        shutil.copy(lexicon.get_lexicon().source, path)
+        artifact, _, version = lexicon_artifact.build(str(path))
+        loaded = lexicon.load_lexicon(str(path))
+        assert loaded.artifact == artifact
+        assert loaded.version == version == lexicon.get_lexicon().version
+        text = "de les was niet zo goed maar de docent is super leuk"
+        assert (list(loaded.phrase_matcher.iter_matches(text))
+                == list(PhraseMatcher(loaded.phrase_matcher.phrases).iter_matches(text)))
+        
+        path.write_text(path.read_text(encoding="utf-8").replace('"saai"', '"saai", "huiswerk"', 1), encoding="utf-8")
+        assert lexicon.load_lexicon(str(path)).artifact is None
+    
+    def test_corrupt_artifact_metadata_falls_back(self, tmp_path):
+        """Valid JSON with missing or wrong metadata fields is ignored, not a crash"""
+        import json
+        import shutil
+        from app import lexicon_artifact
+        
+        path = tmp_path / "lexicon.json"
+        shutil.copy(lexicon.get_lexicon().source, path)
+        artifact, _, version = lexicon_artifact.build(str(path))
+        raw = open(artifact, "rb").read()
+        _, _, offset, length = lexicon_artifact.HEADER.unpack_from(raw)
+        metadata = json.loads(raw[offset:offset + length])
+        
+        def corrupt(change):
+            broken = json.loads(json.dumps(metadata))
+            change(broken)
+            encoded = json.dumps(broken).encode("utf-8")
+            header = lexicon_artifact.HEADER.pack(lexicon_artifact.MAGIC, lexicon_artifact.ARTIFACT_FORMAT,
+                                                  offset, len(encoded))
+            with open(artifact, "wb") as handle:
+                handle.write(header + raw[lexicon_artifact.HEADER.size:offset] + encoded)
+        
+        for change in (lambda data: data["tables"].pop("out_ids"),
+                       lambda data: data["tables"]["delta"].__setitem__(2, "zz"),
+                       lambda data: data.__setitem__("tables", None)):
+            corrupt(change)
+            with pytest.raises(lexicon_artifact.ArtifactError):
+                lexicon_artifact.read_artifact(artifact)
+            loaded = lexicon.load_lexicon(str(path))
+            assert loaded.artifact is None
+            assert loaded.version == version
+    
+    def test_word_lists_are_frozen(self):
+        """Word lists are compiled to frozensets"""
+        compiled = lexicon.get_lexicon()
+        assert isinstance(compiled.positive, frozenset)
+        assert "saai" in compiled.negative
+
+class TestPhraseMatcher:
+    """Test cases for the compiled phrase automaton"""
+    
+    def test_finds_overlapping_phrases(self):
+        """All (overlapping) substring matches are found in one pass"""
+        matcher = PhraseMatcher(["he", "she", "his", "hers"])
+        assert sorted(matcher.find_all("ushers")) == ["he", "hers", "she"]
+    
+    def test_matches_substring_semantics(self):
+        """Every phrase reported by the matcher is a substring of the text"""
+        text = "de leerkracht is niet zo goed georganiseerd maar wel super"
+        stages = lexicon.get_lexicon().stages
+        for phrase in stages[0][1] + stages[5][1]:
+            matcher = PhraseMatcher([phrase])
+            assert bool(matcher.find_all(text)) == (phrase in text)
+    
+    def test_stage_priority(self):
+        """The earliest stage wins, regardless of position in the text"""
+        stage_index, phrase = match_phrase_stage("super leuk maar niet goed")
+        assert lexicon.get_lexicon().stages[stage_index][0] == "negation_negative"
+        assert phrase == "niet goed"
+        assert match_phrase_stage("normale lessen") is None
+
+class TestTokens:
+    """Test cases for the shared tokenizer"""
+
+    def test_clean_tokens_and_negation_windows(self):
+        """Punctuation is stripped once; negation windows follow raw tokens"""
+        tokens = Tokens("niet zo goed, (slecht) niet, leuk niet saai")
+        assert tokens.clean == ["niet", "zo", "goed", "slecht", "niet", "leuk", "niet", "saai"]
+        assert tokens.negation == {1: "niet", 2: "niet zo", 7: "niet"}
+        assert Tokens("").negation == {}
+
+class TestFuzzyIndex:
+    """Test cases for the indexed fuzzy matcher"""
+    
+    def test_spelling_variants_resolve(self):
+        """Known misspellings still resolve to their strong negative"""
+        index = FuzzyIndex(['racist', 'racistisch', 'onnozel', 'verschrikkelijk', 'waardeloos'])
+        for misspelled, expected in [
+            ("rassistisch", "racistisch"),
+            ("onozzel", "onnozel"),
+            ("verschrikelijk", "verschrikkelijk"),
+            ("waardelos", "waardeloos"),
+        ]:
+            assert index.lookup(misspelled, 0.75) == (True, expected)
+        assert index.lookup("docent", 0.75) == (False, "")
+    
+    def _sequence_matcher_loop(self, word, words, threshold):
+        # The original fuzzy_match: first word in list order with ratio() >= threshold
+        from difflib import SequenceMatcher
+        for target in words:
+            if SequenceMatcher(None, word.lower(), target.lower()).ratio() >= threshold:
+                return True, target
+        return False, ""
+    
+    def test_matches_sequence_matcher_loop(self):
+        """The index gives exactly the result of the SequenceMatcher loop it replaces"""
+        words = ["slecht", "saai", "onnozel", "vervelend", "verwarrend", "chaotisch", "irritant",
+                 "racist", "racistisch"]
+        index = FuzzyIndex(words)
+        queries = ["slegt", "sai", "vervelnd", "verwarend", "kaotisch", "iritant", "les", "x", "",
+                   "racistisch", "rassistisch", "oznntoel", "racitsctv", "Onnozel"]
+        for threshold in (0.5, 0.6, 0.75, 0.9):
+            for query in queries:
+                assert index.lookup(query, threshold) == self._sequence_matcher_loop(query, words, threshold), \
+                    (query, threshold)
+    
+    def test_garbled_words_do_not_match(self):
+        """Anagram-like garbles pass the LCS ratio but not SequenceMatcher, so they do not match"""
+        index = FuzzyIndex(['racist', 'racistisch', 'onnozel', 'verschrikkelijk', 'waardeloos'])
+        assert similarity_ratio("oznntoel", "onnozel") >= 0.75
+        assert index.lookup("oznntoel", 0.75) == (False, "")
+        assert index.lookup("racitsctv", 0.75) == (False, "")
+
+class TestPolarityTable:
+    """Test cases for the built-in fallback polarity table"""
+
+    def test_matches_textblob_polarity(self):
+        """The table reproduces TextBlob's pattern polarity"""
+        textblob = pytest.importorskip("textblob")
+        from app.polarity import get_polarity_table
+
+        table = get_polarity_table()
+        texts = [
+            "The course was great and very helpful!",
+            "terrible slides and a boring session",
+            "It is not good, really not bad :)",
+            "Mr. Smith's lecture was never dull... (!)",
+            "de les was ok",
+        ]
+        for text in texts:
+            assert table.score(text) == pytest.approx(textblob.TextBlob(text).sentiment.polarity)
+        assert table.score("") == 0.0
+
+class TestLanguageDetector:
+    """Test cases for the trigram language detection fast path"""
+
+    def test_detects_languages(self):
+        """Dutch, English, French and Arabic feedback is recognised"""
+        assert detect_language("De les was heel duidelijk en de docent legde alles goed uit") == "nl"
+        assert detect_language("The teacher explained everything clearly and the course was useful") == "en"
+        assert detect_language("Le professeur explique très bien et le cours était intéressant") == "fr"
+        assert detect_language("المعلم يشرح الدرس بشكل جيد جدا") == "ar"
+
+    def test_short_text_defaults_to_dutch(self):
+        """Too little text to judge stays on the Dutch cascade"""
+        assert detect_language("goed") == "nl"
+        assert detect_language("Great course!") == "nl"
+
+    def test_non_dutch_skips_cascade(self):
+        """English text is decided by the language route, not the Dutch stages"""
+        trace = explain_sentiment("The lessons were really great and the teacher was very helpful")
+        assert trace.decided_by == "language:en"
+        assert trace.result[0] == "Positive"
+
+class TestSentimentEngines:
+    """Test cases for the engine registry and the linear model"""
+
+    def test_rule_engine_is_default(self):
+        """The rule cascade is registered and selected by default"""
+        from app.sentiment_engines import get_engine
+
+        engine = get_engine("rules")
+        assert engine.analyze("Geweldige les!") == analyze_sentiment("Geweldige les!")
+        assert engine.version == lexicon.get_lexicon().version
+
+    def test_unknown_engine(self):
+        """An unknown engine name raises an EngineError"""
+        from app.sentiment_engines import EngineError, get_engine
+
+        with pytest.raises(EngineError):
+            get_engine("does-not-exist")
+
+    def test_incomplete_engine_fails_on_creation(self):
+        """An engine without version or analyze_batch cannot be instantiated"""
+        from app.sentiment_engines import SentimentEngine
+
+        class Incomplete(SentimentEngine):
+            name = "incomplete"
+
+            def analyze_batch(self, texts):
+                return [("Neutral", 0.0, 0.5) for _ in texts]
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_linear_model_roundtrip(self, tmp_path):
+        """The linear model learns the training labels and survives save/load"""
+        pytest.importorskip("numpy")
+        from app.linear_model import LinearModel, train
+
+        texts = ["de les was geweldig", "super goede uitleg", "heel slecht en saai",
+                 "waardeloze docent", "de les was ok", "normale les vandaag"] * 5
+        labels = ["Positive", "Positive", "Negative", "Negative", "Neutral", "Neutral"] * 5
+        model = train(texts, labels, n_features=1024, epochs=200)
+        assert [result[0] for result in model.predict(texts[:6])] == labels[:6]
+        assert model.predict([]) == []
+
+        path = str(tmp_path / "model.npz")
+        model.save(path)
+        loaded = LinearModel.load(path)
+        assert loaded.version == model.version
+        assert loaded.predict(["slecht en saai", ""]) == model.predict(["slecht en saai", ""])
+
+class BusyEngine(SentimentEngine):
+    """Shadow candidate that burns CPU in pure Python (module level so a spawned process can load it)"""
+
+    name = "busy"
+    version = "busy-1"
+
+    def analyze_batch(self, texts):
+        deadline = time.perf_counter() + 0.02 * len(texts)
+        while time.perf_counter() < deadline:
+            pass
+        return [("Neutral", 0.0, 0.5) for _ in texts]
+
+class TestShadowEvaluator:
+    """Test cases for shadow-mode evaluation of a candidate engine"""
+
+    def test_agreement_with_same_lexicon(self):
+        """A candidate with the active lexicon agrees with production"""
+        from app.sentiment_engines import LexiconEngine
+        from app.sentiment_shadow import ShadowEvaluator
+
+        shadow = ShadowEvaluator(lambda: LexiconEngine(lexicon.get_lexicon().source), sample_rate=1)
+        for text in ["Geweldige les!", "De uitleg was niet duidelijk", "Normale les"]:
+            shadow.evaluate(text, analyze_sentiment(text), 0.001)
+        snapshot = shadow.snapshot()
+        assert snapshot["evaluated"] == 3
+        assert snapshot["agreement_rate"] == 1.0
+        assert snapshot["recent_disagreements"] == []
+        assert snapshot["candidate"]["name"] == "lexicon"
+
+    def test_candidate_does_not_slow_down_production(self):
+        """A busy candidate runs in its own process, so production latency stays the same"""
+        from app.sentiment import _analyze_uncached
+        from app.sentiment_shadow import ShadowEvaluator
+
+        def production_latency(count=20000):
+            # Wall time over all analyses: GIL waits land between calls as well
+            started = time.perf_counter()
+            for index in range(count):
+                _analyze_uncached(f"De uitleg was niet duidelijk maar de les was leuk {index}")
+            return time.perf_counter() - started
+
+        baseline = production_latency()
+        shadow = ShadowEvaluator(BusyEngine, sample_rate=1, queue_size=1000)
+        shadow.start()
+        try:
+            for index in range(500):
+                shadow.offer(f"tekst {index}", ("Neutral", 0.0, 0.5), 0.001)
+            deadline = time.time() + 60
+            while shadow.snapshot()["evaluated"] == 0 and time.time() < deadline:
+                time.sleep(0.05)
+            assert shadow.snapshot()["queue"]["size"] > 0
+            loaded = production_latency()
+        finally:
+            shadow.stop()
+        snapshot = shadow.snapshot()
+        assert snapshot["evaluated"] > 0
+        assert snapshot["candidate"]["name"] == "busy"
+        # Scored in-process the busy candidate would take about half of the GIL time
+        assert loaded < baseline * 1.5
+
+    def test_bounded_queue_drop_policy(self):
+        """A full queue drops the newest or the oldest item, never blocks"""
+        from app.sentiment_shadow import ShadowEvaluator
+
+        result = ("Neutral", 0.0, 0.5)
+        newest = ShadowEvaluator(lambda: None, sample_rate=1, queue_size=2, drop="newest")
+        oldest = ShadowEvaluator(lambda: None, sample_rate=1, queue_size=2, drop="oldest")
+        for text in ["a", "b", "c"]:
+            newest.offer(text, result, 0.0)
+            oldest.offer(text, result, 0.0)
+        assert [item[0] for item in newest._queue] == ["a", "b"]
+        assert [item[0] for item in oldest._queue] == ["b", "c"]
+        assert newest.snapshot()["dropped"] == oldest.snapshot()["dropped"] == 1
+
+    def test_sampling(self):
+        """Only one in N submissions is queued"""
+        from app.sentiment_shadow import ShadowEvaluator
+
+        shadow = ShadowEvaluator(lambda: None, sample_rate=4, queue_size=100)
+        queued = [shadow.offer(str(index), ("Neutral", 0.0, 0.5), 0.0) for index in range(8)]
+        assert sum(queued) == 2
+
+class TestPreviewSession:
+    """Test cases for incremental scoring in the live preview"""
+
+    def test_incremental_matches_full_analysis(self):
+        """Typing, deleting and editing gives the same result as a full analysis"""
+        from app.sentiment import _analyze_uncached
+        from app.sentiment_preview import PreviewSession
+
+        session = PreviewSession()
+        final = "De les was niet zo leuk, maar de docent legt het heel goed uit!"
+        edits = [final[:length] for length in range(1, len(final) + 1)]
+        edits += [final[:20], final[:20] + " geweldig", "De les was niet " + final[16:], final.upper()]
+        for text in edits:
+            assert session.update(text) == _analyze_uncached(text), text
+
+    def test_only_changed_tail_is_rescored(self):
+        """Appending to the text only scans the new characters"""
+        from app.sentiment_preview import PreviewSession, common_prefix
+
+        session = PreviewSession()
+        session.update("De uitleg was duidelijk")
+        scanned = session.rescored_chars
+        session.update("De uitleg was duidelijk en")
+        assert session.rescored_chars - scanned == len(" en")
+        assert common_prefix(["de", "les"], ["de", "uitleg"]) == 1
+        assert common_prefix("abc", "abc") == 3
+
+class TestBulkScoring:
+    """Test cases for the offline bulk scoring script"""
+
+    def _script(self, name, monkeypatch):
+        import importlib.util
+        scripts = os.path.join(os.path.dirname(__file__), '..', 'scripts')
+        monkeypatch.syspath_prepend(scripts)
+        # rescore_feedback sets SENTIMENT_EXECUTOR on import; restore it afterwards
+        monkeypatch.setenv("SENTIMENT_EXECUTOR", os.getenv("SENTIMENT_EXECUTOR", "inline"))
+        path = os.path.join(os.path.dirname(__file__), '..', 'scripts', f'{name}.py')
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def test_invalid_first_line_keeps_csv_columns(self, monkeypatch):
+        """An invalid first NDJSON line does not fix the CSV header"""
+        import csv
+        import io
+
+        score_feedback = self._script("score_feedback", monkeypatch)
+        source = io.StringIO('{broken\n{"id": 7, "course": "wiskunde", "text": "Heel goed"}\n')
+        target = io.StringIO()
+        writer = score_feedback.ResultWriter(target, "csv")
+        progress = score_feedback.Progress(0)
+        score_feedback.score_stream(score_feedback.read_ndjson(source, "text"), writer, progress, workers=0)
+        writer.close()
+
+        target.seek(0)
+        rows = list(csv.DictReader(target))
+        assert list(rows[0]) == ["id", "course", "text", "sentiment_label", "sentiment_score",
+                                 "sentiment_confidence", "error"]
+        assert rows[0]["error"].startswith("invalid JSON")
+        assert rows[1]["course"] == "wiskunde"
+        assert rows[1]["sentiment_label"] == "Positive"
+
+    def test_rescore_skips_too_long_rows_with_worker_version(self, monkeypatch):
+        """Over-long rows are skipped per row and stored rows carry the scoring version"""
+        from app import segmentation
+
+        rescore_feedback = self._script("rescore_feedback", monkeypatch)
+        monkeypatch.setattr(segmentation, "SENTIMENT_OVERSIZE_POLICY", "reject")
+        monkeypatch.setattr(segmentation, "SENTIMENT_MAX_TEXT_LENGTH", 20)
+
+        scored = rescore_feedback._score_page("rules", ["Heel goed", "x" * 50])
+        assert scored[0] == (analyze_sentiment("Heel goed"), lexicon.get_lexicon().version)
+        assert scored[1] is None
+
+        progress = rescore_feedback.Progress(0)
+        pages = [(2, [1, 2], ["Heel goed", "x" * 50])]
+        rescore_feedback.rescore(pages, "rules", rescore_feedback.Checkpoint("", "rules"),
+                                 rescore_feedback.Throttle(0), progress, dry_run=True)
+        assert progress.records == 2
+        assert progress.skipped == 1
+
 if __name__ == "__main__":
     # Run tests
     pytest.main([__file__, "-v"])